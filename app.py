@@ -5,883 +5,998 @@
 基于Flask框架，提供Web界面供用户通过网络访问
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context, g
 from datetime import datetime
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from docx.enum.section import WD_SECTION
 import os
-import tempfile
-from collections import Counter
+import json
+import codecs
+import re
+import secrets
+import io
+import hashlib
+import time
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from urllib.parse import quote
+from compensation_engine import (
+    ITEM_DEPENDENCIES, CaseInput,
+    calculate_compensation, recalculate_compensation, standards_version, standard_set_for,
+)
+from cents_engine import calculate_compensation_cents
+from standards import REGISTRY
+from result_cache import ResultCache, SharedStore, case_cache_key, export_cache_key
+from export_files import new_export_buffer, is_spilled, TempDirJanitor
+from report_writer import REPORT_BACKENDS, write_report, write_incident_report, prepare_report_templates
+from export_jobs import ExportJobQueue, QueueFullError, DONE
+from report_archive import iter_report_archive, case_report
+from incident import IncidentInput, calculate_incident
+from word_report import report_template_version
+from static_assets import StaticAssets, IMMUTABLE_CACHE_CONTROL
+from compression import CompressionStats, compress_response, precompress_assets, negotiate
+from metrics import (
+    METRICS, SharedMetrics, REQUESTS, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, RESPONSE_BYTES, ERRORS, REPORT_BYTES,
+)
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'tangxuezhi'
+# 静态文件由 static_asset 提供（地址含内容摘要），不使用Flask默认的 /static 路由
+app = Flask(__name__, static_folder=None)
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'tangxuezhi')  # 生产环境须通过环境变量设置（serve.py 要求设置）
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 2048))  # 计算结果缓存条目数
+app.config['RESULT_CACHE_TTL'] = int(os.environ.get('RESULT_CACHE_TTL', 3600))  # 计算结果缓存有效期（秒）
+app.config['CALCULATION_STORE_SIZE'] = int(os.environ.get('CALCULATION_STORE_SIZE', 4096))  # 保存的计算结果数
+app.config['CALCULATION_STORE_TTL'] = int(os.environ.get('CALCULATION_STORE_TTL', 4 * 3600))  # 计算结果保存时间（秒）
+app.config['EXPORT_SPILL_THRESHOLD'] = int(os.environ.get('EXPORT_SPILL_THRESHOLD', 16 * 1024 * 1024))  # 导出文件超过该大小时转存磁盘
+app.config['EXPORT_TEMP_DIR'] = os.environ.get('EXPORT_TEMP_DIR', '/app/temp' if os.path.isdir('/app/temp') else None)
+app.config['EXPORT_TEMP_MAX_AGE'] = int(os.environ.get('EXPORT_TEMP_MAX_AGE', 3600))  # 临时目录中导出文件的保留时间（秒）
+app.config['EXPORT_CACHE_SIZE'] = int(os.environ.get('EXPORT_CACHE_SIZE', 512))  # 缓存的导出文件数
+app.config['EXPORT_CACHE_BYTES'] = int(os.environ.get('EXPORT_CACHE_BYTES', 64 * 1024 * 1024))  # 导出文件缓存的总字节数
+app.config['EXPORT_CACHE_TTL'] = int(os.environ.get('EXPORT_CACHE_TTL', 3600))  # 导出文件缓存有效期（秒）
+app.config['EXPORT_WORKERS'] = int(os.environ.get('EXPORT_WORKERS', 2))  # 异步导出任务的工作进程数
+app.config['EXPORT_QUEUE_LIMIT'] = int(os.environ.get('EXPORT_QUEUE_LIMIT', 64))  # 未完成的异步导出任务数上限
+app.config['EXPORT_JOB_TTL'] = int(os.environ.get('EXPORT_JOB_TTL', 600))  # 已完成的导出任务保留时间（秒）
+app.config['EXPORT_WORKER_NICE'] = int(os.environ.get('EXPORT_WORKER_NICE', 10))  # 导出工作进程的调度优先级增量
+app.config['READY_QUEUE_THRESHOLD'] = int(os.environ.get('READY_QUEUE_THRESHOLD', app.config['EXPORT_QUEUE_LIMIT'] * 3 // 4))  # 未完成的导出任务数达到该值时 /readyz 报告未就绪
+app.config['CALCULATION_DIR'] = os.environ.get('CALCULATION_DIR')  # 共享计算结果目录（多进程部署时由 serve.py 设置）
+app.config['EXPORT_JOB_DIR'] = os.environ.get('EXPORT_JOB_DIR')  # 共享任务目录（多进程部署时由 serve.py 设置）
+app.config['EXPORT_ARCHIVE_WINDOW'] = int(os.environ.get('EXPORT_ARCHIVE_WINDOW', 0))  # 批量导出时同时生成的报告数（0为工作进程数的2倍）
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # 超过该字节数的文本类响应才压缩
+app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', 6))  # gzip压缩级别（1-9，0表示不压缩动态响应）
+app.config['INCIDENT_PARALLEL_MIN_VICTIMS'] = int(os.environ.get('INCIDENT_PARALLEL_MIN_VICTIMS', 200))  # 受害人数达到该值时在导出工作进程池中并行计算（0为不并行）
+app.config['BATCH_ITEM_MAX_SIZE'] = int(os.environ.get('BATCH_ITEM_MAX_SIZE', 1024 * 1024))  # 批量请求中单个案件的最大字符数
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')  # 运行指标快照目录（多进程部署时由 serve.py 设置）
+app.config['REPORT_BACKEND'] = os.environ.get('REPORT_BACKEND', 'docx')  # Word报告生成方式：docx（python-docx）或 ooxml（流式写出）
+
+# 计算结果缓存：同一案件反复计算时直接返回已有结果
+result_cache = ResultCache(app.config['RESULT_CACHE_SIZE'], app.config['RESULT_CACHE_TTL'])
+# 已完成的计算：计算编号 -> (计算结果, 标准版本)，供增量重算和按编号导出使用
+calculation_store = ResultCache(app.config['CALCULATION_STORE_SIZE'], app.config['CALCULATION_STORE_TTL'])
+# 多进程部署时各工作进程共用的计算输入：计算编号 -> 计算输入，其他工作进程据此重算（见 load_calculation）
+shared_calculations = (SharedStore(app.config['CALCULATION_DIR'], app.config['CALCULATION_STORE_SIZE'],
+                                   app.config['CALCULATION_STORE_TTL'])
+                       if app.config['CALCULATION_DIR'] else None)
+# 已完成的事故计算：事故编号 -> (事故计算结果, 标准版本)；多进程部署时事故输入另写入 shared_calculations（见 load_incident）
+incident_store = ResultCache(app.config['CALCULATION_STORE_SIZE'], app.config['CALCULATION_STORE_TTL'])
+# 导出文件缓存：同样的报告内容生成的文件逐字节相同，重复导出时直接返回
+export_cache = ResultCache(app.config['EXPORT_CACHE_SIZE'], app.config['EXPORT_CACHE_TTL'],
+                           max_bytes=app.config['EXPORT_CACHE_BYTES'])
+# 异步导出任务：在独立的进程池中生成报告（首次提交任务或 /readyz 预热时才启动工作进程）
+export_queue = ExportJobQueue(app.config['EXPORT_WORKERS'], app.config['EXPORT_QUEUE_LIMIT'],
+                              app.config['EXPORT_JOB_TTL'], nice=app.config['EXPORT_WORKER_NICE'],
+                              cache=export_cache, shared_dir=app.config['EXPORT_JOB_DIR'])
+# 清理临时目录中过期的导出文件
+export_janitor = TempDirJanitor(app.config['EXPORT_TEMP_DIR'], app.config['EXPORT_TEMP_MAX_AGE'])
+# 响应压缩统计（节省的字节数、压缩用的CPU时间）
+compression_stats = CompressionStats()
+# 页面的CSS、JS（启动时读入内存并预先压缩）
+static_assets = StaticAssets(os.path.join(app.root_path, 'static'))
+precompress_assets(static_assets, compression_stats)
+# 运行指标（/metrics）：多进程部署时汇总各工作进程写入 METRICS_DIR 的快照
+shared_metrics = SharedMetrics(METRICS, app.config['METRICS_DIR']) if app.config['METRICS_DIR'] else None
+COMPRESSION_SAVED = METRICS.counter('http_compression_saved_bytes_total', '响应压缩节省的字节数', ('encoding',))
+COMPRESSION_CPU = METRICS.counter('http_compression_cpu_seconds_total', '响应压缩用的CPU时间（秒）', ('encoding',))
+EXPORT_PENDING = METRICS.gauge('export_jobs_pending', '未完成的异步导出任务数')
+
+
+def collect_app_metrics():
+    """把压缩统计和导出任务队列同步到运行指标中"""
+    for encoding, entry in compression_stats.stats()['encodings'].items():
+        COMPRESSION_SAVED.set_total(entry['bytes_saved'], encoding)
+        COMPRESSION_CPU.set_total(entry['cpu_seconds'], encoding)
+    EXPORT_PENDING.set(export_queue.pending_count())
+
+
+METRICS.collectors.append(collect_app_metrics)
+# 主页：每个标准版本只渲染一次，(标准版本, 页面内容, ETag)
+index_page = None
+# 启动时生成Word报告骨架和流式写出的XML片段，导出时只需克隆或拼接
+prepare_report_templates()
+
+
+def store_calculation(result, version):
+    """
+    保存计算结果，返回计算编号
+
+    多进程部署（serve.py）时计算输入另写入共享计算结果目录，任一工作进程都能按编号取得。
+    """
+    calculation_id = secrets.token_urlsafe(12)
+    calculation_store.put(calculation_id, (result, version))
+    if shared_calculations is not None:
+        shared_calculations.put(calculation_id, {'case': asdict(result.case),
+                                                 'with_details': result.details is not None})
+    return calculation_id
 
-# 2025年广西赔偿标准（根据桂高法会〔2025〕13号文件）
-STANDARDS = {
-    'disposable_income': 43044,  # 广西上一年度城镇居民人均可支配收入（元/年）
-    'consumption': 26084,  # 广西上一年度城镇居民人均消费支出（元/年）
-    'daily_meal_subsidy': 100,  # 住院伙食补助费（元/天）
-    'daily_nursing_fee': 157.9,  # 护理费标准（元/天，护工标准）
-    'funeral_expense': 49434,  # 丧葬费（元）
-    'traffic_fee_city': 30,  # 市内交通费标准（元/天）
-    'daily_accommodation_fee': 330,  # 住宿费标准（元/天）
-}
-
-# 各行业平均工资（元/年）
-INDUSTRY_SALARIES = {
-    '农、林、牧、渔业': 88472,
-    '采矿业': 84319,
-    '制造业': 81668,
-    '电力、热力、燃气及水生产和供应业': 146394,
-    '建筑业': 81819,
-    '批发和零售业': 91322,
-    '交通运输、仓储和邮政业': 116278,
-    '住宿和餐饮业': 49065,
-    '信息传输、软件和信息技术服务业': 140726,
-    '金融业': 166109,
-    '房地产业': 78846,
-    '租赁和商务服务业': 74050,
-    '科学研究和技术服务业': 113638,
-    '水利、环境和公共设施管理业': 64797,
-    '居民服务、修理和其他服务业': 56848,
-    '教育': 96386,
-    '卫生和社会工作': 120902,
-    '文化、体育和娱乐业': 93209,
-    '公共管理、社会保障和社会组织': 93976,
-    '其他行业': 60000,
-}
-
-# 伤残等级系数
-DISABILITY_COEFFICIENTS = {
-    1: 1.0, 2: 0.9, 3: 0.8, 4: 0.7, 5: 0.6,
-    6: 0.5, 7: 0.4, 8: 0.3, 9: 0.2, 10: 0.1
-}
-
-
-def get_float_value(value, default=0.0):
-    """获取浮点数值"""
-    try:
-        if isinstance(value, str):
-            value = value.strip()
-            return float(value) if value else default
-        return float(value) if value else default
-    except (ValueError, TypeError):
-        return default
 
+def load_calculation(calculation_id):
+    """
+    按计算编号取得 (计算结果, 标准版本)；编号不存在或已过期返回 None
 
-def get_int_value(value, default=0):
-    """获取整数值"""
+    本进程没有保存该计算结果时（由其他工作进程计算），按共享计算结果目录中的计算输入重算。
+    """
+    if not isinstance(calculation_id, str):
+        return None
+    entry = calculation_store.get(calculation_id)
+    if entry is not None or shared_calculations is None:
+        return entry
+    saved = shared_calculations.get(calculation_id)
+    if saved is None or 'case' not in saved:
+        return None
+    entry = (calculate_compensation(CaseInput(**saved['case']), saved['with_details']), standards_version())
+    calculation_store.put(calculation_id, entry)
+    return entry
+
+
+def compute_incident(incident, with_details=True):
+    """
+    计算一起事故：受害人数达到 INCIDENT_PARALLEL_MIN_VICTIMS 时分组提交到导出工作进程池并行计算，
+    请求线程只等待结果；受害人较少时在当前线程中依次计算（提交到进程池的开销大于计算本身）
+    """
+    threshold = app.config['INCIDENT_PARALLEL_MIN_VICTIMS']
+    if not threshold or len(incident.victims) < threshold:
+        return calculate_incident(incident, with_details)
+    executor = export_queue.get_executor()
     try:
-        if isinstance(value, str):
-            value = value.strip()
-            return int(value) if value else default
-        return int(value) if value else default
-    except (ValueError, TypeError):
-        return default
-
-
-def calculate_compensation_years(age):
-    """计算赔偿年限"""
-    if age < 60:
-        return 20
-    elif age >= 75:
-        return 5
-    else:
-        return 20 - (age - 60)
+        return calculate_incident(incident, with_details, executor)
+    except BrokenProcessPool:
+        # 工作进程异常退出后进程池不可用：重建进程池，本次在当前线程中计算
+        export_queue.reset_executor(executor)
+        return calculate_incident(incident, with_details)
+
+
+def store_incident(result, version):
+    """保存事故计算结果，返回事故编号（多进程部署时事故输入另写入共享计算结果目录）"""
+    incident_id = secrets.token_urlsafe(12)
+    incident_store.put(incident_id, (result, version))
+    if shared_calculations is not None:
+        shared_calculations.put(incident_id, {'incident': asdict(result.incident)})
+    return incident_id
+
+
+def load_incident(incident_id):
+    """
+    按事故编号取得 (事故计算结果, 标准版本)；编号不存在或已过期返回 None
+
+    本进程没有保存该事故时（由其他工作进程计算），按共享计算结果目录中的事故输入重算（不生成计算详情）。
+    """
+    if not isinstance(incident_id, str):
+        return None
+    entry = incident_store.get(incident_id)
+    if entry is not None or shared_calculations is None:
+        return entry
+    saved = shared_calculations.get(incident_id)
+    if saved is None or 'incident' not in saved:
+        return None
+    entry = (compute_incident(IncidentInput.from_saved(saved['incident']), with_details=False), standards_version())
+    incident_store.put(incident_id, entry)
+    return entry
+
 
+def is_totals_only(data=None):
+    """是否为仅金额模式（请求参数或JSON字段 totals_only），仅金额模式下不生成计算详情"""
+    value = data.get('totals_only') if data and 'totals_only' in data else request.args.get('totals_only')
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
 
-def calculate_multi_disability_coefficient(disability_levels_str):
-    """计算多处伤残的伤残系数"""
-    if not disability_levels_str or disability_levels_str.strip() == "无":
-        return 1.0, None, 0.0, "无伤残，系数为1.0"
+
+# 跳过格式错误的JSON数组元素时关心的字符（字符串外、字符串内）
+_JSON_STRUCTURE_CHARS = re.compile(r'[][{}",]')
+_JSON_STRING_CHARS = re.compile(r'["\\]')
+# JSON的空白字符
+_JSON_WHITESPACE = ' \t\r\n'
+
+
+def _maybe_incomplete(text, error):
+    """JSON解析错误是否可能只是因为内容尚未读完（错误位于已读内容末尾附近，或字符串未结束）"""
+    return error.pos >= len(text) - 6 or error.msg.startswith('Unterminated string')
+
+
+def iter_batch_payloads(stream, chunk_size=64 * 1024, max_item_size=1024 * 1024):
+    """逐条读取批量计算请求体（NDJSON或JSON数组，可带UTF-8 BOM），每次只在内存中保留一个案件
+
+    单个案件最多 max_item_size 个字符。格式错误或过大的案件报告错误后跳过，继续处理后面的案件：
+    JSON数组中跳到同一层级的下一个逗号或数组结尾（最多扫描 max_item_size 个字符），NDJSON跳到下一行。
+    数组元素之间须有且只有一个逗号，缺少或多余的逗号按格式错误的案件报告。
+
+    产出：(序号, 案件数据, 错误信息)
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    exhausted = False
+    too_large = f'案件数据超过 {max_item_size} 个字符'
     
-    disability_levels = []
-    try:
-        parts = disability_levels_str.replace('，', ',').replace('；', ';').replace(',', ';').split(';')
-        for part in parts:
-            part = part.strip()
-            if not part:
-                continue
-            if '级' in part:
-                level = int(part.replace('级', '').strip())
-            else:
-                level = int(part.strip())
-            if 1 <= level <= 10:
-                disability_levels.append(level)
-    except (ValueError, AttributeError):
-        return 1.0, None, 0.0, "伤残等级格式错误，按无伤残处理"
+    def read_more():
+        nonlocal buffer, exhausted
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            exhausted = True
+            buffer += text_decoder.decode(b'', final=True)
+            return False
+        buffer += text_decoder.decode(chunk)
+        return True
     
-    if not disability_levels:
-        return 1.0, None, 0.0, "无有效伤残等级，系数为1.0"
+    def skip_element(limit):
+        """
+        跳过格式错误的数组元素：逐块丢弃到同一层级的下一个逗号或数组结尾（停在该字符处），成功返回 None，
+        否则返回错误信息（请求体已结束，或扫描 limit 个字符仍未找到；过大的案件不限制）
+
+        括号不配对时（如 {"a": [1, 2}），右括号一并结束它之前未结束的括号。
+        """
+        nonlocal buffer
+        opened, in_string, position, scanned = [], False, 0, 0
+        while True:
+            if limit is not None and scanned + position > limit:
+                return f'批量数据格式错误：{limit} 个字符内找不到下一个案件'
+            match = (_JSON_STRING_CHARS if in_string else _JSON_STRUCTURE_CHARS).search(buffer, position)
+            if match is None or (match.group() == '\\' and match.end() == len(buffer)):
+                # 已扫描的内容丢弃（转义符留到读入下一块后处理）
+                kept = match.start() if match is not None else len(buffer)
+                buffer, position, scanned = buffer[kept:], 0, scanned + kept
+                if exhausted or not read_more():
+                    return '批量数据格式错误：JSON数组未结束'
+                continue
+            char, position = match.group(), match.end()
+            if in_string:
+                if char == '\\':
+                    position += 1
+                else:
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '[{':
+                opened.append(char)
+            elif char == ',' and not opened:
+                buffer = buffer[position - 1:]
+                return None
+            elif char in ']}':
+                opener = '[' if char == ']' else '{'
+                if opener in opened:
+                    del opened[len(opened) - 1 - opened[::-1].index(opener):]
+                elif char == ']':
+                    # 元素中没有未结束的 "["：即数组结尾
+                    buffer = buffer[position - 1:]
+                    return None
     
-    level_counts = Counter(disability_levels)
-    sorted_levels = sorted(level_counts.keys())
-    max_level = sorted_levels[0]
-    max_coefficient = DISABILITY_COEFFICIENTS.get(max_level, 1.0)
+    while not buffer.strip() and read_more():
+        pass
+    buffer = buffer.lstrip()
+    if not buffer:
+        return
     
-    if max_level == 1:
-        display_levels = []
-        for level, count in sorted(level_counts.items()):
-            if count == 1:
-                display_levels.append(f"{level}级")
+    index = 0
+    if buffer[0] == '[':
+        # JSON数组：逐个解析数组元素；expecting 为 'first'（数组开头）、'element'（逗号之后）或 'separator'（元素之后）
+        buffer = buffer[1:]
+        expecting = 'first'
+        while True:
+            buffer = buffer.lstrip(_JSON_WHITESPACE)
+            if not buffer:
+                if exhausted or not read_more():
+                    yield index, None, '批量数据格式错误：JSON数组未结束'
+                    return
+                continue
+            char = buffer[0]
+            if expecting == 'separator':
+                if char == ']':
+                    return
+                if char == ',':
+                    buffer = buffer[1:]
+                    expecting = 'element'
+                    continue
+                error = '批量数据格式错误：案件之间缺少逗号'
+            elif char == ']' and expecting == 'first':
+                return
+            elif char in ',]':
+                # 连续的逗号、数组开头或末尾多余的逗号
+                yield index, None, '批量数据格式错误：多余的逗号'
+                index += 1
+                expecting = 'separator'
+                continue
             else:
-                display_levels.append(f"{level}级×{count}")
-        detail_parts = [f"伤残等级：{', '.join(display_levels)}\n"]
-        detail_parts.append(f"最高伤残等级：1级，系数：1.00（100%）\n")
-        detail_parts.append("1级伤残系数为100%，无需附加指数\n")
-        detail_parts.append("最终伤残系数 = 1.00（100%）")
-        detail = "".join(detail_parts)
-        return 1.0, 1, 0.0, detail
-    
-    additional_index = 0.0
-    display_levels = []
-    for level, count in sorted(level_counts.items()):
-        if count == 1:
-            display_levels.append(f"{level}级")
-        else:
-            display_levels.append(f"{level}级×{count}")
-    
-    detail_parts = [f"伤残等级：{', '.join(display_levels)}\n"]
-    detail_parts.append(f"最高伤残等级：{max_level}级，系数：{max_coefficient:.2f}\n")
-    
-    additional_level_info = {}
-    for level in sorted_levels:
-        if level == max_level:
-            count = level_counts[level] - 1
-            if count > 0:
-                level_coefficient = DISABILITY_COEFFICIENTS.get(level, 0)
-                level_additional = level_coefficient * 0.10
-                total_additional = level_additional * count
-                additional_index += total_additional
-                additional_level_info[level] = {
-                    'count': count,
-                    'coefficient': level_coefficient,
-                    'additional_per_unit': level_additional,
-                    'total_additional': total_additional
-                }
-        elif level != 1:
-            count = level_counts[level]
-            level_coefficient = DISABILITY_COEFFICIENTS.get(level, 0)
-            level_additional = level_coefficient * 0.10
-            total_additional = level_additional * count
-            additional_index += total_additional
-            additional_level_info[level] = {
-                'count': count,
-                'coefficient': level_coefficient,
-                'additional_per_unit': level_additional,
-                'total_additional': total_additional
-            }
-    
-    if additional_level_info:
-        detail_parts.append("附加伤残等级：")
-        info_list = []
-        for level in sorted(additional_level_info.keys()):
-            info = additional_level_info[level]
-            if info['count'] == 1:
-                info_list.append(f"{level}级（赔偿系数{info['coefficient']:.2f}，附加{info['additional_per_unit']*100:.2f}%）")
+                try:
+                    payload, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError as e:
+                    incomplete = _maybe_incomplete(buffer, e)
+                    if incomplete and len(buffer) <= max_item_size and not exhausted and read_more():
+                        continue
+                    if incomplete and exhausted:
+                        yield index, None, f'批量数据格式错误：{e.msg}'
+                        return
+                    error = too_large if incomplete else f'案件数据格式错误：{e.msg}'
+                else:
+                    buffer = buffer[end:]
+                    yield (index, None, too_large) if end > max_item_size else (index, payload, None)
+                    index += 1
+                    expecting = 'separator'
+                    continue
+            # 格式错误的案件：报告错误后跳到下一个逗号或数组结尾
+            yield index, None, error
+            index += 1
+            error = skip_element(None if error == too_large else max_item_size)
+            if error is not None:
+                yield index, None, error
+                return
+            expecting = 'separator'
+    else:
+        # NDJSON：每行一个案件，单行格式错误不影响其他案件
+        while True:
+            newline = buffer.find('\n')
+            if newline < 0:
+                if len(buffer) > max_item_size and not exhausted:
+                    # 行过长：报告错误，逐块丢弃到下一个换行符
+                    yield index, None, too_large
+                    index += 1
+                    buffer = ''
+                    while read_more():
+                        newline = buffer.find('\n')
+                        buffer = buffer[newline + 1:] if newline >= 0 else ''
+                        if newline >= 0:
+                            break
+                    if not buffer and exhausted:
+                        return
+                    continue
+                if not exhausted and read_more():
+                    continue
+                line, buffer = buffer, ''
             else:
-                info_list.append(f"{level}级×{info['count']}（赔偿系数{info['coefficient']:.2f}，每处附加{info['additional_per_unit']*100:.2f}%，合计{info['total_additional']*100:.2f}%）")
-        detail_parts.append("、".join(info_list))
-        
-        original_additional_index = additional_index
-        additional_index = min(additional_index, 0.10)
-        
-        if original_additional_index > 0.10:
-            detail_parts.append(f"\n附加指数合计：{original_additional_index * 100:.2f}%，超过10%上限，按10%计算\n")
-        else:
-            detail_parts.append(f"\n附加指数合计：{additional_index * 100:.2f}%\n")
+                line, buffer = buffer[:newline], buffer[newline + 1:]
+            line = line.strip()
+            if line:
+                if len(line) > max_item_size:
+                    yield index, None, too_large
+                else:
+                    try:
+                        yield index, json.loads(line), None
+                    except json.JSONDecodeError as e:
+                        yield index, None, f'案件数据格式错误：{e.msg}'
+                index += 1
+            if not buffer and exhausted:
+                return
+
+
+@app.before_request
+def start_request_metrics():
+    """记录请求开始（运行指标按路由规则统计）"""
+    g.metrics_route = request.url_rule.rule if request.url_rule is not None else '未匹配'
+    g.metrics_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(g.metrics_route)
+
+
+@app.after_request
+def record_response_metrics(response):
+    """记录状态码和响应字节数（在压缩之后执行）"""
+    g.metrics_status = response.status_code
+    if response.content_length is not None and 'metrics_route' in g:
+        RESPONSE_BYTES.observe(response.content_length, g.metrics_route)
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    """记录请求数、耗时；未捕获的异常按类型计数"""
+    route = g.pop('metrics_route', None)
+    if route is None:
+        return
+    REQUESTS_IN_FLIGHT.dec(route)
+    REQUEST_SECONDS.observe(time.perf_counter() - g.metrics_started, route)
+    REQUESTS.inc(route, request.method, str(500 if exc is not None else g.get('metrics_status', 500)))
+    if exc is not None:
+        ERRORS.inc(route, type(exc).__name__)
+
+
+def count_error(e):
+    """记录路由中捕获的异常（按异常类型计数）"""
+    ERRORS.inc(g.get('metrics_route', '未匹配'), type(e).__name__)
+
+
+def render_index():
+    """主页内容及ETag；页面只随最新一套标准的行业列表变化，标准版本不变时直接使用已渲染的页面"""
+    global index_page
+    version = standards_version()
+    page = index_page
+    if page is None or page[0] != version:
+        html = render_template('index.html',
+                               industry_salaries=list(REGISTRY.latest.industry_salaries.keys()),
+                               asset_url=static_assets.url).encode('utf-8')
+        page = index_page = (version, html, hashlib.sha256(html).hexdigest())
+    return page[1], page[2]
+
+
+@app.route('/')
+def index():
+    """主页（当天日期由页面脚本填写）；请求头 If-None-Match 与 ETag 相同时返回 304"""
+    html, etag = render_index()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
     else:
-        detail_parts.append("无附加伤残等级\n")
-    
-    final_coefficient = min(max_coefficient + additional_index, 1.0)
-    detail_parts.append(f"最终伤残系数 = {max_coefficient:.2f} + {additional_index:.2f} = {final_coefficient:.2f}")
-    if final_coefficient >= 1.0:
-        detail_parts.append("（已达到100%上限）")
-    
-    detail = "".join(detail_parts)
-    return final_coefficient, max_level, additional_index, detail
+        response = Response(html, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
-def calculate_work_loss_fee(data):
-    """计算误工费"""
-    work_loss_days = get_int_value(data.get('work_loss_days', 0))
-    if work_loss_days <= 0:
-        return 0, "误工天数为0，不计算误工费"
-    
-    income_type = data.get('work_income_type', '固定收入')
-    
-    if income_type == "固定收入":
-        monthly_income = get_float_value(data.get('monthly_income', 0))
-        if monthly_income > 0:
-            daily_income = monthly_income / 30
-            amount = daily_income * work_loss_days
-            detail = f"固定收入计算：\n月收入：{monthly_income:,.2f}元\n日均收入 = 月收入 ÷ 30 = {monthly_income:,.2f} ÷ 30 = {daily_income:,.2f}元/天\n误工费 = 日均收入 × 误工天数 = {daily_income:,.2f} × {work_loss_days} = {amount:,.2f}元"
-            return amount, detail
-        else:
-            return 0, "月收入为0，不计算误工费"
+@app.route('/static/<filename>')
+def static_asset(filename):
+    """页面的CSS、JS（文件名含内容摘要，可长期缓存）；按请求头 Accept-Encoding 返回预先压缩的内容"""
+    asset = static_assets.get(filename)
+    if asset is None:
+        return Response('Not Found', status=404, mimetype='text/plain')
+    encoding = negotiate(request.accept_encodings)
+    if encoding not in asset.encoded:
+        encoding = None
+    if request.if_none_match.contains_weak(asset.etag):
+        response = Response(status=304)
+    elif encoding is None:
+        response = Response(asset.content, mimetype=asset.mimetype)
+    else:
+        response = Response(asset.encoded[encoding], mimetype=asset.mimetype)
+        response.headers['Content-Encoding'] = encoding
+        compression_stats.record(encoding, len(asset.content), len(asset.encoded[encoding]))
+    response.set_etag(asset.etag, weak=encoding is not None)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.after_request
+def compress(response):
+    """压缩超过 COMPRESS_MIN_SIZE 的HTML、JSON等响应（见 compression 模块）"""
+    if app.config['COMPRESS_LEVEL'] > 0:
+        compress_response(response, request.accept_encodings, app.config['COMPRESS_MIN_SIZE'],
+                          app.config['COMPRESS_LEVEL'], compression_stats)
+    return response
+
+
+@app.route('/healthz')
+def healthz():
+    """存活检查：进程能处理请求即返回，不做其他检查"""
+    return 'ok', 200, {'Content-Type': 'text/plain; charset=utf-8', 'Cache-Control': 'no-store'}
+
+
+@app.route('/readyz')
+def readyz():
+    """
+    就绪检查：赔偿标准已加载、导出工作进程池已启动并完成初始化、未完成的导出任务数低于阈值时返回200，否则返回503
+
+    进程池尚未启动时由本检查启动（预热），初始化完成前报告未就绪。
+    """
+    pending = export_queue.pending_count()
+    if not export_queue.is_warm():
+        export_queue.warm()
+    checks = {
+        'standards': len(REGISTRY) > 0,
+        'export_pool': export_queue.is_warm(),
+        'export_queue': pending < app.config['READY_QUEUE_THRESHOLD'],
+    }
+    ready = all(checks.values())
+    response = jsonify({
+        'ready': ready,
+        'checks': checks,
+        'standards_version': standards_version(),
+        'pending_exports': pending,
+        'queue_threshold': app.config['READY_QUEUE_THRESHOLD'],
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response, 200 if ready else 503
+
+
+@app.route('/api/calculate', methods=['POST'])
+def calculate():
+    """计算赔偿API"""
+    try:
+        data = request.json
+        case = CaseInput.from_dict(data)
+        with_details = not is_totals_only(data)
+        version = standards_version()
+        result, hit = result_cache.get_or_compute(
+            case_cache_key(case, version, with_details), version,
+            lambda: calculate_compensation(case, with_details))
+        response = jsonify({**result.to_dict(), 'calculation_id': store_calculation(result, version)})
+        response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
     
-    elif income_type == "无固定收入（能证明最近三年平均）":
-        avg_daily_income = get_float_value(data.get('avg_daily_income', 0))
-        if avg_daily_income > 0:
-            amount = avg_daily_income * work_loss_days
-            detail = f"无固定收入（能证明最近三年平均）计算：\n最近三年平均日均收入：{avg_daily_income:,.2f}元/天\n误工费 = 日均收入 × 误工天数 = {avg_daily_income:,.2f} × {work_loss_days} = {amount:,.2f}元"
-            return amount, detail
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        count_error(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/recalculate', methods=['POST'])
+def recalculate():
+    """增量重算API
+
+    请求数据：calculation_id（/api/calculate 返回的计算编号）、changes（修改的字段，字段名与 /api/calculate 相同）；
+    只重算受修改字段影响的项目和总计，返回新的计算结果、计算编号及重算的项目（recalculated_items）。
+    """
+    try:
+        data = request.json
+        entry = load_calculation(data.get('calculation_id'))
+        if entry is None:
+            return jsonify({
+                'success': False,
+                'error': '计算结果不存在或已过期，请重新计算'
+            }), 404
+        
+        previous, previous_version = entry
+        changes = data.get('changes') or {}
+        with_details = not is_totals_only(data)
+        version = standards_version()
+        if version != previous_version:
+            # 赔偿标准已更新，全部重算
+            result = calculate_compensation(previous.case.updated(changes), with_details)
+            recalculated = list(ITEM_DEPENDENCIES)
         else:
-            return 0, "日均收入为0，不计算误工费"
+            result, recalculated = recalculate_compensation(previous, changes, with_details)
+        
+        return jsonify({
+            **result.to_dict(),
+            'calculation_id': store_calculation(result, version),
+            'recalculated_items': recalculated
+        })
     
-    else:
-        selected_industry = data.get('industry_type', '其他行业')
-        industry_avg_salary = INDUSTRY_SALARIES.get(selected_industry, INDUSTRY_SALARIES['其他行业'])
-        daily_avg_salary = industry_avg_salary / 365
-        amount = daily_avg_salary * work_loss_days
-        detail = f"无固定收入（不能证明，参照行业平均）计算\n选择行业：{selected_industry}\n行业平均工资：{industry_avg_salary:,.2f}元/年\n日均工资 = 年工资 ÷ 365 = {industry_avg_salary:,.2f} ÷ 365 = {daily_avg_salary:,.2f}元/天\n误工费 = 日均工资 × 误工天数 = {daily_avg_salary:,.2f} × {work_loss_days} = {amount:,.2f}元"
-        return amount, detail
-
-
-def calculate_nursing_fee(data):
-    """计算护理费"""
-    nursing_days = get_int_value(data.get('nursing_days', 0))
-    nursing_count = get_int_value(data.get('nursing_count', 1))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        count_error(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/cache_stats')
+def cache_stats():
+    """计算结果缓存统计（命中/未命中次数等），export_cache 为导出文件缓存的统计"""
+    stats = result_cache.stats()
+    stats['export_cache'] = export_cache.stats()
+    return jsonify(stats)
+
+
+@app.route('/metrics')
+def metrics_api():
+    """运行指标（Prometheus 文本格式）"""
+    snapshot = shared_metrics.collect() if shared_metrics is not None else None
+    return Response(METRICS.render(snapshot), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/compression_stats')
+def compression_stats_api():
+    """响应压缩统计：各压缩方式的响应数、压缩前后字节数、节省的字节数、压缩用的CPU时间（秒）"""
+    return jsonify(compression_stats.stats())
+
+
+@app.route('/api/calculate_batch', methods=['POST'])
+def calculate_batch():
+    """批量计算赔偿API
+
+    请求体为NDJSON（每行一个案件）或JSON数组，字段与 /api/calculate 相同；
+    响应为NDJSON，每计算完一个案件输出一行，单个案件出错不影响其他案件。
+    请求参数 totals_only=1 时只返回金额，不生成计算详情；
+    money=cents 时以整数分计算（见 cents_engine），只返回 results_cents（各项目金额，单位为分）。
+    """
+    stream = request.stream
+    with_details = not is_totals_only()
+    cents_mode = request.args.get('money') == 'cents'
     
-    if nursing_days <= 0:
-        return 0, "护理天数为0，不计算护理费"
+    def generate():
+        for index, payload, error in iter_batch_payloads(stream, max_item_size=app.config['BATCH_ITEM_MAX_SIZE']):
+            if error is None and not isinstance(payload, dict):
+                error = '案件数据必须为JSON对象'
+            if error is not None:
+                line = {'index': index, 'success': False, 'error': error}
+            else:
+                try:
+                    case = CaseInput.from_dict(payload)
+                    if cents_mode:
+                        line = {'index': index, 'success': True,
+                                'results_cents': calculate_compensation_cents(case),
+                                'victim_name': case.victim_name, 'victim_age': case.victim_age}
+                    else:
+                        line = {'index': index, **calculate_compensation(case, with_details).to_dict()}
+                except Exception as e:
+                    line = {'index': index, 'success': False, 'error': str(e)}
+            yield json.dumps(line, ensure_ascii=False) + '\n'
     
-    nursing_type = data.get('nursing_type', '无收入或雇佣护工')
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def report_backend(data):
+    """报告生成方式：JSON字段或请求参数 backend，缺省使用 REPORT_BACKEND 配置"""
+    return data.get('backend') or request.args.get('backend') or app.config['REPORT_BACKEND']
+
+
+def unsupported_backend(backend):
+    """生成方式不受支持时返回400响应，否则返回 None"""
+    if backend in REPORT_BACKENDS:
+        return None
+    return jsonify({
+        'success': False,
+        'error': f"不支持的报告生成方式：{backend}（可选：{'、'.join(REPORT_BACKENDS)}）"
+    }), 400
+
+
+def report_download_name(victim_name):
+    """导出文件名"""
+    return f"{victim_name if victim_name != '未填写' else '赔偿'}计算结果.docx"
+
+
+def posted_report(data):
+    """请求中直接给出的报告内容，返回 (报告内容, 计算依据所列的赔偿标准)"""
+    report = {
+        'results': data.get('results', {}),
+        'details': data.get('details', {}),
+        'victim_name': data.get('victim_name', '未填写'),
+        'victim_age': data.get('victim_age', 0),
+        'accident_date': data.get('accident_date', datetime.now().strftime('%Y-%m-%d')),
+    }
+    return report, REGISTRY.for_date(report['accident_date'])
+
+
+def stored_report(calculation_id, data):
+    """
+    按计算编号取得报告内容，返回 (报告内容, 计算依据所列的赔偿标准)；计算结果不存在或已过期返回 (None, None)
+
+    accident_date（请求参数或JSON字段）为报告中显示的事故发生日期，缺省为计算时填写的日期。
+    """
+    entry = load_calculation(calculation_id)
+    if entry is None:
+        return None, None
     
-    if nursing_type == "有收入":
-        nursing_income = get_float_value(data.get('nursing_income', 0))
-        if nursing_income > 0:
-            amount = nursing_income * nursing_days * nursing_count
-            detail = f"护理人员有收入计算：\n护理人员日均收入：{nursing_income:,.2f}元/天\n护理天数：{nursing_days}天\n护理人数：{nursing_count}人\n护理费 = 日均收入 × 护理天数 × 护理人数 = {nursing_income:,.2f} × {nursing_days} × {nursing_count} = {amount:,.2f}元"
-            return amount, detail
-        else:
-            return 0, "护理人员日均收入为0，不计算护理费"
-    else:
-        nursing_fee_per_day = STANDARDS['daily_nursing_fee']
-        amount = nursing_fee_per_day * nursing_days * nursing_count
-        detail = f"无收入或雇佣护工计算：\n护工标准：{nursing_fee_per_day:,.2f}元/天\n护理天数：{nursing_days}天\n护理人数：{nursing_count}人\n护理费 = 护工标准 × 护理天数 × 护理人数 = {nursing_fee_per_day:,.2f} × {nursing_days} × {nursing_count} = {amount:,.2f}元"
-        return amount, detail
+    result, version = entry
+    if version != standards_version():
+        # 赔偿标准已更新，按新标准重算
+        result = calculate_compensation(result.case)
+    # 仅金额模式的计算结果在这里生成计算详情（不修改保存的计算结果）
+    details = result.details if result.details is not None else calculate_compensation(result.case).details
+    accident_date = (data.get('accident_date') or request.args.get('accident_date')
+                     or result.case.accident_date or datetime.now().strftime('%Y-%m-%d'))
+    report = {
+        'results': result.results,
+        'details': details,
+        'victim_name': result.victim_name,
+        'victim_age': result.victim_age,
+        'accident_date': accident_date,
+    }
+    return report, standard_set_for(result.case)
 
 
-def calculate_dependent_living_expense(data, victim_age, disability_coefficient=1.0, is_death=False):
-    """计算被扶养人生活费"""
-    dependent_info_str = data.get('dependent_info', '').strip()
-    if not dependent_info_str:
-        return 0, "未填写被扶养人信息，不计算被扶养人生活费"
+def send_report(results, details, victim_name, victim_age, accident_date, backend, standard_set=None):
+    """
+    生成（或从导出缓存取出）Word报告并返回下载响应
+
+    同样的报告内容生成的文件相同，按内容缓存（响应头 X-Cache 表示是否命中），ETag 为缓存键；
+    请求头 If-None-Match 与之相同时返回 304（导出不修改任何数据，POST 也按条件请求处理）。
+    standard_set 为计算依据所列的赔偿标准，缺省时按事故发生日期选取。生成方式不受支持时返回400。
+    """
+    error = unsupported_backend(backend)
+    if error is not None:
+        return error
+    standard_set = standard_set or REGISTRY.for_date(accident_date)
+    key = export_cache_key(results, details, victim_name, victim_age, accident_date,
+                           report_template_version(standard_set), backend)
+    if request.if_none_match.contains(key):
+        response = Response(status=304)
+        response.set_etag(key)
+        return response
     
-    base_consumption = STANDARDS['consumption']
-    consumption_type = "广西上一年度城镇居民人均消费支出"
+    content = export_cache.get(key)
+    hit = content is not None
+    if content is None:
+        # 生成Word文档写入内存缓冲区直接返回，超大报告才转存到临时目录（关闭后自动删除）
+        buffer = new_export_buffer(app.config['EXPORT_SPILL_THRESHOLD'], app.config['EXPORT_TEMP_DIR'])
+        write_report(buffer, results, details, victim_name, victim_age, accident_date,
+                     standard_set=standard_set, backend=backend)
+        REPORT_BYTES.observe(buffer.tell(), 'single', backend)
+        buffer.seek(0)
+        export_janitor.ensure_started()
+        if not is_spilled(buffer):
+            content = buffer.read()
+            buffer.close()
+            export_cache.put(key, content)
     
-    dependents = []
+    response = send_file(io.BytesIO(content) if content is not None else buffer, as_attachment=True,
+                         download_name=report_download_name(victim_name),
+                         mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+                         etag=key)
+    response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+@app.route('/api/export_word', methods=['POST'])
+def export_word():
+    """导出Word文档API（请求中包含计算结果和计算详情）
+
+    报告生成方式由JSON字段或请求参数 backend 指定（docx 或 ooxml），缺省使用 REPORT_BACKEND 配置。
+    """
     try:
-        for item in dependent_info_str.split(';'):
-            item = item.strip()
-            if not item:
-                continue
-            if ',' in item:
-                parts = item.split(',')
-                age = int(parts[0].strip())
-                support_count = int(parts[1].strip()) if len(parts) > 1 else 1
-                dependents.append({'age': age, 'support_count': support_count})
-            else:
-                age = int(item)
-                dependents.append({'age': age, 'support_count': 1})
-    except ValueError:
-        return 0, "被扶养人信息格式错误"
-    
-    if not dependents:
-        return 0, "未填写被扶养人信息，不计算被扶养人生活费"
+        data = request.json
+        report, standard_set = posted_report(data)
+        return send_report(**report, backend=report_backend(data), standard_set=standard_set)
     
-    dependent_expenses = []
-    detail_parts = [f"{consumption_type}：{base_consumption:,.2f}元/年\n"]
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        count_error(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/export_word/<calculation_id>', methods=['GET', 'POST'])
+def export_word_by_id(calculation_id):
+    """按计算编号导出Word文档API
+
+    计算结果取自服务器保存的计算（/api/calculate 返回的 calculation_id），客户端不需要回传金额和计算详情，
+    也无法修改报告中的金额。可选参数（请求参数或JSON字段）：accident_date（报告中显示的事故发生日期，
+    缺省为计算时填写的日期）、backend（报告生成方式）。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        report, standard_set = stored_report(calculation_id, data)
+        if report is None:
+            return jsonify({
+                'success': False,
+                'error': '计算结果不存在或已过期，请重新计算'
+            }), 404
+        return send_report(**report, backend=report_backend(data), standard_set=standard_set)
     
-    for idx, dep in enumerate(dependents):
-        age = dep['age']
-        support_count = dep['support_count']
-        
-        if age < 18:
-            years = 18 - age
-            age_desc = f"不满18周岁，按(18-{age})年计算"
-        elif age >= 18 and age < 60:
-            years = 20
-            age_desc = f"18-60周岁（无劳动能力），按20年计算"
-        elif age >= 60 and age < 75:
-            years = 20 - (age - 60)
-            age_desc = f"60-75周岁，按[20-({age}-60)]={years}年计算"
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        count_error(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/export_jobs', methods=['POST'])
+def submit_export_job():
+    """提交异步导出任务API
+
+    请求数据：calculation_id（可附 accident_date），或与 /api/export_word 相同的报告内容；可选 backend。
+    返回 202 及任务编号，之后通过 /api/export_jobs/<job_id> 查询状态，完成后从 /api/export_jobs/<job_id>/download 下载；
+    未完成的任务数达到上限时返回 429。
+    """
+    try:
+        data = request.json or {}
+        if data.get('calculation_id'):
+            report, standard_set = stored_report(data['calculation_id'], data)
+            if report is None:
+                return jsonify({
+                    'success': False,
+                    'error': '计算结果不存在或已过期，请重新计算'
+                }), 404
         else:
-            years = 5
-            age_desc = f"75周岁以上，按5年计算"
-        
-        if years <= 0:
-            continue
-        
-        annual_expense_per_dependent = base_consumption / support_count
-        dependent_expenses.append({
-            'age': age,
-            'years': years,
-            'support_count': support_count,
-            'annual_expense': annual_expense_per_dependent
-        })
-        
-        detail_parts.append(f"被扶养人{idx+1}：{age}岁，{age_desc}，扶养人数{support_count}人\n年生活费 = {base_consumption:,.2f} ÷ {support_count} = {annual_expense_per_dependent:,.2f}元/年\n")
+            report, standard_set = posted_report(data)
+        
+        backend = report_backend(data)
+        error = unsupported_backend(backend)
+        if error is not None:
+            return error
+        key = export_cache_key(report['results'], report['details'], report['victim_name'], report['victim_age'],
+                               report['accident_date'], report_template_version(standard_set), backend)
+        try:
+            job = export_queue.submit(report, standard_set.effective_from, backend,
+                                      report_download_name(report['victim_name']), key)
+        except QueueFullError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 429
+        return jsonify({'success': True, **job.to_dict()}), 202
     
-    if not dependent_expenses:
-        return 0, "被扶养人信息无效"
-    
-    max_years = max(exp['years'] for exp in dependent_expenses)
-    total_expense = 0
-    year_details = []
-    
-    for year in range(max_years):
-        year_total = 0
-        active_deps = []
-        for exp in dependent_expenses:
-            if year < exp['years']:
-                year_total += exp['annual_expense']
-                active_deps.append(f"{exp['age']}岁")
-        
-        original_total = year_total
-        year_total = min(year_total, base_consumption)
-        total_expense += year_total
-        
-        if year_total > 0:
-            if original_total > base_consumption:
-                year_details.append(f"第{year+1}年：{'+'.join(active_deps)}的年生活费合计{original_total:,.2f}元，超过{base_consumption:,.2f}元，按{base_consumption:,.2f}元计算")
-            else:
-                year_details.append(f"第{year+1}年：{'+'.join(active_deps)}的年生活费合计{year_total:,.2f}元")
-    
-    year_amounts = []
-    for year in range(max_years):
-        year_total = 0
-        for exp in dependent_expenses:
-            if year < exp['years']:
-                year_total += exp['annual_expense']
-        year_total = min(year_total, base_consumption)
-        if year_total > 0:
-            year_amounts.append(f"{year_total:,.2f}")
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        count_error(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/export_jobs', methods=['GET'])
+def export_job_stats():
+    """异步导出任务队列统计（排队、运行中、已完成的任务数，平均生成耗时等）"""
+    return jsonify(export_queue.stats())
+
+
+@app.route('/api/export_jobs/<job_id>', methods=['GET'])
+def export_job_status(job_id):
+    """查询异步导出任务状态API：status 为 queued、running、done、failed 或 cancelled，含各阶段耗时（秒）"""
+    job = export_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': '导出任务不存在或已过期'
+        }), 404
+    return jsonify({'success': True, **job.to_dict()})
+
+
+@app.route('/api/export_jobs/<job_id>', methods=['DELETE'])
+def cancel_export_job(job_id):
+    """取消异步导出任务API"""
+    job = export_queue.cancel(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': '导出任务不存在或已过期'
+        }), 404
+    return jsonify({'success': True, **job.to_dict()})
+
+
+@app.route('/api/export_jobs/<job_id>/download', methods=['GET'])
+def download_export_job(job_id):
+    """下载异步导出任务生成的Word文档API；任务未完成时返回 409"""
+    job = export_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': '导出任务不存在或已过期'
+        }), 404
+    if job.status != DONE:
+        return jsonify({
+            **job.to_dict(),
+            'success': False,
+            'error': '导出任务尚未完成'
+        }), 409
+    return send_file(io.BytesIO(job.content), as_attachment=True, download_name=job.download_name,
+                     mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+                     etag=job.cache_key)
+
+
+@app.route('/api/export_archive', methods=['POST'])
+def export_archive():
+    """批量导出Word文档API（zip压缩包）
+
+    请求体为NDJSON或JSON数组（格式同 /api/calculate_batch），每个元素为以下之一：
+    calculation_id（可附 accident_date）、与 /api/export_word 相同的报告内容（含 results）、与 /api/calculate 相同的案件数据。
+    报告在导出工作进程中并行生成，每完成一份即压缩写入并发送，压缩包中的文件按提交顺序编号；
+    无法导出的条目列在压缩包中的“导出失败.txt”。请求参数 backend 指定报告生成方式。
+    """
+    stream = request.stream
+    backend = report_backend({})
+    error = unsupported_backend(backend)
+    if error is not None:
+        return error
     
-    total_formula = " + ".join(year_amounts) if year_amounts else "0"
-    original_total = total_expense
-    total_expense = total_expense * disability_coefficient
+    def items():
+        for index, payload, error in iter_batch_payloads(stream, max_item_size=app.config['BATCH_ITEM_MAX_SIZE']):
+            if error is None and not isinstance(payload, dict):
+                error = '导出数据必须为JSON对象'
+            if error is not None:
+                yield None, None, error
+                continue
+            try:
+                if payload.get('calculation_id'):
+                    report, standard_set = stored_report(payload['calculation_id'], payload)
+                    if report is None:
+                        yield None, None, '计算结果不存在或已过期，请重新计算'
+                        continue
+                elif 'results' in payload:
+                    report, standard_set = posted_report(payload)
+                else:
+                    report, standard_set = case_report(CaseInput.from_dict(payload))
+            except Exception as e:
+                yield None, None, str(e)
+                continue
+            yield report, standard_set, None
     
-    if is_death:
-        detail = "".join(detail_parts) + "\n按年计算明细：\n" + "\n".join(year_details) + f"\n\n小计 = " + total_formula + f" = {original_total:,.2f}元\n受害人死亡，系数为100%（无需乘以伤残系数）\n被扶养人生活费 = 小计 × 100% = {original_total:,.2f} × 1.0 = {total_expense:,.2f}元"
-    elif disability_coefficient < 1.0:
-        detail = "".join(detail_parts) + "\n按年计算明细：\n" + "\n".join(year_details) + f"\n\n小计 = " + total_formula + f" = {original_total:,.2f}元\n伤残系数：{disability_coefficient:.2f}\n被扶养人生活费 = 小计 × 伤残系数 = {original_total:,.2f} × {disability_coefficient:.2f} = {total_expense:,.2f}元"
-    else:
-        detail = "".join(detail_parts) + "\n按年计算明细：\n" + "\n".join(year_details) + f"\n\n总计 = " + total_formula + f" = {total_expense:,.2f}元"
+    archive = iter_report_archive(items(), queue=export_queue, window=app.config['EXPORT_ARCHIVE_WINDOW'],
+                                  backend=backend, cache=export_cache)
+    response = Response(stream_with_context(archive), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f"attachment; filename=reports.zip; filename*=UTF-8''{quote('赔偿计算报告.zip')}"
+    return response
+
+
+@app.route('/api/calculate_incident', methods=['POST'])
+def calculate_incident_api():
+    """事故计算API（一起事故、多名受害人）
+
+    请求数据：incident_name（事故名称）、accident_date（事故发生日期，全部受害人共用）、
+    defendants（赔偿义务人，列表或以顿号分隔的字符串）、victims（各受害人的数据，字段与 /api/calculate 相同）；
+    返回各受害人的计算结果、各项目合计（totals）及事故编号（incident_id，供导出合并报告）。
+    支持仅金额模式（totals_only）。
+    """
+    try:
+        data = request.json or {}
+        incident = IncidentInput.from_dict(data)
+        result = compute_incident(incident, not is_totals_only(data))
+        incident_id = store_incident(result, standards_version())
+        return jsonify({**result.to_dict(), 'incident_id': incident_id})
     
-    return total_expense, detail
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        count_error(e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 
-@app.route('/')
-def index():
-    """主页"""
-    return render_template('index.html', 
-                         industry_salaries=list(INDUSTRY_SALARIES.keys()),
-                         standards=STANDARDS,
-                         current_date=datetime.now().strftime('%Y-%m-%d'))
+def send_incident_report(result, backend):
+    """生成事故合并报告并返回下载响应（受害人很多时宜使用 ooxml 方式，逐名受害人流式写出）；生成方式不受支持时返回400"""
+    error = unsupported_backend(backend)
+    if error is not None:
+        return error
+    buffer = new_export_buffer(app.config['EXPORT_SPILL_THRESHOLD'], app.config['EXPORT_TEMP_DIR'])
+    write_incident_report(buffer, result, backend=backend)
+    REPORT_BYTES.observe(buffer.tell(), 'incident', backend)
+    buffer.seek(0)
+    export_janitor.ensure_started()
+    name = result.incident.incident_name
+    return send_file(buffer, as_attachment=True, download_name=f"{name if name != '未填写' else '事故'}赔偿计算结果.docx",
+                     mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
 
 
-@app.route('/api/calculate', methods=['POST'])
-def calculate():
-    """计算赔偿API"""
+@app.route('/api/export_incident_word', methods=['POST'])
+def export_incident_word():
+    """导出事故合并报告API（请求数据与 /api/calculate_incident 相同，可选 backend）
+
+    计算时不生成计算详情，写入各受害人内容时才逐个生成，内存占用不随受害人数增长。
+    """
     try:
-        data = request.json
-        results = {}
-        calculation_details = {}
-        
-        victim_name = data.get('victim_name', '').strip() or "未填写"
-        victim_age = get_int_value(data.get('victim_age', 0))
-        
-        # 1. 医疗费
-        medical_expense = get_float_value(data.get('medical_expense', 0))
-        results['医疗费'] = medical_expense
-        if medical_expense > 0:
-            calculation_details['医疗费'] = f"医疗费 = 诊疗费 + 医药费 + 住院费 = {medical_expense:,.2f}元"
-        
-        # 2. 后续治疗费
-        follow_up_treatment_fee = get_float_value(data.get('follow_up_treatment_fee', 0))
-        results['后续治疗费'] = follow_up_treatment_fee
-        if follow_up_treatment_fee > 0:
-            calculation_details['后续治疗费'] = f"后续治疗费 = {follow_up_treatment_fee:,.2f}元"
-        
-        # 3. 住院伙食补助费
-        hospital_days = get_int_value(data.get('hospital_days', 0))
-        meal_subsidy_per_day = get_float_value(data.get('meal_subsidy', STANDARDS['daily_meal_subsidy']))
-        meal_subsidy_total = hospital_days * meal_subsidy_per_day
-        results['住院伙食补助费'] = meal_subsidy_total
-        if meal_subsidy_total > 0:
-            calculation_details['住院伙食补助费'] = f"住院天数：{hospital_days}天\n补助标准：{meal_subsidy_per_day:,.2f}元/天\n住院伙食补助费 = 住院天数 × 补助标准 = {hospital_days} × {meal_subsidy_per_day:,.2f} = {meal_subsidy_total:,.2f}元"
-        
-        # 4. 营养费
-        nutrition_fee = get_float_value(data.get('nutrition_fee', 0))
-        results['营养费'] = nutrition_fee
-        if nutrition_fee > 0:
-            calculation_details['营养费'] = f"营养费 = {nutrition_fee:,.2f}元"
-        
-        # 5. 交通费
-        traffic_fee = get_float_value(data.get('traffic_fee', 0))
-        results['交通费'] = traffic_fee
-        if traffic_fee > 0:
-            calculation_details['交通费'] = f"交通费 = {traffic_fee:,.2f}元"
-        
-        # 6. 住宿费
-        accommodation_days = get_int_value(data.get('accommodation_days', 0))
-        accommodation_fee_per_day = STANDARDS['daily_accommodation_fee']
-        accommodation_fee = accommodation_days * accommodation_fee_per_day
-        results['住宿费'] = accommodation_fee
-        if accommodation_fee > 0:
-            calculation_details['住宿费'] = f"住宿天数：{accommodation_days}天\n住宿费标准：{accommodation_fee_per_day:,.2f}元/天\n住宿费 = 住宿天数 × 住宿费标准 = {accommodation_days} × {accommodation_fee_per_day:,.2f} = {accommodation_fee:,.2f}元"
-        
-        # 7. 误工费
-        work_loss_fee, work_detail = calculate_work_loss_fee(data)
-        results['误工费'] = work_loss_fee
-        calculation_details['误工费'] = work_detail
-        
-        # 8. 护理费
-        nursing_fee_total, nursing_detail = calculate_nursing_fee(data)
-        results['护理费'] = nursing_fee_total
-        calculation_details['护理费'] = nursing_detail
-        
-        # 9. 残疾赔偿金
-        disability_level_str = data.get('disability_level', '').strip() or "无"
-        disability_coefficient, max_level, additional_index, disability_detail = \
-            calculate_multi_disability_coefficient(disability_level_str)
-        
-        if disability_coefficient < 1.0 or (disability_level_str and disability_level_str != "无"):
-            base_income = STANDARDS['disposable_income']
-            income_type = "广西上一年度城镇居民人均可支配收入"
-            years = calculate_compensation_years(victim_age)
-            disability_compensation = base_income * years * disability_coefficient
-            results['残疾赔偿金'] = disability_compensation
-            year_desc = f"{years}年" if victim_age < 60 else (f"{years}年（60周岁以上每增加一岁减少一年）" if victim_age < 75 else f"{years}年（75周岁以上按5年计算）")
-            detail = f"{disability_detail}\n{income_type}：{base_income:,.2f}元/年\n赔偿年限：{year_desc}\n残疾赔偿金 = {income_type} × 赔偿年限 × 伤残系数 = {base_income:,.2f} × {years} × {disability_coefficient:.2f} = {disability_compensation:,.2f}元"
-            calculation_details['残疾赔偿金'] = detail
-        else:
-            results['残疾赔偿金'] = 0
-        
-        # 10. 残疾辅助器具费
-        disability_appliance_fee = get_float_value(data.get('disability_appliance_fee', 0))
-        results['残疾辅助器具费'] = disability_appliance_fee
-        if disability_appliance_fee > 0:
-            calculation_details['残疾辅助器具费'] = f"残疾辅助器具费 = {disability_appliance_fee:,.2f}元"
-        
-        # 11. 被扶养人生活费
-        is_death = data.get('is_death', False)
-        if is_death:
-            dependent_coefficient = 1.0
-        else:
-            dependent_coefficient = disability_coefficient
-        
-        dependent_living_expense, dependent_detail = calculate_dependent_living_expense(
-            data, victim_age, dependent_coefficient, is_death)
-        results['被扶养人生活费'] = dependent_living_expense
-        if dependent_living_expense > 0:
-            calculation_details['被扶养人生活费'] = dependent_detail
-        
-        # 12. 死亡赔偿金
-        if is_death:
-            base_income = STANDARDS['disposable_income']
-            income_type = "广西上一年度城镇居民人均可支配收入"
-            years = calculate_compensation_years(victim_age)
-            death_compensation = base_income * years
-            results['死亡赔偿金'] = death_compensation
-            results['丧葬费'] = STANDARDS['funeral_expense']
-            year_desc = f"{years}年" if victim_age < 60 else (f"{years}年（60周岁以上每增加一岁减少一年）" if victim_age < 75 else f"{years}年（75周岁以上按5年计算）")
-            calculation_details['死亡赔偿金'] = f"{income_type}：{base_income:,.2f}元/年\n赔偿年限：{year_desc}\n死亡赔偿金 = {income_type} × 赔偿年限 = {base_income:,.2f} × {years} = {death_compensation:,.2f}元"
-            calculation_details['丧葬费'] = f"丧葬费 = {STANDARDS['funeral_expense']:,.2f}元"
-        else:
-            results['死亡赔偿金'] = 0
-            results['丧葬费'] = 0
-        
-        # 13. 精神损害抚慰金
-        mental_damage = get_float_value(data.get('mental_damage', 0))
-        results['精神损害抚慰金'] = mental_damage
-        if mental_damage > 0:
-            calculation_details['精神损害抚慰金'] = f"精神损害抚慰金 = {mental_damage:,.2f}元"
-        
-        # 计算总计
-        total = sum(results.values())
-        results['总计'] = total
-        
-        valid_items = [item for item in ['医疗费', '后续治疗费', '误工费', '护理费', '交通费', '住宿费', '住院伙食补助费', 
-                      '营养费', '残疾赔偿金', '残疾辅助器具费', '被扶养人生活费', 
-                      '死亡赔偿金', '丧葬费', '精神损害抚慰金']
-                      if item in results and results[item] > 0]
-        total_formula = " + ".join([f"{results[item]:,.2f}" for item in valid_items])
-        calculation_details['总计'] = f"总计 = {total_formula} = {total:,.2f}元"
-        
-        return jsonify({
-            'success': True,
-            'results': results,
-            'details': calculation_details,
-            'victim_name': victim_name,
-            'victim_age': victim_age
-        })
+        data = request.json or {}
+        result = compute_incident(IncidentInput.from_dict(data), with_details=False)
+        return send_incident_report(result, report_backend(data))
     
     except Exception as e:
         import traceback
         traceback.print_exc()
+        count_error(e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
-@app.route('/api/export_word', methods=['POST'])
-def export_word():
-    """导出Word文档API"""
+@app.route('/api/export_incident_word/<incident_id>', methods=['GET'])
+def export_incident_word_by_id(incident_id):
+    """按事故编号导出事故合并报告API（/api/calculate_incident 返回的 incident_id），请求参数 backend 指定生成方式"""
     try:
-        data = request.json
-        results = data.get('results', {})
-        details = data.get('details', {})
-        victim_name = data.get('victim_name', '未填写')
-        victim_age = data.get('victim_age', 0)
-        accident_date = data.get('accident_date', datetime.now().strftime('%Y-%m-%d'))
-        
-        # 创建临时文件
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.docx', dir='/app/temp')
-        temp_file.close()
-        filename = temp_file.name
-        
-        # 创建Word文档
-        doc = Document()
-        
-        # 设置文档样式
-        style = doc.styles['Normal']
-        font = style.font
-        font.name = '宋体'
-        font.size = Pt(12)
-        font._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-        
-        # 设置页面边距
-        sections = doc.sections
-        for section in sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1.25)
-            section.right_margin = Inches(1.25)
-        
-        # 设置标题样式
-        heading1 = doc.styles['Heading 1']
-        heading1_font = heading1.font
-        heading1_font.name = '黑体'
-        heading1_font.size = Pt(16)
-        heading1_font.bold = True
-        heading1_font._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
-        
-        heading2 = doc.styles['Heading 2']
-        heading2_font = heading2.font
-        heading2_font.name = '黑体'
-        heading2_font.size = Pt(14)
-        heading2_font.bold = True
-        heading2_font._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
-        
-        # 添加页脚（页码）
-        section = doc.sections[0]
-        footer = section.footer
-        footer_para = footer.paragraphs[0]
-        footer_para.clear()
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        p = footer_para._element
-        p_r = OxmlElement('w:pPr')
-        p.append(p_r)
-        
-        r = OxmlElement('w:r')
-        p.append(r)
-        
-        t = OxmlElement('w:t')
-        t.text = '第 '
-        r.append(t)
-        
-        fldChar1 = OxmlElement('w:fldChar')
-        fldChar1.set(qn('w:fldCharType'), 'begin')
-        r.append(fldChar1)
-        
-        instrText = OxmlElement('w:instrText')
-        instrText.set(qn('xml:space'), 'preserve')
-        instrText.text = 'PAGE'
-        r.append(instrText)
-        
-        fldChar2 = OxmlElement('w:fldChar')
-        fldChar2.set(qn('w:fldCharType'), 'end')
-        r.append(fldChar2)
-        
-        r2 = OxmlElement('w:r')
-        p.append(r2)
-        t2 = OxmlElement('w:t')
-        t2.text = ' 页'
-        r2.append(t2)
-        
-        for r_elem in p.findall(qn('w:r')):
-            rPr = OxmlElement('w:rPr')
-            r_elem.insert(0, rPr)
-            font = OxmlElement('w:rFonts')
-            font.set(qn('w:ascii'), '宋体')
-            font.set(qn('w:eastAsia'), '宋体')
-            font.set(qn('w:hAnsi'), '宋体')
-            rPr.append(font)
-            sz = OxmlElement('w:sz')
-            sz.set(qn('w:val'), '20')
-            rPr.append(sz)
-        
-        # 标题
-        title = doc.add_heading('广西人身损害赔偿计算结果', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_run = title.runs[0]
-        title_run.font.name = '黑体'
-        title_run.font.size = Pt(18)
-        title_run.font.bold = True
-        title_run._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
-        
-        doc.add_paragraph()
-        
-        # 基本信息
-        doc.add_heading('一、基本信息', level=1)
-        basic_table = doc.add_table(rows=3, cols=2)
-        basic_table.style = 'Light Grid Accent 1'
-        basic_table.columns[0].width = Inches(2.0)
-        basic_table.columns[1].width = Inches(4.5)
-        
-        basic_info = [
-            ('受害人姓名', victim_name),
-            ('受害人年龄', f"{victim_age}岁"),
-            ('事故发生日期', accident_date),
-        ]
-        
-        for i, (label, value) in enumerate(basic_info):
-            label_cell = basic_table.rows[i].cells[0]
-            label_cell.text = label
-            label_para = label_cell.paragraphs[0]
-            label_para.runs[0].bold = True
-            label_para.runs[0].font.name = '宋体'
-            label_para.runs[0].font.size = Pt(12)
-            label_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            label_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            
-            value_cell = basic_table.rows[i].cells[1]
-            value_cell.text = value
-            value_para = value_cell.paragraphs[0]
-            value_para.runs[0].font.name = '宋体'
-            value_para.runs[0].font.size = Pt(12)
-            value_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-        
-        doc.add_paragraph()
-        
-        # 赔偿明细
-        doc.add_heading('二、赔偿明细及计算公式', level=1)
-        items_order = ['医疗费', '后续治疗费', '误工费', '护理费', '交通费', '住宿费', '住院伙食补助费', 
-                      '营养费', '残疾赔偿金', '残疾辅助器具费', '被扶养人生活费', 
-                      '死亡赔偿金', '丧葬费', '精神损害抚慰金']
-        
-        valid_items = [item for item in items_order if item in results and results[item] > 0]
-        
-        if valid_items:
-            detail_table = doc.add_table(rows=len(valid_items) + 1, cols=4)
-            detail_table.style = 'Light Grid Accent 1'
-            
-            tbl = detail_table._tbl
-            tblPr = tbl.tblPr
-            if tblPr is None:
-                tblPr = OxmlElement('w:tblPr')
-                tbl.insert(0, tblPr)
-            
-            tblW = OxmlElement('w:tblW')
-            tblW.set(qn('w:w'), '0')
-            tblW.set(qn('w:type'), 'auto')
-            tblPr.append(tblW)
-            
-            tblLayout = OxmlElement('w:tblLayout')
-            tblLayout.set(qn('w:type'), 'autofit')
-            tblPr.append(tblLayout)
-            
-            detail_table.columns[0].width = Inches(0.4)
-            detail_table.columns[1].width = Inches(1.0)
-            detail_table.columns[2].width = Inches(1.0)
-            detail_table.columns[3].width = Inches(5.1)
-            
-            for row_idx, row in enumerate(detail_table.rows):
-                for col_idx, cell in enumerate(row.cells):
-                    tcPr = cell._element.tcPr
-                    if tcPr is None:
-                        tcPr = OxmlElement('w:tcPr')
-                        cell._element.insert(0, tcPr)
-                    
-                    if col_idx < 3:
-                        left_right = '80'
-                        top_bottom = '50'
-                    else:
-                        left_right = '120'
-                        top_bottom = '60'
-                    
-                    tcMar = OxmlElement('w:tcMar')
-                    for margin_name, margin_value in [('top', top_bottom), ('left', left_right), 
-                                                      ('bottom', top_bottom), ('right', left_right)]:
-                        margin = OxmlElement(f'w:{margin_name}')
-                        margin.set(qn('w:w'), margin_value)
-                        margin.set(qn('w:type'), 'dxa')
-                        tcMar.append(margin)
-                    tcPr.append(tcMar)
-            
-            header_cells = detail_table.rows[0].cells
-            header_texts = ['序号', '项目', '金额', '计算方式']
-            
-            for idx, cell in enumerate(header_cells):
-                header_text = header_texts[idx]
-                cell.paragraphs[0].clear()
-                para = cell.paragraphs[0]
-                run = para.add_run(header_text)
-                run.bold = True
-                run.font.name = '黑体'
-                run.font.size = Pt(11)
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
-                para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                tcPr = cell._element.get_or_add_tcPr()
-                shading_elm = OxmlElement('w:shd')
-                shading_elm.set(qn('w:fill'), 'E7E6E6')
-                shading_elm.set(qn('w:val'), 'clear')
-                tcPr.append(shading_elm)
-            
-            for idx, item in enumerate(valid_items):
-                row = detail_table.rows[idx + 1]
-                
-                cell0 = row.cells[0]
-                cell0.paragraphs[0].clear()
-                para0 = cell0.paragraphs[0]
-                run0 = para0.add_run(str(idx + 1))
-                run0.font.name = '宋体'
-                run0.font.size = Pt(10)
-                run0._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                para0.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                
-                cell1 = row.cells[1]
-                cell1.paragraphs[0].clear()
-                para1 = cell1.paragraphs[0]
-                run1 = para1.add_run(item)
-                run1.font.name = '宋体'
-                run1.font.size = Pt(10)
-                run1._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                para1.alignment = WD_ALIGN_PARAGRAPH.LEFT
-                
-                cell2 = row.cells[2]
-                cell2.paragraphs[0].clear()
-                para2 = cell2.paragraphs[0]
-                amount_text = f"{results[item]:,.2f}"
-                run2 = para2.add_run(amount_text)
-                run2.font.name = '宋体'
-                run2.font.size = Pt(10)
-                run2._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                para2.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-                
-                cell3 = row.cells[3]
-                cell3.paragraphs[0].clear()
-                para3 = cell3.paragraphs[0]
-                
-                if item in details:
-                    detail = details[item]
-                    if '\n' in detail:
-                        lines = detail.split('\n')
-                        for i, line in enumerate(lines):
-                            if i > 0:
-                                para3 = cell3.add_paragraph()
-                            run3 = para3.add_run(line.strip())
-                            run3.font.name = '宋体'
-                            run3.font.size = Pt(9.5)
-                            run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                    else:
-                        formula_text = detail.replace('；', '\n').replace(';', '\n')
-                        if '\n' in formula_text:
-                            lines = formula_text.split('\n')
-                            for i, line in enumerate(lines):
-                                if i > 0:
-                                    para3 = cell3.add_paragraph()
-                                run3 = para3.add_run(line.strip())
-                                run3.font.name = '宋体'
-                                run3.font.size = Pt(9.5)
-                                run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                        else:
-                            run3 = para3.add_run(formula_text)
-                            run3.font.name = '宋体'
-                            run3.font.size = Pt(9.5)
-                            run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                else:
-                    run3 = para3.add_run(f"{item} = {results[item]:,.2f} 元")
-                    run3.font.name = '宋体'
-                    run3.font.size = Pt(9.5)
-                    run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                
-                para3.alignment = WD_ALIGN_PARAGRAPH.LEFT
-                
-                tr = row._element
-                trPr = tr.get_or_add_trPr()
-                trHeight = OxmlElement('w:trHeight')
-                trHeight.set(qn('w:val'), '300')
-                trHeight.set(qn('w:hRule'), 'atLeast')
-                trPr.append(trHeight)
-            
-            doc.add_paragraph()
-        
-        # 总计
-        doc.add_heading('三、赔偿总额', level=1)
-        total_table = doc.add_table(rows=2, cols=2)
-        total_table.style = 'Light Grid Accent 1'
-        total_table.columns[0].width = Inches(2.0)
-        total_table.columns[1].width = Inches(5.0)
-        
-        total_table.rows[0].cells[0].text = '项目'
-        total_table.rows[0].cells[1].text = '金额（元）'
-        for cell in total_table.rows[0].cells:
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.bold = True
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        total_table.rows[1].cells[0].text = '赔偿总额'
-        total_table.rows[1].cells[0].paragraphs[0].runs[0].bold = True
-        total_table.rows[1].cells[1].text = f"{results.get('总计', 0):,.2f}"
-        total_table.rows[1].cells[1].paragraphs[0].runs[0].bold = True
-        total_table.rows[1].cells[1].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        
-        if '总计' in details:
-            doc.add_paragraph()
-            p = doc.add_paragraph()
-            p.add_run('计算公式：').bold = True
-            doc.add_paragraph(details['总计'])
-        
-        # 计算依据
-        doc.add_heading('四、计算依据', level=1)
-        doc.add_paragraph('本计算依据以下法律法规及标准文件：')
-        doc.add_paragraph('《广西壮族自治区道路交通事故损害赔偿项目及计算标准》（桂高法会〔2025〕13号）', style='List Number')
-        doc.add_paragraph('《广西壮族自治区公安厅关于道路交通事故处理有关问题的通知》（桂公通〔2025〕60号）', style='List Number')
-        doc.add_paragraph()
-        doc.add_paragraph('注：2025年标准统一使用广西上一年度城镇居民人均可支配收入和城镇居民人均消费支出标准进行计算。')
-        
-        # 备注
-        doc.add_heading('五、备注', level=1)
-        doc.add_paragraph('1. 本计算结果仅供参考，实际赔偿金额以法院判决为准。')
-        doc.add_paragraph('2. 各项费用需提供相应的票据和证明材料。')
-        doc.add_paragraph('3. 误工费、护理费的计算方式已根据收入类型进行区分。')
-        doc.add_paragraph('4. 被扶养人生活费的计算已考虑年赔偿总额限制。')
-        doc.add_paragraph('5. 如对计算结果有疑问，请咨询广西瀛桂律师事务所唐学智律师，联系电话18078374299。')
-        
-        # 保存文档
-        doc.save(filename)
-        
-        return send_file(filename, as_attachment=True, 
-                       download_name=f"{victim_name if victim_name != '未填写' else '赔偿'}计算结果.docx",
-                       mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+        entry = load_incident(incident_id)
+        if entry is None:
+            return jsonify({
+                'success': False,
+                'error': '事故计算结果不存在或已过期，请重新计算'
+            }), 404
+        result, version = entry
+        if version != standards_version():
+            # 赔偿标准已更新，按新标准重算
+            result = compute_incident(result.incident, with_details=False)
+        return send_incident_report(result, report_backend({}))
     
     except Exception as e:
         import traceback
         traceback.print_exc()
+        count_error(e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -889,5 +1004,6 @@ def export_word():
 
 
 if __name__ == '__main__':
+    export_queue.warm()
     app.run(host='0.0.0.0', port=5000, debug=False)
 
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+异步导出任务性能测试
+批量导出报告的同时持续发送 /api/calculate 请求，对比计算请求的延迟：
+- 同步导出：导出线程在Web进程内调用 /api/export_word，与计算请求争用GIL
+- 异步导出：通过 /api/export_jobs 提交到进程池，Web进程只负责提交和查询状态
+
+运行：python benchmarks/bench_export_jobs.py [导出报告数]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cases import random_payloads
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def calculate_latencies(client, payloads, stop):
+    """不断发送计算请求直到 stop 被设置，返回各请求的延迟（毫秒）"""
+    latencies = []
+    index = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.post('/api/calculate?totals_only=1', json=payloads[index % len(payloads)])
+        latencies.append((time.perf_counter() - start) * 1000)
+        index += 1
+    return sorted(latencies)
+
+
+def export_sync(client, exports):
+    for payload in exports:
+        response = client.post('/api/export_word', json=payload)
+        assert response.status_code == 200, response.data[:200]
+
+
+def export_async(client, exports):
+    job_ids = []
+    for payload in exports:
+        response = client.post('/api/export_jobs', json=payload)
+        while response.status_code == 429:
+            # 排队已满，等待已提交的任务完成后重试
+            time.sleep(0.05)
+            response = client.post('/api/export_jobs', json=payload)
+        assert response.status_code == 202, response.data[:200]
+        job_ids.append(response.json['job_id'])
+    for job_id in job_ids:
+        while client.get(f'/api/export_jobs/{job_id}').json['status'] not in ('done', 'failed'):
+            time.sleep(0.01)
+        assert client.get(f'/api/export_jobs/{job_id}/download').status_code == 200
+
+
+def run(app, label, export, exports, payloads):
+    app.export_cache.clear()
+    client = app.app.test_client()
+    stop = threading.Event()
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(latencies=calculate_latencies(
+        app.app.test_client(), payloads, stop)))
+    worker.start()
+    start = time.perf_counter()
+    try:
+        export(client, exports)
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        worker.join()
+    latencies = result['latencies']
+    print(f"{label:<8}{elapsed:>12.2f}{len(latencies):>10}"
+          f"{percentile(latencies, 0.5):>10.2f}{percentile(latencies, 0.99):>10.2f}")
+
+
+def main():
+    import app
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    payloads = random_payloads(200, seed=1)
+    exports = []
+    for index, payload in enumerate(random_payloads(count, seed=2)):
+        result = app.app.test_client().post('/api/calculate', json=payload).json
+        # 回传报告内容（计算请求会不断写入计算结果存储，按计算编号导出可能已被淘汰）
+        result.pop('calculation_id')
+        exports.append({**result, 'accident_date': f'2025-03-{index % 28 + 1:02d}'})
+
+    # 启动工作进程（生成报告骨架）后再计时
+    export_async(app.app.test_client(), exports[:app.export_queue.max_workers])
+
+    print(f"导出报告数：{count}，工作进程数：{app.export_queue.max_workers}")
+    print(f"{'方式':<8}{'导出耗时（秒）':>10}{'计算请求数':>8}{'p50（毫秒）':>10}{'p99':>8}")
+    run(app, '同步导出', export_sync, exports, payloads)
+    run(app, '异步导出', export_async, exports, payloads)
+    app.export_queue.shutdown()
+
+
+if __name__ == '__main__':
+    main()
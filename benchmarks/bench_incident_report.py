@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+事故合并报告内存测试
+受害人均含约20行被扶养人生活费按年明细，对比 docx（整份文档在内存中生成后保存）与 ooxml（逐名受害人流式写出）
+两种方式写出合并报告的耗时和 Python 内存分配峰值（tracemalloc，不含事故计算本身）。
+ooxml 方式写出 500 名受害人的报告时内存峰值须低于 OOXML_PEAK_LIMIT_KB，否则以状态码1退出。
+
+运行：python benchmarks/bench_incident_report.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incident import IncidentInput, calculate_incident
+from report_writer import write_incident_report, prepare_report_templates
+from bench_report_backends import LONG_SCHEDULE_PAYLOAD
+
+VICTIM_COUNTS = (50, 200, 500)
+# docx 方式内存占用随受害人数线性增长，受害人很多时只测 ooxml
+DOCX_MAX_VICTIMS = 200
+OOXML_PEAK_LIMIT_KB = 2048
+
+
+class DiscardingOutput:
+    """只计数不保存的输出流（不可定位，zipfile 按流式方式写出）"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+    def flush(self):
+        pass
+
+
+def incident_result(count):
+    """count 名受害人的事故（仅金额模式，计算详情在写出时逐个生成）"""
+    victims = [{**LONG_SCHEDULE_PAYLOAD, 'victim_name': f'受害人{index + 1}', 'victim_age': str(20 + index % 40)}
+               for index in range(count)]
+    incident = IncidentInput.from_dict({'incident_name': '测试事故', 'accident_date': '2025-03-01',
+                                        'defendants': '某客运公司、某保险公司', 'victims': victims})
+    return calculate_incident(incident, with_details=False)
+
+
+def measure(result, backend):
+    """返回 (耗时秒, 内存分配峰值KB, 报告字节数)"""
+    output = DiscardingOutput()
+    tracemalloc.start()
+    start = time.perf_counter()
+    write_incident_report(output, result, backend=backend)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024, output.size
+
+
+def main():
+    prepare_report_templates()
+    print(f"{'受害人数':>8}{'方式':>8}{'耗时（秒）':>12}{'内存峰值（KB）':>16}{'大小（KB）':>12}")
+    ooxml_peaks = {}
+    for count in VICTIM_COUNTS:
+        result = incident_result(count)
+        for backend in ('docx', 'ooxml'):
+            if backend == 'docx' and count > DOCX_MAX_VICTIMS:
+                continue
+            elapsed, peak, size = measure(result, backend)
+            if backend == 'ooxml':
+                ooxml_peaks[count] = peak
+            print(f"{count:>12}{backend:>10}{elapsed:>14.2f}{peak:>20.0f}{size / 1024:>14.0f}")
+
+    largest = max(VICTIM_COUNTS)
+    print(f"ooxml 方式 {largest} 名受害人的内存峰值：{ooxml_peaks[largest]:.0f} KB（上限 {OOXML_PEAK_LIMIT_KB} KB）")
+    if ooxml_peaks[largest] > OOXML_PEAK_LIMIT_KB:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+金额运算方式性能测试
+对比浮点数（calculate_compensation 仅金额模式）、decimal.Decimal 与整数分（calculate_compensation_cents）
+三种方式的吞吐量（案件/秒），并校验整数分结果与按相同舍入规则的 Decimal 结果完全一致；
+校验另含金额为三位小数的案件，以及第三位小数为5的金额（二进制浮点数不能精确表示，按浮点数舍入会出错）。
+
+运行：python benchmarks/bench_money_arithmetic.py [案件数]
+"""
+
+import os
+import sys
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compensation_engine import (
+    CaseInput, calculate_compensation, lookup_disability_coefficient, parse_dependent_info,
+    dependent_support_years, standard_set_for,
+)
+from cents_engine import calculate_compensation_cents
+from cases import random_payloads
+
+CENT = Decimal('0.01')
+# 第三位小数为5的金额（round(value * 100) 会把其中一些舍入到错误的分）
+HALF_CENT_AMOUNTS = ('0.125', '1.005', '10.125', '2.675', '1234.565', '0.015', '99999.995')
+MONEY_FIELDS = ('medical_expense', 'nutrition_fee', 'traffic_fee', 'monthly_income', 'avg_daily_income',
+                'nursing_income', 'disability_appliance_fee', 'mental_damage')
+
+
+def money(value):
+    """输入金额按两位小数转换为 Decimal"""
+    return Decimal(repr(value)).quantize(CENT, ROUND_HALF_UP)
+
+
+def cent_round(value):
+    return value.quantize(CENT, ROUND_HALF_UP)
+
+
+def calculate_compensation_decimal(case):
+    """与 cents_engine 相同舍入规则的 Decimal 实现（对账参照），返回项目到金额（分）的字典"""
+    standard_set = standard_set_for(case)
+    standards = {name: Decimal(repr(value)) for name, value in standard_set.standards.items()}
+    income = Decimal(standard_set.income_for_age(case.victim_age))
+    coefficient = lookup_disability_coefficient(case.disability_level).coefficient
+    coefficient = Decimal(repr(coefficient)).quantize(Decimal('0.0001'), ROUND_HALF_UP)
+    zero = Decimal(0)
+
+    results = {
+        '医疗费': money(case.medical_expense),
+        '后续治疗费': money(case.follow_up_treatment_fee),
+        '住院伙食补助费': case.hospital_days * (standards['daily_meal_subsidy'] if case.meal_subsidy is None
+                                         else money(case.meal_subsidy)),
+        '营养费': money(case.nutrition_fee),
+        '交通费': money(case.traffic_fee),
+        '住宿费': case.accommodation_days * standards['daily_accommodation_fee'],
+    }
+
+    days = case.work_loss_days
+    if days <= 0:
+        work_loss_fee = zero
+    elif case.work_income_type == "固定收入":
+        work_loss_fee = cent_round(money(case.monthly_income) * days / 30) if case.monthly_income > 0 else zero
+    elif case.work_income_type == "无固定收入（能证明最近三年平均）":
+        work_loss_fee = money(case.avg_daily_income) * days if case.avg_daily_income > 0 else zero
+    else:
+        work_loss_fee = cent_round(Decimal(standard_set.industry_salary(case.industry_type)) * days / 365)
+    results['误工费'] = work_loss_fee
+
+    days = case.nursing_days
+    count = 1 if case.nursing_count is None else case.nursing_count
+    if days <= 0:
+        nursing_fee = zero
+    elif case.nursing_type == "有收入":
+        nursing_fee = money(case.nursing_income) * days * count if case.nursing_income > 0 else zero
+    else:
+        nursing_fee = standards['daily_nursing_fee'] * days * count
+    results['护理费'] = nursing_fee
+
+    level = case.disability_level
+    has_disability = coefficient < 1 or (level and level != "无")
+    results['残疾赔偿金'] = cent_round(income * coefficient) if has_disability else zero
+    results['残疾辅助器具费'] = money(case.disability_appliance_fee)
+
+    dependent_expense = zero
+    try:
+        dependents = parse_dependent_info(case.dependent_info.strip())
+    except ValueError:
+        dependents = []
+    expenses = [(dependent_support_years(dep['age']), dep['support_count']) for dep in dependents]
+    expenses = [(years, count) for years, count in expenses if years > 0]
+    if expenses:
+        # 先合计 1/扶养人数 的分数，避免 Decimal 除法在中途舍入
+        consumption = Fraction(standards['consumption'])
+        total = Fraction(0)
+        start = 0
+        for end in sorted({years for years, _ in expenses}):
+            year_total = sum(consumption / count for years, count in expenses if years > start)
+            total += min(year_total, consumption) * (end - start)
+            start = end
+        factor = Fraction(1) if case.is_death else Fraction(coefficient)
+        exact = total * factor
+        dependent_expense = cent_round(Decimal(exact.numerator) / Decimal(exact.denominator))
+    results['被扶养人生活费'] = dependent_expense
+
+    results['死亡赔偿金'] = income if case.is_death else zero
+    results['丧葬费'] = standards['funeral_expense'] if case.is_death else zero
+    results['精神损害抚慰金'] = money(case.mental_damage)
+
+    results = {item: int(amount * 100) for item, amount in results.items()}
+    results['总计'] = sum(results.values())
+    return results
+
+
+def half_cent_payloads(count):
+    """金额字段轮流取 HALF_CENT_AMOUNTS 中的值的案件"""
+    payloads = random_payloads(count, seed=7)
+    for index, payload in enumerate(payloads):
+        for offset, name in enumerate(MONEY_FIELDS):
+            payload[name] = HALF_CENT_AMOUNTS[(index + offset) % len(HALF_CENT_AMOUNTS)]
+    return payloads
+
+
+def count_mismatches(payloads):
+    """整数分结果与 Decimal 结果不一致的案件数"""
+    cases = [CaseInput.from_dict(payload) for payload in payloads]
+    return sum(calculate_compensation_cents(case) != calculate_compensation_decimal(case) for case in cases)
+
+
+def throughput(cases, calculate, rounds=3):
+    """多轮计算取最快一轮，返回案件/秒"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for case in cases:
+            calculate(case)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(cases) / best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cases = [CaseInput.from_dict(payload) for payload in random_payloads(count)]
+
+    mismatches = sum(calculate_compensation_cents(case) != calculate_compensation_decimal(case) for case in cases)
+    three_decimal_mismatches = count_mismatches(random_payloads(count, seed=3, decimals=3))
+    half_cent_mismatches = count_mismatches(half_cent_payloads(200))
+    float_cent_diffs = sum(round(calculate_compensation(case, False).results['总计'] * 100)
+                           != calculate_compensation_cents(case)['总计'] for case in cases)
+
+    print(f"案件数：{count}")
+    rates = {}
+    for label, calculate in (('浮点数', lambda case: calculate_compensation(case, False)),
+                             ('Decimal', calculate_compensation_decimal),
+                             ('整数分', calculate_compensation_cents)):
+        rates[label] = throughput(cases, calculate)
+        print(f"{label:<10}{rates[label]:>12,.0f} 件/秒")
+    print(f"整数分相对Decimal加速：{rates['整数分'] / rates['Decimal']:.1f} 倍")
+    print(f"整数分与Decimal结果不一致：{mismatches} 件")
+    print(f"金额为三位小数时不一致：{three_decimal_mismatches} 件，第三位小数为5时不一致：{half_cent_mismatches} 件")
+    print(f"浮点数总计四舍五入到分后与整数分总计不一致：{float_cent_diffs} 件")
+    if mismatches or three_decimal_mismatches or half_cent_mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
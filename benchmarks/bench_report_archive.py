@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+批量导出（zip压缩包）性能测试
+不同报告数下的总耗时、每秒报告数、收到第一段数据的时间，以及主进程的 Python 内存分配峰值（tracemalloc）；
+压缩包写入丢弃内容的输出流，内存峰值应与报告数无关。
+
+运行：python benchmarks/bench_report_archive.py [工作进程数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compensation_engine import CaseInput
+from export_jobs import ExportJobQueue
+from report_archive import iter_report_archive, case_report
+from cases import random_payloads
+
+COUNTS = (50, 200, 500)
+
+
+def iter_items(payloads):
+    """逐个计算案件，产出报告内容（与 /api/export_archive 提交案件数据时相同）"""
+    for payload in payloads:
+        report, standard_set = case_report(CaseInput.from_dict({**payload, 'accident_date': '2025-03-01'}))
+        yield report, standard_set, None
+
+
+def measure(queue, payloads):
+    """返回 (总耗时秒, 第一段数据的时间秒, 压缩包字节数, 内存分配峰值KB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in iter_report_archive(iter_items(payloads), queue=queue):
+        if first is None and chunk:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, first, size, peak / 1024
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    queue = ExportJobQueue(workers, nice=0)
+    measure(queue, random_payloads(workers * 2, seed=5))  # 启动工作进程
+
+    print(f"工作进程数：{workers}")
+    print(f"{'报告数':>6}{'耗时（秒）':>10}{'报告/秒':>10}{'首段（秒）':>10}{'大小（MB）':>10}{'内存峰值（KB）':>14}")
+    for count in COUNTS:
+        elapsed, first, size, peak = measure(queue, random_payloads(count, seed=count))
+        print(f"{count:>9}{elapsed:>13.2f}{count / elapsed:>12.1f}{first:>13.3f}"
+              f"{size / 1024 / 1024:>13.2f}{peak:>18.0f}")
+    queue.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Word报告生成方式性能测试
+对比 docx（python-docx 文档对象）与 ooxml（XML片段流式写入zip）两种方式的单份报告耗时和
+Python 内存分配峰值（tracemalloc），分别使用随机案件和含多名低龄被扶养人（按年明细很长）的案件，
+并校验两种方式生成的 docx 各部件逐字节一致。
+
+运行：python benchmarks/bench_report_backends.py [报告数]
+"""
+
+import io
+import os
+import sys
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compensation_engine import CaseInput, calculate_compensation
+from report_writer import REPORT_BACKENDS, write_report, prepare_report_templates
+from cases import random_payloads
+
+ACCIDENT_DATE = '2025-03-01'
+
+# 受害人死亡、被扶养人为多名幼儿和老人，被扶养人生活费的按年明细约20行
+LONG_SCHEDULE_PAYLOAD = {
+    'victim_name': '王五', 'victim_age': '35', 'is_death': True, 'medical_expense': '86000',
+    'hospital_days': '40', 'nursing_days': '40', 'work_loss_days': '40', 'mental_damage': '50000',
+    'dependent_info': '0,2;1,2;3,2;6,2;62,3;68,3;79,4',
+}
+
+
+def write(result, backend):
+    buffer = io.BytesIO()
+    write_report(buffer, result.results, result.details, result.victim_name, result.victim_age,
+                 ACCIDENT_DATE, backend=backend)
+    return buffer
+
+
+def zip_parts(buffer):
+    with zipfile.ZipFile(buffer) as archive:
+        return [(name, archive.read(name)) for name in archive.namelist()]
+
+
+def measure(results, backend):
+    """返回 (平均耗时毫秒, p99耗时毫秒, 最大单份报告内存分配峰值KB)"""
+    timings = []
+    for result in results:
+        start = time.perf_counter()
+        write(result, backend)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    peak = 0
+    for result in results[:50]:
+        tracemalloc.start()
+        write(result, backend)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return sum(timings) / len(timings), timings[min(int(len(timings) * 0.99), len(timings) - 1)], peak / 1024
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    prepare_report_templates()
+    case_sets = {
+        '随机案件': [calculate_compensation(CaseInput.from_dict(payload)) for payload in random_payloads(count)],
+        '长按年明细': [calculate_compensation(CaseInput.from_dict(LONG_SCHEDULE_PAYLOAD))] * count,
+    }
+
+    mismatches = sum(zip_parts(write(result, 'docx')) != zip_parts(write(result, 'ooxml'))
+                     for results in case_sets.values() for result in results[:100])
+
+    print(f"报告数：{count}")
+    print(f"{'案件':<10}{'方式':<8}{'平均（毫秒）':>12}{'p99':>10}{'内存峰值（KB）':>16}")
+    for label, results in case_sets.items():
+        for backend in REPORT_BACKENDS:
+            write(results[0], backend)  # 预热
+            mean, p99, peak = measure(results, backend)
+            print(f"{label:<10}{backend:<8}{mean:>14.2f}{p99:>10.2f}{peak:>18.0f}")
+    print(f"两种方式生成的docx部件不一致：{mismatches} 份")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+仅金额模式性能测试
+对比完整计算（生成计算详情）与仅金额模式（with_details=False）的单案件耗时和内存分配。
+
+运行：python benchmarks/bench_totals_only.py [案件数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compensation_engine import CaseInput, calculate_compensation
+from cases import random_payloads
+
+
+def measure_latency(cases, with_details, rounds=5):
+    """多轮计算取最快一轮，返回平均每个案件的耗时（微秒）"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for case in cases:
+            calculate_compensation(case, with_details)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(cases) * 1e6
+
+
+def measure_allocations(cases, with_details):
+    """返回平均每个案件的峰值内存分配和结果占用内存（字节）"""
+    peak_total = 0
+    retained_total = 0
+    tracemalloc.start()
+    for case in cases:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = calculate_compensation(case, with_details)
+        current, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - baseline
+        retained_total += current - baseline
+        del result
+    tracemalloc.stop()
+    return peak_total / len(cases), retained_total / len(cases)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cases = [CaseInput.from_dict(payload) for payload in random_payloads(count)]
+    # 预热查表缓存
+    for case in cases:
+        calculate_compensation(case)
+
+    print(f"案件数：{count}")
+    print(f"{'模式':<10}{'耗时（微秒/件）':>16}{'峰值分配（字节/件）':>20}{'结果占用（字节/件）':>20}")
+    rows = {}
+    for label, with_details in (('完整计算', True), ('仅金额', False)):
+        latency = measure_latency(cases, with_details)
+        peak, retained = measure_allocations(cases, with_details)
+        rows[label] = (latency, peak, retained)
+        print(f"{label:<10}{latency:>16.2f}{peak:>20,.0f}{retained:>20,.0f}")
+
+    full, fast = rows['完整计算'], rows['仅金额']
+    print(f"耗时降低：{(1 - fast[0] / full[0]) * 100:.1f}%，"
+          f"峰值分配降低：{(1 - fast[1] / full[1]) * 100:.1f}%，"
+          f"结果占用降低：{(1 - fast[2] / full[2]) * 100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+向量化计算引擎性能测试
+对比逐案件计算（calculate_compensation）与按列计算（calculate_portfolio）的吞吐量（案件/秒），
+并校验两者在抽样案件上的计算结果完全一致。
+
+运行：python benchmarks/bench_vectorized_engine.py [抽样案件数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from compensation_engine import CaseInput, calculate_compensation
+from vectorized_engine import INCOME_TYPES, build_grid, calculate_portfolio
+
+
+def build_columns():
+    """年龄 × 伤残等级 × 天数 × 收入类型 的组合，约10万个案件"""
+    columns = build_grid({
+        'victim_age': range(15, 90),
+        'disability_level': ['无', '10级', '8级', '5级,8级', '3级;5级;9级', '1级'],
+        'work_loss_days': [0, 30, 90, 180, 365],
+        'nursing_days': [0, 15, 60],
+        'work_income_type': INCOME_TYPES,
+        'is_death': [False, True],
+        'dependent_info': ['', '5,2;65,1', '10;12;70,2'],
+    })
+    size = len(columns['victim_age'])
+    columns['hospital_days'] = columns['nursing_days']
+    columns['monthly_income'] = np.full(size, 5200.0)
+    columns['avg_daily_income'] = np.full(size, 180.5)
+    columns['industry_type'] = np.full(size, '建筑业')
+    columns['medical_expense'] = np.linspace(0, 200000, size).round(2)
+    return columns
+
+
+def case_at(columns, index):
+    """取出第 index 个案件，构造单案件计算输入"""
+    return CaseInput(**{name: values[index].item() for name, values in columns.items()})
+
+
+def main():
+    sample_size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    columns = build_columns()
+    size = len(columns['victim_age'])
+
+    start = time.perf_counter()
+    portfolio = calculate_portfolio(columns)
+    vectorized_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(size, size=min(sample_size, size), replace=False)
+    cases = [case_at(columns, int(i)) for i in sample]
+    start = time.perf_counter()
+    scalar_results = [calculate_compensation(case).results for case in cases]
+    scalar_seconds = time.perf_counter() - start
+
+    mismatches = 0
+    for index, results in zip(sample, scalar_results):
+        for item, amount in results.items():
+            if portfolio[item][index] != amount:
+                mismatches += 1
+                break
+
+    print(f"案件总数：{size}")
+    print(f"逐案件计算：{len(cases)} 件，{scalar_seconds:.3f} 秒，{len(cases) / scalar_seconds:,.0f} 件/秒")
+    print(f"向量化计算：{size} 件，{vectorized_seconds:.3f} 秒，{size / vectorized_seconds:,.0f} 件/秒")
+    print(f"加速比：{(size / vectorized_seconds) / (len(cases) / scalar_seconds):,.1f} 倍")
+    print(f"抽样校验：{len(cases)} 件，不一致 {mismatches} 件")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
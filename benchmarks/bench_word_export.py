@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Word导出性能测试
+对比受害人内容的两种写法的单份报告耗时（含保存为docx）以及创建的XML元素数：
+- 逐格设置格式（改造前）：通过 python-docx 为每个单元格创建边距、为每个文字块设置字体
+- 复制行原型（改造后）：复制报告骨架中预先排好版的表格和明细行，只填入文字
+
+元素数分两列：python-docx 逐个创建的元素（OxmlElement、parse_xml），以及正文中新增的元素总数。
+
+运行：python benchmarks/bench_word_export.py [报告数]
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx.oxml.parser
+from lxml import etree
+
+from compensation_engine import CaseInput, calculate_compensation
+from standards import REGISTRY
+from word_report import build_report, get_report_skeleton, prepare_report_skeletons
+from legacy_word_report import build_report_legacy
+from cases import random_payloads
+
+ACCIDENT_DATE = '2025-03-01'
+
+
+class ElementCounter:
+    """
+    统计 python-docx 逐个创建的元素数：OxmlElement 及各元素类的 _new_xxx() 都经由
+    docx.oxml.parser.oxml_parser.makeelement 创建，parse_xml 按解析出的元素数计
+    """
+
+    def __init__(self):
+        self.created = 0
+        self._patched = []
+
+    def makeelement(self, *args, **kwargs):
+        self.created += 1
+        return self._parser.makeelement(*args, **kwargs)
+
+    def _parse_xml(self, xml):
+        element = etree.fromstring(xml, self._parser)
+        self.created += sum(1 for _ in element.iter())
+        return element
+
+    def __enter__(self):
+        self._parser = docx.oxml.parser.oxml_parser
+        original_parse = docx.oxml.parser.parse_xml
+        self._patched.append((docx.oxml.parser, 'oxml_parser', self._parser))
+        docx.oxml.parser.oxml_parser = self
+        for module in list(sys.modules.values()):
+            if getattr(module, 'parse_xml', None) is original_parse:
+                self._patched.append((module, 'parse_xml', original_parse))
+                module.parse_xml = self._parse_xml
+        return self
+
+    def __exit__(self, *exc_info):
+        for module, name, original in self._patched:
+            setattr(module, name, original)
+        self._patched = []
+
+
+def body_element_count(doc):
+    return sum(1 for _ in doc.element.body.iter())
+
+
+def build_legacy(result):
+    return build_report_legacy(result.results, result.details, result.victim_name, result.victim_age, ACCIDENT_DATE)
+
+
+def build_prototype(result):
+    return build_report(result.results, result.details, result.victim_name, result.victim_age, ACCIDENT_DATE)
+
+
+def count_elements(results, build):
+    """返回 (每份报告逐个创建的元素数, 每份报告正文新增的元素数) 的平均值"""
+    skeleton_elements = body_element_count(get_report_skeleton(REGISTRY.for_date(ACCIDENT_DATE)).document)
+    created = added = 0
+    for result in results:
+        with ElementCounter() as counter:
+            doc = build(result)
+        created += counter.created
+        added += body_element_count(doc) - skeleton_elements
+    return created / len(results), added / len(results)
+
+
+def measure(results, build):
+    """返回每份报告的耗时（毫秒）列表"""
+    timings = []
+    for result in results:
+        start = time.perf_counter()
+        build(result).save(io.BytesIO())
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    results = [calculate_compensation(CaseInput.from_dict(payload)) for payload in random_payloads(count)]
+    prepare_report_skeletons()
+    # 预热
+    measure(results[:5], build_legacy)
+    measure(results[:5], build_prototype)
+
+    print(f"报告数：{count}")
+    print(f"{'方式':<12}{'逐个创建元素':>12}{'正文新增元素':>12}{'平均（毫秒）':>12}{'p50':>10}{'p99':>10}")
+    summary = {}
+    for label, build in (('逐格设置格式', build_legacy), ('复制行原型', build_prototype)):
+        created, added = count_elements(results, build)
+        timings = measure(results, build)
+        mean = sum(timings) / len(timings)
+        summary[label] = (created, mean)
+        print(f"{label:<12}{created:>14.1f}{added:>16.1f}{mean:>14.2f}"
+              f"{percentile(timings, 0.5):>10.2f}{percentile(timings, 0.99):>10.2f}")
+    (legacy_created, legacy_mean), (created, mean) = summary['逐格设置格式'], summary['复制行原型']
+    print(f"逐个创建的元素减少：{legacy_created / max(created, 1):.0f} 倍")
+    print(f"平均耗时降低：{(1 - mean / legacy_mean) * 100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+性能测试用的随机案件数据
+"""
+
+import random
+
+INCOME_TYPES = ["固定收入", "无固定收入（能证明最近三年平均）", "无固定收入（不能证明，参照行业平均）"]
+DISABILITY_LEVELS = ['无', '10级', '8级', '5级,8级', '3级;5级;9级', '7级,7级,8级,9级,10级']
+INDUSTRIES = ['建筑业', '制造业', '批发和零售业', '其他行业']
+
+
+def random_payload(rng, decimals=2):
+    """生成一个 /api/calculate 请求数据，金额保留 decimals 位小数"""
+    dependents = ';'.join(f"{rng.randint(0, 85)},{rng.randint(1, 3)}" for _ in range(rng.randint(0, 4)))
+    return {
+        'victim_name': rng.choice(['张三', '李四', '王五']),
+        'victim_age': str(rng.randint(18, 85)),
+        'medical_expense': f"{rng.uniform(1000, 200000):.{decimals}f}",
+        'hospital_days': str(rng.randint(0, 120)),
+        'meal_subsidy': '100',
+        'nutrition_fee': f"{rng.uniform(0, 5000):.{decimals}f}",
+        'traffic_fee': f"{rng.uniform(0, 3000):.{decimals}f}",
+        'accommodation_days': str(rng.randint(0, 20)),
+        'work_income_type': rng.choice(INCOME_TYPES),
+        'monthly_income': f"{rng.uniform(2000, 20000):.{decimals}f}",
+        'avg_daily_income': f"{rng.uniform(80, 500):.{decimals}f}",
+        'industry_type': rng.choice(INDUSTRIES),
+        'work_loss_days': str(rng.randint(0, 365)),
+        'nursing_type': rng.choice(['有收入', '无收入或雇佣护工']),
+        'nursing_income': f"{rng.uniform(100, 300):.{decimals}f}",
+        'nursing_days': str(rng.randint(0, 90)),
+        'nursing_count': str(rng.randint(1, 2)),
+        'disability_level': rng.choice(DISABILITY_LEVELS),
+        'disability_appliance_fee': f"{rng.uniform(0, 10000):.{decimals}f}",
+        'dependent_info': dependents,
+        'is_death': rng.random() < 0.2,
+        'mental_damage': f"{rng.uniform(0, 50000):.{decimals}f}",
+    }
+
+
+def random_payloads(count, seed=0, decimals=2):
+    """生成 count 个随机案件的请求数据（结果可复现）"""
+    rng = random.Random(seed)
+    return [random_payload(rng, decimals) for _ in range(count)]
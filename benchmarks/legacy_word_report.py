@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+改造前的受害人内容写法：通过 python-docx 逐个单元格、逐个文字块设置边距和字体，
+仅供 bench_word_export.py 对比耗时和创建的元素数。
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx.shared import Pt, Inches
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+
+from compensation_engine import ITEMS_ORDER
+from standards import REGISTRY
+from word_report import get_report_skeleton, clone_document
+
+
+def build_report_legacy(results, details, victim_name, victim_age, accident_date):
+    """克隆报告骨架后按改造前的写法写入受害人内容"""
+    skeleton = get_report_skeleton(REGISTRY.for_date(accident_date))
+    doc = clone_document(skeleton.document)
+    body = doc.element.body
+    tail = list(body)[skeleton.insert_index:-1]
+    for element in tail:
+        body.remove(element)
+    add_victim_sections(doc, results, details, victim_name, victim_age, accident_date)
+    sectPr = body.sectPr
+    for element in tail:
+        sectPr.addprevious(element)
+    return doc
+
+
+def add_victim_sections(doc, results, details, victim_name, victim_age, accident_date):
+    """写入受害人的基本信息、赔偿明细及计算公式、赔偿总额"""
+    # 基本信息
+    doc.add_heading('一、基本信息', level=1)
+    basic_table = doc.add_table(rows=3, cols=2)
+    basic_table.style = 'Light Grid Accent 1'
+    basic_table.columns[0].width = Inches(2.0)
+    basic_table.columns[1].width = Inches(4.5)
+
+    basic_info = [
+        ('受害人姓名', victim_name),
+        ('受害人年龄', f"{victim_age}岁"),
+        ('事故发生日期', accident_date),
+    ]
+
+    for i, (label, value) in enumerate(basic_info):
+        label_cell = basic_table.rows[i].cells[0]
+        label_cell.text = label
+        label_para = label_cell.paragraphs[0]
+        label_para.runs[0].bold = True
+        label_para.runs[0].font.name = '宋体'
+        label_para.runs[0].font.size = Pt(12)
+        label_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+        label_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+        value_cell = basic_table.rows[i].cells[1]
+        value_cell.text = value
+        value_para = value_cell.paragraphs[0]
+        value_para.runs[0].font.name = '宋体'
+        value_para.runs[0].font.size = Pt(12)
+        value_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+
+    doc.add_paragraph()
+
+    # 赔偿明细
+    doc.add_heading('二、赔偿明细及计算公式', level=1)
+    valid_items = [item for item in ITEMS_ORDER if item in results and results[item] > 0]
+
+    if valid_items:
+        detail_table = doc.add_table(rows=len(valid_items) + 1, cols=4)
+        detail_table.style = 'Light Grid Accent 1'
+
+        tbl = detail_table._tbl
+        tblPr = tbl.tblPr
+        if tblPr is None:
+            tblPr = OxmlElement('w:tblPr')
+            tbl.insert(0, tblPr)
+
+        tblW = OxmlElement('w:tblW')
+        tblW.set(qn('w:w'), '0')
+        tblW.set(qn('w:type'), 'auto')
+        tblPr.append(tblW)
+
+        tblLayout = OxmlElement('w:tblLayout')
+        tblLayout.set(qn('w:type'), 'autofit')
+        tblPr.append(tblLayout)
+
+        detail_table.columns[0].width = Inches(0.4)
+        detail_table.columns[1].width = Inches(1.0)
+        detail_table.columns[2].width = Inches(1.0)
+        detail_table.columns[3].width = Inches(5.1)
+
+        for row_idx, row in enumerate(detail_table.rows):
+            for col_idx, cell in enumerate(row.cells):
+                tcPr = cell._element.tcPr
+                if tcPr is None:
+                    tcPr = OxmlElement('w:tcPr')
+                    cell._element.insert(0, tcPr)
+
+                if col_idx < 3:
+                    left_right = '80'
+                    top_bottom = '50'
+                else:
+                    left_right = '120'
+                    top_bottom = '60'
+
+                tcMar = OxmlElement('w:tcMar')
+                for margin_name, margin_value in [('top', top_bottom), ('left', left_right),
+                                                  ('bottom', top_bottom), ('right', left_right)]:
+                    margin = OxmlElement(f'w:{margin_name}')
+                    margin.set(qn('w:w'), margin_value)
+                    margin.set(qn('w:type'), 'dxa')
+                    tcMar.append(margin)
+                tcPr.append(tcMar)
+
+        header_cells = detail_table.rows[0].cells
+        header_texts = ['序号', '项目', '金额', '计算方式']
+
+        for idx, cell in enumerate(header_cells):
+            header_text = header_texts[idx]
+            cell.paragraphs[0].clear()
+            para = cell.paragraphs[0]
+            run = para.add_run(header_text)
+            run.bold = True
+            run.font.name = '黑体'
+            run.font.size = Pt(11)
+            run._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
+            para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+            tcPr = cell._element.get_or_add_tcPr()
+            shading_elm = OxmlElement('w:shd')
+            shading_elm.set(qn('w:fill'), 'E7E6E6')
+            shading_elm.set(qn('w:val'), 'clear')
+            tcPr.append(shading_elm)
+
+        for idx, item in enumerate(valid_items):
+            row = detail_table.rows[idx + 1]
+
+            cell0 = row.cells[0]
+            cell0.paragraphs[0].clear()
+            para0 = cell0.paragraphs[0]
+            run0 = para0.add_run(str(idx + 1))
+            run0.font.name = '宋体'
+            run0.font.size = Pt(10)
+            run0._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+            para0.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+            cell1 = row.cells[1]
+            cell1.paragraphs[0].clear()
+            para1 = cell1.paragraphs[0]
+            run1 = para1.add_run(item)
+            run1.font.name = '宋体'
+            run1.font.size = Pt(10)
+            run1._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+            para1.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+            cell2 = row.cells[2]
+            cell2.paragraphs[0].clear()
+            para2 = cell2.paragraphs[0]
+            amount_text = f"{results[item]:,.2f}"
+            run2 = para2.add_run(amount_text)
+            run2.font.name = '宋体'
+            run2.font.size = Pt(10)
+            run2._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+            para2.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+            cell3 = row.cells[3]
+            cell3.paragraphs[0].clear()
+            para3 = cell3.paragraphs[0]
+
+            if item in details:
+                detail = details[item]
+                if '\n' in detail:
+                    lines = detail.split('\n')
+                    for i, line in enumerate(lines):
+                        if i > 0:
+                            para3 = cell3.add_paragraph()
+                        run3 = para3.add_run(line.strip())
+                        run3.font.name = '宋体'
+                        run3.font.size = Pt(9.5)
+                        run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+                else:
+                    formula_text = detail.replace('；', '\n').replace(';', '\n')
+                    if '\n' in formula_text:
+                        lines = formula_text.split('\n')
+                        for i, line in enumerate(lines):
+                            if i > 0:
+                                para3 = cell3.add_paragraph()
+                            run3 = para3.add_run(line.strip())
+                            run3.font.name = '宋体'
+                            run3.font.size = Pt(9.5)
+                            run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+                    else:
+                        run3 = para3.add_run(formula_text)
+                        run3.font.name = '宋体'
+                        run3.font.size = Pt(9.5)
+                        run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+            else:
+                run3 = para3.add_run(f"{item} = {results[item]:,.2f} 元")
+                run3.font.name = '宋体'
+                run3.font.size = Pt(9.5)
+                run3._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+
+            para3.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+            tr = row._element
+            trPr = tr.get_or_add_trPr()
+            trHeight = OxmlElement('w:trHeight')
+            trHeight.set(qn('w:val'), '300')
+            trHeight.set(qn('w:hRule'), 'atLeast')
+            trPr.append(trHeight)
+
+        doc.add_paragraph()
+
+    # 总计
+    doc.add_heading('三、赔偿总额', level=1)
+    total_table = doc.add_table(rows=2, cols=2)
+    total_table.style = 'Light Grid Accent 1'
+    total_table.columns[0].width = Inches(2.0)
+    total_table.columns[1].width = Inches(5.0)
+
+    total_table.rows[0].cells[0].text = '项目'
+    total_table.rows[0].cells[1].text = '金额（元）'
+    for cell in total_table.rows[0].cells:
+        for paragraph in cell.paragraphs:
+            for run in paragraph.runs:
+                run.bold = True
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    total_table.rows[1].cells[0].text = '赔偿总额'
+    total_table.rows[1].cells[0].paragraphs[0].runs[0].bold = True
+    total_table.rows[1].cells[1].text = f"{results.get('总计', 0):,.2f}"
+    total_table.rows[1].cells[1].paragraphs[0].runs[0].bold = True
+    total_table.rows[1].cells[1].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+    if '总计' in details:
+        doc.add_paragraph()
+        p = doc.add_paragraph()
+        p.add_run('计算公式：').bold = True
+        doc.add_paragraph(details['总计'])
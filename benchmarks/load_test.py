@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+多进程服务（serve.py）负载测试
+依次以不同的工作进程数启动 serve.py，由多个客户端进程并发发送 /api/calculate 请求，
+统计每秒请求数和延迟（p50、p99），用于评估随CPU核数增加的扩展情况。
+客户端与服务在同一台机器上运行时会争用CPU，客户端进程数宜小于CPU核数的一半。
+
+运行：python benchmarks/load_test.py [--workers 1,2,4] [--duration 10] [--clients 2] [--concurrency 8]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cases import random_payloads
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'服务未在 {timeout} 秒内启动')
+
+
+def client(port, duration, concurrency, seed):
+    """客户端进程：concurrency 个线程持续发送请求，返回 (各请求延迟毫秒, 失败数)"""
+    bodies = [json.dumps(payload).encode('utf-8') for payload in random_payloads(500, seed=seed)]
+    latencies = []
+    errors = [0]
+    deadline = time.time() + duration
+
+    def run(offset):
+        index = offset
+        while time.time() < deadline:
+            start = time.perf_counter()
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                connection.request('POST', '/api/calculate', bodies[index % len(bodies)],
+                                   {'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                if response.status != 200:
+                    errors[0] += 1
+                    continue
+            except OSError:
+                errors[0] += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            index += concurrency
+
+    threads = [threading.Thread(target=run, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def measure(workers, args):
+    """以 workers 个工作进程启动服务并施加负载，返回 (每秒请求数, p50, p99, 失败数)"""
+    env = dict(os.environ, SERVE_WORKERS=str(workers), SERVE_THREADS=str(args.threads), SERVE_PORT=str(args.port),
+               SERVE_HOST='127.0.0.1', SECRET_KEY=os.environ.get('SECRET_KEY') or secrets.token_hex(16))
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'serve.py')], env=env, cwd=ROOT,
+                              stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.port)
+        client(args.port, 1, args.concurrency, 0)  # 预热
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.starmap(client, [(args.port, args.duration, args.concurrency, seed + 1)
+                                            for seed in range(args.clients)])
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(error for _, error in results)
+    return len(latencies) / args.duration, percentile(latencies, 0.5), percentile(latencies, 0.99), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='serve.py 负载测试')
+    parser.add_argument('--workers', default='1,2,4', help='依次测试的工作进程数，逗号分隔')
+    parser.add_argument('--threads', type=int, default=4, help='每个工作进程的线程数')
+    parser.add_argument('--duration', type=float, default=10, help='每轮测试的秒数')
+    parser.add_argument('--clients', type=int, default=2, help='客户端进程数')
+    parser.add_argument('--concurrency', type=int, default=8, help='每个客户端进程的并发请求数')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    print(f"CPU核数：{os.cpu_count()}，客户端：{args.clients} 个进程 × {args.concurrency} 并发，每轮 {args.duration} 秒")
+    print(f"{'工作进程':>8}{'请求/秒':>10}{'p50（毫秒）':>12}{'p99':>10}{'失败':>8}")
+    baseline = None
+    for workers in (int(value) for value in args.workers.split(',')):
+        rate, p50, p99, errors = measure(workers, args)
+        baseline = baseline or rate
+        print(f"{workers:>12}{rate:>13.0f}{p50:>14.2f}{p99:>10.2f}{errors:>8}   ×{rate / baseline:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+广西人身损害赔偿整数分计算引擎
+金额全部以整数"分"表示，各项目按下述规则舍入到分，总计为各项目之和，结果确定且没有浮点误差，
+可替代对账时用 decimal.Decimal 重算。只返回金额，不生成计算详情。
+
+舍入规则（四舍五入到分）：
+- 输入金额按两位小数转换为分
+- 误工费（固定收入）= 月收入 × 误工天数 ÷ 30，误工费（行业平均）= 年工资 × 误工天数 ÷ 365，整体舍入一次
+- 被扶养人生活费按分数精确合计（年生活费 = 人均消费支出 ÷ 扶养人数），乘伤残系数后舍入一次
+- 伤残系数按万分比（整数）参与计算
+
+各项目的计算规则与 compensation_engine 分别实现，修改赔偿标准或计算公式时须同时修改两处，
+tests/test_cents_engine.py 按随机案件校验两者一致。
+"""
+
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+from compensation_engine import (
+    lookup_disability_coefficient, parse_dependent_info, dependent_support_years, standard_set_for,
+)
+
+# 一分（元）
+_CENT = Decimal('0.01')
+
+
+def to_cents(value):
+    """金额（元）转换为整数分，按两位小数四舍五入（按十进制表示舍入，如 1.005 -> 101，不受二进制浮点误差影响）"""
+    if isinstance(value, int):
+        return value * 100
+    return int(Decimal(repr(value)).quantize(_CENT, ROUND_HALF_UP) * 100)
+
+
+def cents_to_yuan(cents):
+    """整数分格式化为元，如 123456 -> '1,234.56'"""
+    sign = '-' if cents < 0 else ''
+    yuan, fen = divmod(abs(cents), 100)
+    return f"{sign}{yuan:,}.{fen:02d}"
+
+
+def div_round(numerator, denominator):
+    """整数除法，四舍五入（0.5向上）"""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    return quotient + (2 * remainder >= denominator)
+
+
+def coefficient_basis_points(coefficient):
+    """伤残系数转换为万分比整数，如 0.32 -> 3200"""
+    return int(round(coefficient * 10000))
+
+
+@lru_cache(maxsize=None)
+def _standard_cents(standard_set):
+    """一套赔偿标准中以分表示的数值（每套标准只转换一次）"""
+    standards = standard_set.standards
+    return {
+        'disposable_income': to_cents(standards['disposable_income']),
+        'consumption': to_cents(standards['consumption']),
+        'daily_meal_subsidy': to_cents(standards['daily_meal_subsidy']),
+        'daily_nursing_fee': to_cents(standards['daily_nursing_fee']),
+        'funeral_expense': to_cents(standards['funeral_expense']),
+        'daily_accommodation_fee': to_cents(standards['daily_accommodation_fee']),
+        'industry_salaries': {name: to_cents(salary) for name, salary in standard_set.industry_salaries.items()},
+        'income_by_age': [to_cents(income) for income in standard_set.income_by_age],
+    }
+
+
+def _plain_cents(attribute):
+    """直接取输入金额的项目"""
+    def calculate(case, cents):
+        return to_cents(getattr(case, attribute))
+    return calculate
+
+
+def meal_subsidy_cents(case, cents):
+    """住院伙食补助费 = 住院天数 × 补助标准"""
+    per_day = cents['daily_meal_subsidy'] if case.meal_subsidy is None else to_cents(case.meal_subsidy)
+    return case.hospital_days * per_day
+
+
+def accommodation_fee_cents(case, cents):
+    """住宿费 = 住宿天数 × 住宿费标准"""
+    return case.accommodation_days * cents['daily_accommodation_fee']
+
+
+def work_loss_fee_cents(case, cents):
+    """误工费（根据收入类型计算）"""
+    work_loss_days = case.work_loss_days
+    if work_loss_days <= 0:
+        return 0
+    income_type = case.work_income_type
+    if income_type == "固定收入":
+        monthly_income = to_cents(case.monthly_income)
+        return div_round(monthly_income * work_loss_days, 30) if case.monthly_income > 0 else 0
+    elif income_type == "无固定收入（能证明最近三年平均）":
+        return to_cents(case.avg_daily_income) * work_loss_days if case.avg_daily_income > 0 else 0
+    salaries = cents['industry_salaries']
+    salary = salaries.get(case.industry_type, salaries['其他行业'])
+    return div_round(salary * work_loss_days, 365)
+
+
+def nursing_fee_cents(case, cents):
+    """护理费（根据护理人员类型计算）"""
+    nursing_days = case.nursing_days
+    if nursing_days <= 0:
+        return 0
+    nursing_count = 1 if case.nursing_count is None else case.nursing_count
+    if case.nursing_type == "有收入":
+        if case.nursing_income > 0:
+            return to_cents(case.nursing_income) * nursing_days * nursing_count
+        return 0
+    return cents['daily_nursing_fee'] * nursing_days * nursing_count
+
+
+def _disability_basis_points(case):
+    """伤残系数（万分比）及是否计算残疾赔偿金"""
+    disability_level_str = case.disability_level
+    coefficient = lookup_disability_coefficient(disability_level_str).coefficient
+    has_disability = coefficient < 1.0 or (disability_level_str and disability_level_str != "无")
+    return coefficient_basis_points(coefficient), has_disability
+
+
+def disability_compensation_cents(case, cents):
+    """残疾赔偿金 = 可支配收入 × 赔偿年限 × 伤残系数"""
+    basis_points, has_disability = _disability_basis_points(case)
+    if not has_disability:
+        return 0
+    return div_round(_income_for_age(case, cents) * basis_points, 10000)
+
+
+def dependent_living_expense_cents(case, cents):
+    """被扶养人生活费（年赔偿总额不超过人均消费支出，受害人死亡的不乘伤残系数）"""
+    dependent_info_str = case.dependent_info.strip()
+    if not dependent_info_str:
+        return 0
+    try:
+        dependents = parse_dependent_info(dependent_info_str)
+    except ValueError:
+        return 0
+
+    # 各被扶养人的年生活费以公分母 denominator 表示为整数，分段合计后只在最后舍入一次
+    consumption = cents['consumption']
+    dependents = [(dependent_support_years(dep['age']), dep['support_count']) for dep in dependents]
+    dependents = [(years, support_count) for years, support_count in dependents if years > 0]
+    if not dependents:
+        return 0
+    denominator = math.lcm(*(support_count for _, support_count in dependents))
+    cap = consumption * denominator
+    expenses = sorted((years, cap // support_count) for years, support_count in dependents)
+
+    # 按赔偿年限排序后，经过每个分界点时从年生活费合计中减去到期的被扶养人
+    total = 0
+    year_total = sum(share for _, share in expenses)
+    start = 0
+    for years, share in expenses:
+        total += min(year_total, cap) * (years - start)
+        year_total -= share
+        start = years
+
+    basis_points = 10000 if case.is_death else _disability_basis_points(case)[0]
+    return div_round(total * basis_points, denominator * 10000)
+
+
+def death_compensation_cents(case, cents):
+    """死亡赔偿金 = 可支配收入 × 赔偿年限"""
+    return _income_for_age(case, cents) if case.is_death else 0
+
+
+def funeral_expense_cents(case, cents):
+    """丧葬费"""
+    return cents['funeral_expense'] if case.is_death else 0
+
+
+def _income_for_age(case, cents):
+    """可支配收入 × 赔偿年限（分）"""
+    return cents['income_by_age'][min(max(case.victim_age, 0), 75)]
+
+
+# 各项目的整数分计算函数，项目与 compensation_engine.ITEM_GRAPH 一一对应
+CENTS_CALCULATORS = {
+    '医疗费': _plain_cents('medical_expense'),
+    '后续治疗费': _plain_cents('follow_up_treatment_fee'),
+    '住院伙食补助费': meal_subsidy_cents,
+    '营养费': _plain_cents('nutrition_fee'),
+    '交通费': _plain_cents('traffic_fee'),
+    '住宿费': accommodation_fee_cents,
+    '误工费': work_loss_fee_cents,
+    '护理费': nursing_fee_cents,
+    '残疾赔偿金': disability_compensation_cents,
+    '残疾辅助器具费': _plain_cents('disability_appliance_fee'),
+    '被扶养人生活费': dependent_living_expense_cents,
+    '死亡赔偿金': death_compensation_cents,
+    '丧葬费': funeral_expense_cents,
+    '精神损害抚慰金': _plain_cents('mental_damage'),
+}
+
+
+def calculate_compensation_cents(case):
+    """
+    以整数分计算单个案件的各项赔偿
+
+    返回：项目名称到金额（整数分）的字典，含"总计"（各项目之和）
+    """
+    cents = _standard_cents(standard_set_for(case))
+    results = {item: calculate(case, cents) for item, calculate in CENTS_CALCULATORS.items()}
+    results['总计'] = sum(results.values())
+    return results
@@ -0,0 +1,841 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+广西人身损害赔偿计算引擎
+纯计算模块，不依赖Flask、Tkinter或python-docx，Web应用与图形界面共用
+"""
+
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from time import perf_counter
+from typing import Optional
+
+from standards import REGISTRY, calculate_compensation_years
+from metrics import ITEM_SECONDS
+
+# 赔偿标准按事故发生日期从登记表中选取（见 standards.py）；
+# STANDARDS、INDUSTRY_SALARIES 为最新一套标准，供页面显示和行业选项使用
+STANDARDS = REGISTRY.latest.standards
+INDUSTRY_SALARIES = REGISTRY.latest.industry_salaries
+
+# 伤残等级系数（GB18667-2002，各年度标准通用）
+DISABILITY_COEFFICIENTS = {
+    1: 1.0, 2: 0.9, 3: 0.8, 4: 0.7, 5: 0.6,
+    6: 0.5, 7: 0.4, 8: 0.3, 9: 0.2, 10: 0.1
+}
+
+# 赔偿项目的展示顺序（结果显示、总计公式和Word导出共用）
+ITEMS_ORDER = ['医疗费', '后续治疗费', '误工费', '护理费', '交通费', '住宿费', '住院伙食补助费',
+               '营养费', '残疾赔偿金', '残疾辅助器具费', '被扶养人生活费',
+               '死亡赔偿金', '丧葬费', '精神损害抚慰金']
+
+
+def standards_version():
+    """赔偿标准登记表的版本号，登记新的标准后版本号随之变化"""
+    return REGISTRY.version
+
+
+def standard_set_for(case):
+    """按事故发生日期选取适用的赔偿标准"""
+    return REGISTRY.for_date(case.accident_date)
+
+
+def get_float_value(value, default=0.0):
+    """获取浮点数值"""
+    try:
+        if isinstance(value, str):
+            value = value.strip()
+            return float(value) if value else default
+        return float(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+
+def get_int_value(value, default=0):
+    """获取整数值"""
+    try:
+        if isinstance(value, str):
+            value = value.strip()
+            return int(value) if value else default
+        return int(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+
+@dataclass
+class CaseInput:
+    """单个案件的计算输入
+
+    meal_subsidy、nursing_count 为 None 时使用默认值（标准补助、1人）。
+    """
+    victim_name: str = "未填写"
+    victim_age: int = 0
+    accident_date: str = ""
+    medical_expense: float = 0.0
+    follow_up_treatment_fee: float = 0.0
+    hospital_days: int = 0
+    meal_subsidy: Optional[float] = None
+    nutrition_fee: float = 0.0
+    traffic_fee: float = 0.0
+    accommodation_days: int = 0
+    work_income_type: str = "固定收入"
+    monthly_income: float = 0.0
+    avg_daily_income: float = 0.0
+    industry_type: str = "其他行业"
+    work_loss_days: int = 0
+    nursing_type: str = "无收入或雇佣护工"
+    nursing_income: float = 0.0
+    nursing_days: int = 0
+    nursing_count: Optional[int] = None
+    disability_level: str = "无"
+    disability_appliance_fee: float = 0.0
+    dependent_info: str = ""
+    is_death: bool = False
+    mental_damage: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data):
+        """从 /api/calculate 的请求数据构建计算输入（字段名与表单一致）"""
+        return cls(**{name: parse(data[name]) for name, parse in FORM_FIELD_PARSERS.items() if name in data})
+
+    def updated(self, changes):
+        """应用表单字段的修改，返回新的计算输入（取值规则与 from_dict 相同，未知字段忽略）"""
+        return replace(self, **{name: parse(changes[name]) for name, parse in FORM_FIELD_PARSERS.items()
+                                if name in changes})
+
+
+def _text_value(value):
+    """文本字段：去除首尾空白"""
+    return (value or '').strip()
+
+
+# 表单字段的取值规则；请求数据中缺少的字段使用 CaseInput 的默认值
+FORM_FIELD_PARSERS = {
+    'victim_name': lambda value: _text_value(value) or "未填写",
+    'victim_age': get_int_value,
+    'accident_date': _text_value,
+    'medical_expense': get_float_value,
+    'follow_up_treatment_fee': get_float_value,
+    'hospital_days': get_int_value,
+    'meal_subsidy': get_float_value,
+    'nutrition_fee': get_float_value,
+    'traffic_fee': get_float_value,
+    'accommodation_days': get_int_value,
+    'work_income_type': lambda value: value,
+    'monthly_income': get_float_value,
+    'avg_daily_income': get_float_value,
+    'industry_type': lambda value: value,
+    'work_loss_days': get_int_value,
+    'nursing_type': lambda value: value,
+    'nursing_income': get_float_value,
+    'nursing_days': get_int_value,
+    'nursing_count': get_int_value,
+    'disability_level': lambda value: _text_value(value) or "无",
+    'disability_appliance_fee': get_float_value,
+    'dependent_info': _text_value,
+    'is_death': bool,
+    'mental_damage': get_float_value,
+}
+
+
+@dataclass
+class CalculationResult:
+    """单个案件的计算结果
+
+    仅金额模式下 details 为 None，可调用 render_details() 按需生成计算详情。
+    """
+    results: dict
+    details: Optional[dict] = None
+    victim_name: str = "未填写"
+    victim_age: int = 0
+    case: Optional[CaseInput] = field(default=None, repr=False)
+
+    def render_details(self):
+        """按需生成计算详情"""
+        if self.details is None:
+            self.details = calculate_compensation(self.case).details
+        return self.details
+
+    def to_dict(self):
+        """转换为 /api/calculate 的响应格式（仅金额模式下不含 details）"""
+        data = {
+            'success': True,
+            'results': self.results,
+            'victim_name': self.victim_name,
+            'victim_age': self.victim_age
+        }
+        if self.details is not None:
+            data['details'] = self.details
+        return data
+
+
+class DisabilityCoefficient:
+    """伤残系数查表结果，计算详情在首次访问时才生成"""
+    __slots__ = ('coefficient', 'max_level', 'additional_index', 'level_counts', '_detail')
+
+    def __init__(self, coefficient, max_level, additional_index, level_counts=None, detail=None):
+        self.coefficient = coefficient
+        self.max_level = max_level
+        self.additional_index = additional_index
+        self.level_counts = level_counts  # 各伤残等级（1-10级）的处数
+        self._detail = detail
+
+    @property
+    def detail(self):
+        if self._detail is None:
+            self._detail = _render_disability_detail(self)
+        return self._detail
+
+    def as_tuple(self):
+        """返回：(最终伤残系数, 最高伤残等级, 附加指数, 计算详情)"""
+        return self.coefficient, self.max_level, self.additional_index, self.detail
+
+
+NO_DISABILITY = DisabilityCoefficient(1.0, None, 0.0, detail="无伤残，系数为1.0")
+DISABILITY_FORMAT_ERROR = DisabilityCoefficient(1.0, None, 0.0, detail="伤残等级格式错误，按无伤残处理")
+NO_VALID_DISABILITY = DisabilityCoefficient(1.0, None, 0.0, detail="无有效伤残等级，系数为1.0")
+
+
+def _additional_levels(level_counts, max_level):
+    """附加伤残等级：最高等级多出的处数及其他等级（1级除外）
+
+    返回：[(等级, 处数, 赔偿系数, 每处附加指数, 附加指数合计), ...]
+    """
+    additional_levels = []
+    for level in range(max_level, 11):
+        count = level_counts[level - 1]
+        if level == max_level:
+            # 最高等级的数量减1（如果有多个最高等级，多余的作为附加等级）
+            count -= 1
+        if count <= 0:
+            continue
+        level_coefficient = DISABILITY_COEFFICIENTS.get(level, 0)
+        level_additional = level_coefficient * 0.10
+        additional_levels.append((level, count, level_coefficient, level_additional, level_additional * count))
+    return additional_levels
+
+
+def _compute_disability_coefficient(level_counts):
+    """按各等级处数计算伤残系数（不生成计算详情）"""
+    max_level = next(level for level in range(1, 11) if level_counts[level - 1])
+
+    # 如果最高等级是1级，系数已经是100%，不需要附加指数
+    if max_level == 1:
+        return DisabilityCoefficient(1.0, 1, 0.0, level_counts)
+
+    # 计算附加指数，所有附加指数之和不超过10%（根据GB18667-2002标准）
+    additional_index = 0.0
+    for _, _, _, _, total_additional in _additional_levels(level_counts, max_level):
+        additional_index += total_additional
+    additional_index = min(additional_index, 0.10)
+
+    # 计算最终系数（不超过100%）
+    max_coefficient = DISABILITY_COEFFICIENTS.get(max_level, 1.0)
+    final_coefficient = min(max_coefficient + additional_index, 1.0)
+    return DisabilityCoefficient(final_coefficient, max_level, additional_index, level_counts)
+
+
+def _render_disability_detail(result):
+    """生成伤残系数的计算详情"""
+    level_counts = result.level_counts
+    max_level = result.max_level
+    display_levels = []
+    for level in range(1, 11):
+        count = level_counts[level - 1]
+        if count == 1:
+            display_levels.append(f"{level}级")
+        elif count > 1:
+            display_levels.append(f"{level}级×{count}")
+    detail_parts = [f"伤残等级：{', '.join(display_levels)}\n"]
+
+    if max_level == 1:
+        detail_parts.append(f"最高伤残等级：1级，系数：1.00（100%）\n")
+        detail_parts.append("1级伤残系数为100%，无需附加指数\n")
+        detail_parts.append("最终伤残系数 = 1.00（100%）")
+        return "".join(detail_parts)
+
+    max_coefficient = DISABILITY_COEFFICIENTS.get(max_level, 1.0)
+    detail_parts.append(f"最高伤残等级：{max_level}级，系数：{max_coefficient:.2f}\n")
+
+    additional_levels = _additional_levels(level_counts, max_level)
+    if additional_levels:
+        detail_parts.append("附加伤残等级：")
+        info_list = []
+        original_additional_index = 0.0
+        for level, count, coefficient, additional_per_unit, total_additional in additional_levels:
+            original_additional_index += total_additional
+            if count == 1:
+                info_list.append(f"{level}级（赔偿系数{coefficient:.2f}，附加{additional_per_unit*100:.2f}%）")
+            else:
+                info_list.append(f"{level}级×{count}（赔偿系数{coefficient:.2f}，每处附加{additional_per_unit*100:.2f}%，合计{total_additional*100:.2f}%）")
+        detail_parts.append("、".join(info_list))
+
+        if original_additional_index > 0.10:
+            detail_parts.append(f"\n附加指数合计：{original_additional_index * 100:.2f}%，超过10%上限，按10%计算\n")
+        else:
+            detail_parts.append(f"\n附加指数合计：{result.additional_index * 100:.2f}%\n")
+    else:
+        detail_parts.append("无附加伤残等级\n")
+
+    detail_parts.append(f"最终伤残系数 = {max_coefficient:.2f} + {result.additional_index:.2f} = {result.coefficient:.2f}")
+    if result.coefficient >= 1.0:
+        detail_parts.append("（已达到100%上限）")
+    return "".join(detail_parts)
+
+
+def _precompute_disability_table(max_sites):
+    """预先计算不超过 max_sites 处伤残的全部等级组合"""
+    table = {}
+
+    def fill(level, remaining, counts):
+        if level > 10:
+            if any(counts):
+                key = tuple(counts)
+                table[key] = _compute_disability_coefficient(key)
+            return
+        for count in range(remaining + 1):
+            counts[level - 1] = count
+            fill(level + 1, remaining - count, counts)
+        counts[level - 1] = 0
+
+    fill(1, max_sites, [0] * 10)
+    return table
+
+
+# 常见组合（不超过3处伤残，共285种）在加载时建表；更长的组合按需计算并以LRU方式缓存
+DISABILITY_TABLE = _precompute_disability_table(3)
+
+
+@lru_cache(maxsize=1024)
+def _lookup_rare_disability_coefficient(level_counts):
+    return _compute_disability_coefficient(level_counts)
+
+
+@lru_cache(maxsize=4096)
+def lookup_disability_coefficient(disability_levels_str):
+    """
+    按伤残等级字符串查表得到伤残系数
+
+    字符串先归一化为各等级（1-10级）的处数，同一组合的不同写法（顺序、分隔符、是否带"级"）共享同一结果。
+
+    返回：DisabilityCoefficient
+    """
+    if not disability_levels_str or disability_levels_str.strip() == "无":
+        return NO_DISABILITY
+
+    # 解析伤残等级（支持逗号和分号分隔）
+    level_counts = [0] * 10
+    try:
+        parts = disability_levels_str.replace('，', ',').replace('；', ';').replace(',', ';').split(';')
+        for part in parts:
+            part = part.strip()
+            if not part:
+                continue
+            if '级' in part:
+                level = int(part.replace('级', '').strip())
+            else:
+                level = int(part.strip())
+            if 1 <= level <= 10:
+                level_counts[level - 1] += 1
+    except (ValueError, AttributeError):
+        return DISABILITY_FORMAT_ERROR
+
+    if not any(level_counts):
+        return NO_VALID_DISABILITY
+
+    level_counts = tuple(level_counts)
+    result = DISABILITY_TABLE.get(level_counts)
+    if result is None:
+        result = _lookup_rare_disability_coefficient(level_counts)
+    return result
+
+
+def calculate_multi_disability_coefficient(disability_levels_str):
+    """
+    计算多处伤残的伤残系数
+    根据《道路交通事故受伤人员伤残评定》（GB18667-2002）附录B及桂高法会〔2025〕13号文件规定：
+    1. 最高伤残等级系数：取所有伤残等级中最高的一个
+    2. 附加指数：每处附加伤残按该等级赔偿指数的10%计算，所有附加指数之和不超过10%
+    3. 最终伤残系数 = 最高伤残等级系数 + 附加指数（但不超过100%）
+
+    参数：
+    - disability_levels_str: 伤残等级字符串，如"5级,8级"或"3级;5级;9级"
+
+    返回：(最终伤残系数, 最高伤残等级, 附加指数, 计算详情)
+    """
+    return lookup_disability_coefficient(disability_levels_str).as_tuple()
+
+
+def calculate_work_loss_fee(case, with_details=True, standard_set=None):
+    """
+    计算误工费
+    根据《最高人民法院关于审理人身损害赔偿案件适用法律若干问题的解释》第20条
+    standard_set 为适用的赔偿标准，缺省时按事故发生日期选取
+    返回：(金额, 计算详情)；with_details 为 False 时不生成计算详情（返回 None）
+    """
+    work_loss_days = case.work_loss_days
+    if work_loss_days <= 0:
+        return 0, "误工天数为0，不计算误工费"
+
+    income_type = case.work_income_type
+
+    if income_type == "固定收入":
+        # 受害人有固定收入的，误工费按照实际减少的收入计算
+        monthly_income = case.monthly_income
+        if monthly_income > 0:
+            daily_income = monthly_income / 30
+            amount = daily_income * work_loss_days
+            if not with_details:
+                return amount, None
+            detail = f"固定收入计算：\n月收入：{monthly_income:,.2f}元\n日均收入 = 月收入 ÷ 30 = {monthly_income:,.2f} ÷ 30 = {daily_income:,.2f}元/天\n误工费 = 日均收入 × 误工天数 = {daily_income:,.2f} × {work_loss_days} = {amount:,.2f}元"
+            return amount, detail
+        else:
+            return 0, "月收入为0，不计算误工费"
+
+    elif income_type == "无固定收入（能证明最近三年平均）":
+        avg_daily_income = case.avg_daily_income
+        if avg_daily_income > 0:
+            amount = avg_daily_income * work_loss_days
+            if not with_details:
+                return amount, None
+            detail = f"无固定收入（能证明最近三年平均）计算：\n最近三年平均日均收入：{avg_daily_income:,.2f}元/天\n误工费 = 日均收入 × 误工天数 = {avg_daily_income:,.2f} × {work_loss_days} = {amount:,.2f}元"
+            return amount, detail
+        else:
+            return 0, "日均收入为0，不计算误工费"
+
+    else:
+        # 不能证明的，参照受诉法院所在地相同或者相近行业上一年度职工的平均工资计算
+        selected_industry = case.industry_type
+        standard_set = standard_set or standard_set_for(case)
+        daily_avg_salary = standard_set.daily_industry_salary(selected_industry)
+        amount = daily_avg_salary * work_loss_days
+        if not with_details:
+            return amount, None
+        industry_avg_salary = standard_set.industry_salary(selected_industry)
+        detail = f"无固定收入（不能证明，参照行业平均）计算\n选择行业：{selected_industry}\n行业平均工资：{industry_avg_salary:,.2f}元/年\n日均工资 = 年工资 ÷ 365 = {industry_avg_salary:,.2f} ÷ 365 = {daily_avg_salary:,.2f}元/天\n误工费 = 日均工资 × 误工天数 = {daily_avg_salary:,.2f} × {work_loss_days} = {amount:,.2f}元"
+        return amount, detail
+
+
+def calculate_nursing_fee(case, with_details=True, standard_set=None):
+    """
+    计算护理费
+    根据《最高人民法院关于审理人身损害赔偿案件适用法律若干问题的解释》第21条
+    standard_set 为适用的赔偿标准，缺省时按事故发生日期选取
+    返回：(金额, 计算详情)；with_details 为 False 时不生成计算详情（返回 None）
+    """
+    nursing_days = case.nursing_days
+    nursing_count = 1 if case.nursing_count is None else case.nursing_count
+
+    if nursing_days <= 0:
+        return 0, "护理天数为0，不计算护理费"
+
+    nursing_type = case.nursing_type
+
+    if nursing_type == "有收入":
+        # 护理人员有收入的，参照误工费的规定计算
+        nursing_income = case.nursing_income
+        if nursing_income > 0:
+            amount = nursing_income * nursing_days * nursing_count
+            if not with_details:
+                return amount, None
+            detail = f"护理人员有收入计算：\n护理人员日均收入：{nursing_income:,.2f}元/天\n护理天数：{nursing_days}天\n护理人数：{nursing_count}人\n护理费 = 日均收入 × 护理天数 × 护理人数 = {nursing_income:,.2f} × {nursing_days} × {nursing_count} = {amount:,.2f}元"
+            return amount, detail
+        else:
+            return 0, "护理人员日均收入为0，不计算护理费"
+    else:
+        # 护理人员没有收入或者雇佣护工的，参照当地护工从事同等级别护理的劳务报酬标准计算
+        standard_set = standard_set or standard_set_for(case)
+        nursing_fee_per_day = standard_set.standards['daily_nursing_fee']
+        amount = nursing_fee_per_day * nursing_days * nursing_count
+        if not with_details:
+            return amount, None
+        detail = f"无收入或雇佣护工计算：\n护工标准：{nursing_fee_per_day:,.2f}元/天\n护理天数：{nursing_days}天\n护理人数：{nursing_count}人\n护理费 = 护工标准 × 护理天数 × 护理人数 = {nursing_fee_per_day:,.2f} × {nursing_days} × {nursing_count} = {amount:,.2f}元"
+        return amount, detail
+
+
+def parse_dependent_info(dependent_info_str):
+    """
+    解析被扶养人信息：格式为"年龄1,扶养人数1;年龄2,扶养人数2"，只有年龄时扶养人数为1
+    返回：[{'age': 年龄, 'support_count': 扶养人数}, ...]；格式错误时抛出 ValueError
+    """
+    dependents = []
+    for item in dependent_info_str.split(';'):
+        item = item.strip()
+        if not item:
+            continue
+        if ',' in item:
+            parts = item.split(',')
+            age = int(parts[0].strip())
+            support_count = int(parts[1].strip()) if len(parts) > 1 else 1
+            dependents.append({'age': age, 'support_count': support_count})
+        else:
+            # 如果没有逗号，只有年龄，默认扶养人数为1
+            age = int(item)
+            dependents.append({'age': age, 'support_count': 1})
+    return dependents
+
+
+def dependent_support_years(age):
+    """被扶养人生活费的计算年限：不满18周岁按(18-年龄)年，18-60周岁20年，60-75周岁每增加一岁减少一年，75周岁以上5年"""
+    if age < 18:
+        return 18 - age
+    elif age < 60:
+        return 20
+    elif age < 75:
+        return 20 - (age - 60)
+    return 5
+
+
+# 年生活费合计按 _EXACT_SCALE 倍的整数精确加减：不小于 2**-75 元的浮点数金额乘以 2**128 都是整数，
+# 合计除以 _EXACT_SCALE 得到最接近精确合计的浮点数，与相加顺序无关
+_EXACT_SCALE = 2 ** 128
+
+
+def calculate_dependent_living_expense(case, victim_age, disability_coefficient=1.0, is_death=False,
+                                       with_details=True, standard_set=None):
+    """
+    计算被扶养人生活费
+    根据《最高人民法院关于审理人身损害赔偿案件适用法律若干问题的解释》第28条
+    2025年标准统一使用城镇居民人均消费支出
+
+    计算公式：
+    1. 不满18周岁：生活费 = 消费支出 × (18-实际年龄)
+    2. 18-60周岁（无劳动能力）：生活费 = 消费支出 × 20年
+    3. 60-75周岁：生活费 = 消费支出 × [20-(实际年龄-60)]年
+    4. 75周岁以上：生活费 = 消费支出 × 5年
+    5. 有其他扶养人时：赔偿义务人承担的费用 = 生活费 ÷ 扶养人数
+    6. 被扶养人有数人时：年赔偿总额 ≤ 消费支出
+    7. 需要考虑伤残系数：最终金额 = 计算金额 × 伤残系数
+    8. 受害人死亡的，无需乘以伤残系数（视为系数100%）
+
+    standard_set 为适用的赔偿标准，缺省时按事故发生日期选取
+    返回：(金额, 计算详情)；with_details 为 False 时不生成计算详情（返回 None）
+    """
+    dependent_info_str = case.dependent_info.strip()
+    if not dependent_info_str:
+        return 0, "未填写被扶养人信息，不计算被扶养人生活费"
+
+    standard_set = standard_set or standard_set_for(case)
+    base_consumption = standard_set.standards['consumption']  # 统一使用城镇居民标准
+    consumption_type = "广西上一年度城镇居民人均消费支出"
+
+    try:
+        dependents = parse_dependent_info(dependent_info_str)
+    except ValueError:
+        return 0, "被扶养人信息格式错误"
+
+    if not dependents:
+        return 0, "未填写被扶养人信息，不计算被扶养人生活费"
+
+    # 计算每个被扶养人的生活费年限和年生活费
+    dependent_expenses = []
+    detail_parts = [f"{consumption_type}：{base_consumption:,.2f}元/年\n"] if with_details else None
+
+    for idx, dep in enumerate(dependents):
+        age = dep['age']
+        support_count = dep['support_count']
+
+        years = dependent_support_years(age)
+        if years <= 0:
+            continue
+
+        annual_expense_per_dependent = standard_set.consumption_share(support_count)
+        dependent_expenses.append({
+            'age': age,
+            'years': years,
+            'support_count': support_count,
+            'annual_expense': annual_expense_per_dependent
+        })
+
+        if with_details:
+            if age < 18:
+                age_desc = f"不满18周岁，按(18-{age})年计算"
+            elif age < 60:
+                age_desc = f"18-60周岁（无劳动能力），按20年计算"
+            elif age < 75:
+                age_desc = f"60-75周岁，按[20-({age}-60)]={years}年计算"
+            else:
+                age_desc = f"75周岁以上，按5年计算"
+            detail_parts.append(f"被扶养人{idx+1}：{age}岁，{age_desc}，扶养人数{support_count}人\n年生活费 = {base_consumption:,.2f} ÷ {support_count} = {annual_expense_per_dependent:,.2f}元/年\n")
+
+    if not dependent_expenses:
+        return 0, "被扶养人信息无效"
+
+    # 计算总费用，考虑年赔偿总额限制
+    # 按被扶养人赔偿年限的分界点分段计算：相邻分界点之间在世被扶养人不变，年生活费合计也不变，
+    # 计算量只与不同赔偿年限的个数有关，连续相同的年份合并为一个区间（如"第1–12年"）
+    # 被扶养人按赔偿年限排序一次，经过每个分界点时从年生活费合计中减去到期的被扶养人
+    total_expense = 0
+    year_details = []
+    year_amounts = []
+    by_years = sorted(dependent_expenses, key=lambda exp: exp['years'])
+    running_total = 0
+    for exp in dependent_expenses:
+        exp['exact'] = int(exp['annual_expense'] * _EXACT_SCALE)
+        running_total += exp['exact']
+    expired = 0
+    start = 0
+    while expired < len(by_years):
+        end = by_years[expired]['years']
+
+        # 年赔偿总额不能超过消费支出
+        original_total = running_total / _EXACT_SCALE
+        year_total = min(original_total, base_consumption)
+        span = end - start
+        total_expense += year_total * span
+
+        if with_details and year_total > 0:
+            year_range = f"第{end}年" if span == 1 else f"第{start+1}–{end}年"
+            active_deps = '+'.join(f"{exp['age']}岁" for exp in dependent_expenses if exp['years'] > start)
+            if original_total > base_consumption:
+                year_details.append(f"{year_range}：{active_deps}的年生活费合计{original_total:,.2f}元，超过{base_consumption:,.2f}元，按{base_consumption:,.2f}元计算")
+            else:
+                year_details.append(f"{year_range}：{active_deps}的年生活费合计{year_total:,.2f}元")
+            year_amounts.append(f"{year_total:,.2f}" if span == 1 else f"{year_total:,.2f} × {span}")
+        while expired < len(by_years) and by_years[expired]['years'] == end:
+            running_total -= by_years[expired]['exact']
+            expired += 1
+        start = end
+
+    # 应用伤残系数（死亡情况下系数为100%）
+    original_total = total_expense
+    total_expense = total_expense * disability_coefficient
+    if not with_details:
+        return total_expense, None
+
+    total_formula = " + ".join(year_amounts) if year_amounts else "0"
+
+    if is_death:
+        detail = "".join(detail_parts) + "\n按年计算明细：\n" + "\n".join(year_details) + f"\n\n小计 = " + total_formula + f" = {original_total:,.2f}元\n受害人死亡，系数为100%（无需乘以伤残系数）\n被扶养人生活费 = 小计 × 100% = {original_total:,.2f} × 1.0 = {total_expense:,.2f}元"
+    elif disability_coefficient < 1.0:
+        detail = "".join(detail_parts) + "\n按年计算明细：\n" + "\n".join(year_details) + f"\n\n小计 = " + total_formula + f" = {original_total:,.2f}元\n伤残系数：{disability_coefficient:.2f}\n被扶养人生活费 = 小计 × 伤残系数 = {original_total:,.2f} × {disability_coefficient:.2f} = {total_expense:,.2f}元"
+    else:
+        detail = "".join(detail_parts) + "\n按年计算明细：\n" + "\n".join(year_details) + f"\n\n总计 = " + total_formula + f" = {total_expense:,.2f}元"
+
+    return total_expense, detail
+
+
+def compensation_year_desc(victim_age, years):
+    """赔偿年限说明"""
+    if victim_age < 60:
+        return f"{years}年"
+    elif victim_age < 75:
+        return f"{years}年（60周岁以上每增加一岁减少一年）"
+    return f"{years}年（75周岁以上按5年计算）"
+
+
+def _plain_item(attribute, template):
+    """直接取输入金额的项目"""
+    def calculate(case, with_details=True, standard_set=None):
+        amount = getattr(case, attribute)
+        if with_details and amount > 0:
+            return amount, template.format(amount=amount)
+        return amount, None
+    return calculate
+
+
+def calculate_meal_subsidy(case, with_details=True, standard_set=None):
+    """住院伙食补助费 = 住院天数 × 补助标准"""
+    hospital_days = case.hospital_days
+    if case.meal_subsidy is None:
+        meal_subsidy_per_day = (standard_set or standard_set_for(case)).default_meal_subsidy
+    else:
+        meal_subsidy_per_day = case.meal_subsidy
+    amount = hospital_days * meal_subsidy_per_day
+    if with_details and amount > 0:
+        return amount, f"住院天数：{hospital_days}天\n补助标准：{meal_subsidy_per_day:,.2f}元/天\n住院伙食补助费 = 住院天数 × 补助标准 = {hospital_days} × {meal_subsidy_per_day:,.2f} = {amount:,.2f}元"
+    return amount, None
+
+
+def calculate_accommodation_fee(case, with_details=True, standard_set=None):
+    """住宿费 = 住宿天数 × 住宿费标准（330元/天）"""
+    accommodation_days = case.accommodation_days
+    accommodation_fee_per_day = (standard_set or standard_set_for(case)).standards['daily_accommodation_fee']
+    amount = accommodation_days * accommodation_fee_per_day
+    if with_details and amount > 0:
+        return amount, f"住宿天数：{accommodation_days}天\n住宿费标准：{accommodation_fee_per_day:,.2f}元/天\n住宿费 = 住宿天数 × 住宿费标准 = {accommodation_days} × {accommodation_fee_per_day:,.2f} = {amount:,.2f}元"
+    return amount, None
+
+
+def _work_loss_item(case, with_details=True, standard_set=None):
+    """误工费（根据收入类型计算），金额为0时也保留说明"""
+    amount, detail = calculate_work_loss_fee(case, with_details, standard_set)
+    return amount, detail if with_details else None
+
+
+def _nursing_item(case, with_details=True, standard_set=None):
+    """护理费（根据护理人员类型计算），金额为0时也保留说明"""
+    amount, detail = calculate_nursing_fee(case, with_details, standard_set)
+    return amount, detail if with_details else None
+
+
+def calculate_disability_compensation(case, with_details=True, standard_set=None):
+    """残疾赔偿金（2025年标准统一使用城镇居民人均可支配收入，支持多处伤残）"""
+    disability_level_str = case.disability_level
+    disability = lookup_disability_coefficient(disability_level_str)
+    disability_coefficient = disability.coefficient
+
+    if disability_coefficient < 1.0 or (disability_level_str and disability_level_str != "无"):
+        victim_age = case.victim_age
+        standard_set = standard_set or standard_set_for(case)
+        amount = standard_set.income_for_age(victim_age) * disability_coefficient
+        if not with_details:
+            return amount, None
+        base_income = standard_set.standards['disposable_income']
+        years = calculate_compensation_years(victim_age)
+        income_type = "广西上一年度城镇居民人均可支配收入"
+        year_desc = compensation_year_desc(victim_age, years)
+        return amount, f"{disability.detail}\n{income_type}：{base_income:,.2f}元/年\n赔偿年限：{year_desc}\n残疾赔偿金 = {income_type} × 赔偿年限 × 伤残系数 = {base_income:,.2f} × {years} × {disability_coefficient:.2f} = {amount:,.2f}元"
+    return 0, None
+
+
+def _dependent_item(case, with_details=True, standard_set=None):
+    """被扶养人生活费（受害人死亡的，无需乘以伤残系数，视为系数100%）"""
+    if case.is_death:
+        dependent_coefficient = 1.0
+    else:
+        dependent_coefficient = lookup_disability_coefficient(case.disability_level).coefficient
+    amount, detail = calculate_dependent_living_expense(
+        case, case.victim_age, dependent_coefficient, case.is_death, with_details, standard_set)
+    if with_details and amount > 0:
+        return amount, detail
+    return amount, None
+
+
+def calculate_death_compensation(case, with_details=True, standard_set=None):
+    """死亡赔偿金（2025年标准统一使用城镇居民人均可支配收入）"""
+    if not case.is_death:
+        return 0, None
+    victim_age = case.victim_age
+    standard_set = standard_set or standard_set_for(case)
+    amount = standard_set.income_for_age(victim_age)
+    if not with_details:
+        return amount, None
+    base_income = standard_set.standards['disposable_income']
+    years = calculate_compensation_years(victim_age)
+    income_type = "广西上一年度城镇居民人均可支配收入"
+    year_desc = compensation_year_desc(victim_age, years)
+    return amount, f"{income_type}：{base_income:,.2f}元/年\n赔偿年限：{year_desc}\n死亡赔偿金 = {income_type} × 赔偿年限 = {base_income:,.2f} × {years} = {amount:,.2f}元"
+
+
+def calculate_funeral_expense(case, with_details=True, standard_set=None):
+    """丧葬费"""
+    if not case.is_death:
+        return 0, None
+    amount = (standard_set or standard_set_for(case)).standards['funeral_expense']
+    return amount, f"丧葬费 = {amount:,.2f}元" if with_details else None
+
+
+# 赔偿项目依赖图：(项目, 计算函数, 依赖的输入字段)，按计算顺序排列
+# 计算函数的参数为 (计算输入, 是否生成详情, 适用的赔偿标准)，返回 (金额, 计算详情)，不需要详情时详情为 None；
+# 增量重算时只重算依赖字段有变化的项目，总计按相同顺序重新累加，保证与完整计算结果一致
+ITEM_GRAPH = [
+    ('医疗费', _plain_item('medical_expense', "医疗费 = 诊疗费 + 医药费 + 住院费 = {amount:,.2f}元"),
+     ('medical_expense',)),
+    ('后续治疗费', _plain_item('follow_up_treatment_fee', "后续治疗费 = {amount:,.2f}元"),
+     ('follow_up_treatment_fee',)),
+    ('住院伙食补助费', calculate_meal_subsidy, ('hospital_days', 'meal_subsidy', 'accident_date')),
+    ('营养费', _plain_item('nutrition_fee', "营养费 = {amount:,.2f}元"), ('nutrition_fee',)),
+    ('交通费', _plain_item('traffic_fee', "交通费 = {amount:,.2f}元"), ('traffic_fee',)),
+    ('住宿费', calculate_accommodation_fee, ('accommodation_days', 'accident_date')),
+    ('误工费', _work_loss_item,
+     ('work_loss_days', 'work_income_type', 'monthly_income', 'avg_daily_income', 'industry_type',
+      'accident_date')),
+    ('护理费', _nursing_item,
+     ('nursing_days', 'nursing_count', 'nursing_type', 'nursing_income', 'accident_date')),
+    ('残疾赔偿金', calculate_disability_compensation, ('disability_level', 'victim_age', 'accident_date')),
+    ('残疾辅助器具费', _plain_item('disability_appliance_fee', "残疾辅助器具费 = {amount:,.2f}元"),
+     ('disability_appliance_fee',)),
+    ('被扶养人生活费', _dependent_item, ('dependent_info', 'disability_level', 'is_death', 'accident_date')),
+    ('死亡赔偿金', calculate_death_compensation, ('is_death', 'victim_age', 'accident_date')),
+    ('丧葬费', calculate_funeral_expense, ('is_death', 'accident_date')),
+    ('精神损害抚慰金', _plain_item('mental_damage', "精神损害抚慰金 = {amount:,.2f}元"), ('mental_damage',)),
+]
+
+# 项目 -> 依赖的输入字段
+ITEM_DEPENDENCIES = {item: frozenset(dependencies) for item, _, dependencies in ITEM_GRAPH}
+
+
+def affected_items(changed_fields):
+    """输入字段变化后需要重算的项目（按计算顺序）"""
+    changed = set(changed_fields)
+    return [item for item, _, dependencies in ITEM_GRAPH if changed.intersection(dependencies)]
+
+
+def _finish_result(case, results, calculation_details):
+    """累加总计并生成总计公式"""
+    total = sum(results.values())
+    results['总计'] = total
+
+    if calculation_details is not None:
+        valid_items = [item for item in ITEMS_ORDER if item in results and results[item] > 0]
+        total_formula = " + ".join([f"{results[item]:,.2f}" for item in valid_items])
+        calculation_details['总计'] = f"总计 = {total_formula} = {total:,.2f}元"
+
+    return CalculationResult(results, calculation_details, case.victim_name, case.victim_age, case)
+
+
+def calculate_compensation(case, with_details=True, standard_set=None):
+    """计算单个案件的各项赔偿
+
+    参数：
+    - case: CaseInput 计算输入
+    - with_details: 是否生成计算详情；为 False 时只计算金额（仅金额模式），
+      结果的 details 为 None，需要时再调用 CalculationResult.render_details()
+    - standard_set: 适用的赔偿标准，缺省时按事故发生日期选取（同一事故的多名受害人由调用方选取一次后传入）
+
+    返回：CalculationResult
+    """
+    results = {}
+    calculation_details = {} if with_details else None
+    standard_set = standard_set or standard_set_for(case)
+    timings = []
+    started = perf_counter()
+    for item, calculate, _ in ITEM_GRAPH:
+        amount, detail = calculate(case, with_details, standard_set)
+        finished = perf_counter()
+        timings.append((item, finished - started))
+        started = finished
+        results[item] = amount
+        if detail is not None:
+            calculation_details[item] = detail
+    ITEM_SECONDS.observe_many(timings)
+    return _finish_result(case, results, calculation_details)
+
+
+def recalculate_compensation(previous, changes, with_details=None):
+    """增量重算：在上一次计算结果的基础上应用字段修改，只重算受影响的项目和总计
+
+    参数：
+    - previous: 上一次的 CalculationResult（须带有 case）
+    - changes: 修改的表单字段（字段名与 /api/calculate 相同）
+    - with_details: 是否生成计算详情，默认与上一次结果相同
+
+    返回：(CalculationResult, 重算的项目列表)
+    """
+    if with_details is None:
+        with_details = previous.details is not None
+    case = previous.case.updated(changes)
+    if with_details and previous.details is None:
+        # 上一次为仅金额模式，没有可复用的计算详情
+        return calculate_compensation(case), list(ITEM_DEPENDENCIES)
+
+    changed_fields = [f.name for f in fields(CaseInput) if getattr(case, f.name) != getattr(previous.case, f.name)]
+    recalculated = affected_items(changed_fields)
+    results = {}
+    calculation_details = {} if with_details else None
+    standard_set = standard_set_for(case)
+    timings = []
+    for item, calculate, _ in ITEM_GRAPH:
+        if item in recalculated:
+            started = perf_counter()
+            amount, detail = calculate(case, with_details, standard_set)
+            timings.append((item, perf_counter() - started))
+        else:
+            amount = previous.results[item]
+            detail = previous.details.get(item) if with_details else None
+        results[item] = amount
+        if detail is not None:
+            calculation_details[item] = detail
+    ITEM_SECONDS.observe_many(timings)
+    return _finish_result(case, results, calculation_details), recalculated
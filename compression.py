@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+响应压缩
+按请求头 Accept-Encoding 协商压缩方式：安装了 brotli 库时优先使用 br，否则使用 gzip。
+只压缩超过大小阈值的文本类响应（HTML、JSON、CSS、JS）；Word文档和zip压缩包本身已压缩，不再压缩。
+页面静态文件在启动时按最高压缩级别预先压缩，请求时直接返回压缩好的内容。
+"""
+
+import gzip
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖
+    brotli = None
+
+# 支持的压缩方式（按优先顺序）
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+# 压缩的响应类型
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'text/html', 'text/css', 'text/javascript', 'text/plain', 'application/javascript', 'application/json',
+})
+# 动态响应的 brotli 压缩级别（0-11，级别越高越慢）；gzip 级别由调用方指定
+BROTLI_QUALITY = 5
+
+
+def compress(data, encoding, level=6):
+    """按 encoding（br 或 gzip）压缩 data；gzip 不写入时间戳，同样的内容压缩结果相同"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY if level < 9 else 11)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def negotiate(accept_encodings):
+    """按请求头 Accept-Encoding（werkzeug 的 request.accept_encodings）选择压缩方式，不压缩返回 None"""
+    return accept_encodings.best_match(ENCODINGS)
+
+
+class CompressionStats:
+    """线程安全的压缩统计：各压缩方式的响应数、压缩前后字节数、压缩用的CPU时间（秒）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.precompress_cpu_seconds = 0.0
+
+    def record(self, encoding, original_size, compressed_size, cpu_seconds=0.0):
+        with self._lock:
+            entry = self._stats.get(encoding)
+            if entry is None:
+                entry = self._stats[encoding] = {'responses': 0, 'original_bytes': 0, 'compressed_bytes': 0,
+                                                 'cpu_seconds': 0.0}
+            entry['responses'] += 1
+            entry['original_bytes'] += original_size
+            entry['compressed_bytes'] += compressed_size
+            entry['cpu_seconds'] += cpu_seconds
+
+    def stats(self):
+        with self._lock:
+            encodings = {encoding: {**entry, 'bytes_saved': entry['original_bytes'] - entry['compressed_bytes']}
+                         for encoding, entry in self._stats.items()}
+        return {
+            'encodings': encodings,
+            'bytes_saved': sum(entry['bytes_saved'] for entry in encodings.values()),
+            'cpu_seconds': sum(entry['cpu_seconds'] for entry in encodings.values()),
+            'precompress_cpu_seconds': self.precompress_cpu_seconds,
+            'available': list(ENCODINGS),
+        }
+
+
+def precompress_assets(assets, stats=None):
+    """
+    预先压缩静态文件（StaticAssets）：每个文件的各压缩方式的内容存入 asset.encoded，
+    压缩后没有变小的不保存
+    """
+    started = time.process_time()
+    for asset in assets:
+        for encoding in ENCODINGS:
+            content = compress(asset.content, encoding, level=9)
+            if len(content) < len(asset.content):
+                asset.encoded[encoding] = content
+    if stats is not None:
+        stats.precompress_cpu_seconds += time.process_time() - started
+
+
+def compress_response(response, accept_encodings, min_size, level=6, stats=None):
+    """
+    按协商的压缩方式压缩响应（Flask after_request 中调用），返回 response
+
+    只处理状态码200、内容已在内存中且未压缩的文本类响应；压缩后 ETag 改为弱ETag（内容编码不同，字节不同）。
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    encoding = negotiate(accept_encodings)
+    if encoding is None:
+        return response
+
+    started = time.thread_time()
+    compressed = compress(data, encoding, level)
+    cpu_seconds = time.thread_time() - started
+    if stats is not None:
+        stats.record(encoding, len(data), len(compressed), cpu_seconds)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
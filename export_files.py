@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+导出文件的缓冲与临时目录清理
+导出内容先写入内存缓冲区，超过阈值时才转存到临时目录中的匿名文件（关闭后自动删除）；
+后台清理线程定期删除临时目录中过期的导出文件（如旧版本遗留的报告）。
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+# 清理线程只删除这些类型的文件
+EXPORT_SUFFIXES = ('.docx', '.zip')
+
+
+def new_export_buffer(spill_threshold=None, directory=None):
+    """
+    创建导出缓冲区
+
+    参数：
+    - spill_threshold: 超过该字节数时转存到磁盘；None 或 0 表示始终在内存中
+    - directory: 转存文件所在目录，缺省为系统临时目录
+    """
+    if not spill_threshold:
+        spill_threshold = 0
+    return tempfile.SpooledTemporaryFile(max_size=spill_threshold, mode='w+b', suffix='.docx', dir=directory)
+
+
+def is_spilled(buffer):
+    """缓冲区是否已转存到磁盘"""
+    return getattr(buffer, '_rolled', False)
+
+
+class TempDirJanitor:
+    """后台清理线程：定期删除目录中超过 max_age 秒的导出文件"""
+
+    def __init__(self, directory, max_age=3600, interval=600):
+        self.directory = directory
+        self.max_age = max_age
+        self.interval = interval
+        self.removed = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def sweep(self):
+        """清理一次，返回删除的文件数"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return 0
+        deadline = time.time() - self.max_age
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.endswith(EXPORT_SUFFIXES):
+                continue
+            try:
+                if entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        self.removed += removed
+        return removed
+
+    def _run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                import traceback
+                traceback.print_exc()
+            time.sleep(self.interval)
+
+    def ensure_started(self):
+        """启动清理线程（已启动则忽略）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='export-janitor', daemon=True)
+                self._thread.start()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Word报告异步导出任务
+报告在独立的进程池中生成，不占用Web进程的GIL，交互式的计算请求不会被批量导出阻塞。
+工作进程启动时预先导入 python-docx 并生成报告骨架和模板，以较低的调度优先级运行。
+
+任务流程：提交（submit）-> 查询状态（get）-> 下载（任务的 content）；排队和运行中的任务数有上限，
+可取消（排队中的任务不再生成；运行中的任务生成结果被丢弃）。
+
+多进程部署（serve.py）时各Web工作进程有各自的任务队列，任务状态和生成的文件另写入共享任务目录（shared_dir），
+查询、下载和取消请求由其他进程处理时从该目录读取。
+"""
+
+import json
+import os
+import re
+import secrets
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from report_writer import write_report, prepare_report_templates
+from standards import REGISTRY
+
+# 任务状态
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+# 任务编号（secrets.token_urlsafe(12)），共享任务目录中的文件以此命名
+_JOB_ID = re.compile(r'[A-Za-z0-9_-]{16}')
+# 共享任务目录中过期文件的清理间隔（秒）
+SHARED_SWEEP_INTERVAL = 60
+
+
+class QueueFullError(Exception):
+    """排队的导出任务已达上限"""
+
+
+def _init_worker(nice):
+    """工作进程初始化：降低调度优先级，生成报告骨架和模板"""
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+    prepare_report_templates()
+
+
+def new_executor(max_workers=2, nice=10):
+    """创建导出工作进程池（spawn：工作进程不继承Web进程的线程和打开的连接）"""
+    return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker, initargs=(nice,))
+
+
+def _warm_up():
+    """预热用的空任务：工作进程完成初始化后才会执行"""
+    return os.getpid()
+
+
+def render_report(report, standards_date, backend):
+    """在工作进程中生成报告，返回 (文件内容, 开始时间, 生成耗时秒数)"""
+    started = time.time()
+    buffer = BytesIO()
+    write_report(buffer, report['results'], report['details'], report['victim_name'], report['victim_age'],
+                 report['accident_date'], standard_set=REGISTRY.for_date(standards_date), backend=backend)
+    return buffer.getvalue(), started, time.time() - started
+
+
+def _write_atomic(path, data):
+    """写入文件（先写临时文件再改名，读取方不会读到写了一半的文件）"""
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as stream:
+        stream.write(data)
+    os.replace(temp_path, path)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ExportJob:
+    """导出任务"""
+
+    __slots__ = ('job_id', 'download_name', 'cache_key', 'status', 'error', 'content',
+                 'submitted_at', 'started_at', 'finished_at', 'render_seconds', 'future', 'owner')
+
+    # 写入共享任务目录的属性
+    STATE_FIELDS = ('job_id', 'download_name', 'cache_key', 'status', 'error',
+                    'submitted_at', 'started_at', 'finished_at', 'render_seconds', 'owner')
+
+    def __init__(self, job_id, download_name, cache_key=None):
+        self.job_id = job_id
+        self.download_name = download_name
+        self.cache_key = cache_key
+        self.status = QUEUED
+        self.error = None
+        self.content = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.render_seconds = None
+        self.future = None
+        self.owner = os.getpid()
+
+    def to_state(self):
+        """任务状态（写入共享任务目录）"""
+        return {name: getattr(self, name) for name in self.STATE_FIELDS}
+
+    @classmethod
+    def from_state(cls, state):
+        """由共享任务目录中的任务状态还原（不含生成的文件）"""
+        job = cls(state['job_id'], state['download_name'], state['cache_key'])
+        for name in cls.STATE_FIELDS:
+            setattr(job, name, state[name])
+        return job
+
+    def to_dict(self):
+        """任务状态（/api/export_jobs/<job_id> 的响应格式）"""
+        status = self.status
+        if status == QUEUED and self.future is not None and self.future.running():
+            status = RUNNING
+        data = {
+            'job_id': self.job_id,
+            'status': status,
+            'error': self.error,
+            'size': len(self.content) if self.content is not None else None,
+            'queued_seconds': None,
+            'render_seconds': self.render_seconds,
+            'total_seconds': None,
+        }
+        if self.started_at is not None:
+            data['queued_seconds'] = max(self.started_at - self.submitted_at, 0.0)
+        if self.finished_at is not None:
+            data['total_seconds'] = self.finished_at - self.submitted_at
+        return data
+
+
+class ExportJobQueue:
+    """
+    导出任务队列
+
+    参数：
+    - max_workers: 工作进程数
+    - max_pending: 未完成（排队及运行中）的任务数上限，超出时 submit 抛出 QueueFullError
+    - job_ttl: 已完成的任务（含生成的文件）保留时间（秒）
+    - max_finished: 保留的已完成任务数上限
+    - nice: 工作进程的调度优先级增量（Unix），0 表示不调整
+    - cache: 导出文件缓存（ResultCache），生成完成的文件按任务的缓存键写入
+    - shared_dir: 共享任务目录（多个进程共用），None 表示任务只在本进程中可见
+    """
+
+    def __init__(self, max_workers=2, max_pending=64, job_ttl=600, max_finished=256, nice=10, cache=None,
+                 shared_dir=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.max_finished = max_finished
+        self.nice = nice
+        self.cache = cache
+        self.shared_dir = shared_dir
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rendered = 0
+        self.render_seconds = 0.0
+        self._jobs = {}
+        self._executor = None
+        self._warm_futures = ()
+        self._lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._swept_at = 0.0
+
+    def get_executor(self):
+        """工作进程池（首次使用时启动）；批量导出（report_archive）也使用同一进程池"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = new_executor(self.max_workers, self.nice)
+                # 每个工作进程执行一个空任务，全部完成即工作进程均已启动并生成了报告模板
+                self._warm_futures = [self._executor.submit(_warm_up) for _ in range(self.max_workers)]
+            return self._executor
+
+    def warm(self):
+        """启动进程池，不等待工作进程初始化完成（用 is_warm 查询）"""
+        self.get_executor()
+
+    def is_warm(self):
+        """进程池是否已启动且工作进程均已完成初始化"""
+        with self._executor_lock:
+            if self._executor is None:
+                return False
+            futures = self._warm_futures
+        return all(future.done() and not future.cancelled() and future.exception() is None for future in futures)
+
+    def reset_executor(self, broken):
+        """丢弃不可用的进程池 broken（工作进程异常退出后），下次使用时重新启动"""
+        with self._executor_lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+            self._warm_futures = ()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _shared_path(self, job_id, suffix):
+        return os.path.join(self.shared_dir, job_id + suffix)
+
+    def _publish(self, job):
+        """把任务状态（完成时连同生成的文件）写入共享任务目录"""
+        if not self.shared_dir:
+            return
+        try:
+            if job.status == DONE:
+                _write_atomic(self._shared_path(job.job_id, '.docx'), job.content)
+            _write_atomic(self._shared_path(job.job_id, '.json'), json.dumps(job.to_state()).encode('utf-8'))
+        except OSError:
+            import traceback
+            traceback.print_exc()
+
+    def _cancel_requested(self, job_id):
+        """其他进程是否请求取消该任务"""
+        return bool(self.shared_dir) and os.path.exists(self._shared_path(job_id, '.cancel'))
+
+    def _load_shared(self, job_id):
+        """从共享任务目录读取其他进程的任务，不存在返回 None"""
+        if not self.shared_dir or not isinstance(job_id, str) or not _JOB_ID.fullmatch(job_id):
+            return None
+        try:
+            with open(self._shared_path(job_id, '.json'), 'rb') as stream:
+                job = ExportJob.from_state(json.load(stream))
+            if job.status == DONE:
+                with open(self._shared_path(job_id, '.docx'), 'rb') as stream:
+                    job.content = stream.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        if job.status not in FINISHED_STATUSES:
+            if self._cancel_requested(job_id):
+                job.status = CANCELLED
+            elif not _process_alive(job.owner):
+                job.status = FAILED
+                job.error = '导出任务所在的进程已退出'
+        return job
+
+    def _remove_shared(self, job_id):
+        for suffix in ('.json', '.docx', '.cancel'):
+            try:
+                os.remove(self._shared_path(job_id, suffix))
+            except OSError:
+                pass
+
+    def _sweep_shared(self, deadline):
+        """删除共享任务目录中过期的文件（含已退出的进程留下的任务）"""
+        self._swept_at = time.time()
+        try:
+            entries = list(os.scandir(self.shared_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.name.split('.', 1)[0] not in self._jobs and entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+    def _prune(self):
+        """删除过期的已完成任务"""
+        deadline = time.time() - self.job_ttl
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATUSES and job.future is None]
+        finished.sort(key=lambda job: job.finished_at)
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            if index < excess or job.finished_at < deadline:
+                del self._jobs[job.job_id]
+                if self.shared_dir:
+                    self._remove_shared(job.job_id)
+        if self.shared_dir and time.time() - self._swept_at > SHARED_SWEEP_INTERVAL:
+            self._sweep_shared(deadline)
+
+    def _pending(self):
+        """未完成的任务数（须持有 _lock）：已取消但仍在工作进程中生成的任务也计入，直到生成结束"""
+        return sum(job.future is not None or job.status not in FINISHED_STATUSES for job in self._jobs.values())
+
+    def pending_count(self):
+        """未完成的任务数"""
+        with self._lock:
+            return self._pending()
+
+    def submit(self, report, standards_date, backend, download_name, cache_key=None):
+        """
+        提交导出任务
+
+        参数：
+        - report: 报告内容，含 results、details、victim_name、victim_age、accident_date
+        - standards_date: 按该日期选取计算依据所列的赔偿标准
+        - backend: 报告生成方式（见 report_writer.REPORT_BACKENDS）
+        - download_name: 下载文件名
+        - cache_key: 导出文件缓存的键；缓存中已有该文件时任务直接完成
+
+        返回：ExportJob
+        """
+        job = ExportJob(secrets.token_urlsafe(12), download_name, cache_key)
+        content = self.cache.get(cache_key) if self.cache is not None and cache_key else None
+        with self._lock:
+            self._prune()
+            if content is not None:
+                job.content = content
+                job.render_seconds = 0.0
+                job.started_at = job.finished_at = job.submitted_at
+                job.status = DONE
+                self.completed += 1
+                self._jobs[job.job_id] = job
+            else:
+                if self._pending() >= self.max_pending:
+                    raise QueueFullError(f'导出任务排队已满（{self.max_pending}个），请稍后再试')
+                executor = self.get_executor()
+                try:
+                    job.future = executor.submit(render_report, report, standards_date, backend)
+                except BrokenProcessPool:
+                    # 工作进程异常退出后进程池不可用，重建后重新提交
+                    self.reset_executor(executor)
+                    job.future = self.get_executor().submit(render_report, report, standards_date, backend)
+                self._jobs[job.job_id] = job
+        self._publish(job)
+        if job.future is not None:
+            job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _finish(self, job, future):
+        """任务结束（在进程池的管理线程中调用）"""
+        content = None
+        cancel_requested = self._cancel_requested(job.job_id)
+        with self._lock:
+            job.finished_at = time.time()
+            if cancel_requested and job.status != CANCELLED:
+                job.status = CANCELLED
+                self.cancelled += 1
+            if future.cancelled():
+                job.status = CANCELLED
+            else:
+                error = future.exception()
+                if error is not None:
+                    if job.status != CANCELLED:
+                        job.status = FAILED
+                        job.error = str(error) or error.__class__.__name__
+                        self.failed += 1
+                else:
+                    content, job.started_at, job.render_seconds = future.result()
+                    self.rendered += 1
+                    self.render_seconds += job.render_seconds
+                    if job.status != CANCELLED:
+                        job.content = content
+                        job.status = DONE
+                        self.completed += 1
+            job.future = None
+        self._publish(job)
+        if content is not None and self.cache is not None and job.cache_key:
+            self.cache.put(job.cache_key, content)
+
+    def get(self, job_id):
+        """查找任务（本进程没有时查找共享任务目录），不存在或已过期返回 None"""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self._load_shared(job_id)
+        if job.status not in FINISHED_STATUSES and self._cancel_requested(job_id):
+            return self.cancel(job_id)
+        return job
+
+    def cancel(self, job_id):
+        """
+        取消任务：排队中的任务不再生成，运行中的任务生成的文件被丢弃
+        （运行中的任务生成结束前仍计入 max_pending）
+
+        返回：ExportJob，不存在返回 None
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return self._cancel_shared(job_id)
+            if job.status in FINISHED_STATUSES:
+                return job
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            self.cancelled += 1
+            future = job.future
+        if future is not None:
+            future.cancel()
+        self._publish(job)
+        return job
+
+    def _cancel_shared(self, job_id):
+        """取消其他进程的任务：留下取消标记，该进程不再返回生成的文件"""
+        job = self._load_shared(job_id)
+        if job is not None and job.status not in FINISHED_STATUSES:
+            try:
+                open(self._shared_path(job_id, '.cancel'), 'wb').close()
+            except OSError:
+                return job
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        return job
+
+    def stats(self):
+        """任务队列统计信息"""
+        with self._lock:
+            statuses = [job.to_dict()['status'] for job in self._jobs.values()]
+            cancelling = sum(job.status == CANCELLED and job.future is not None for job in self._jobs.values())
+            return {
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'queued': statuses.count(QUEUED),
+                'running': statuses.count(RUNNING),
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'cancelling': cancelling,
+                'rendered': self.rendered,
+                'avg_render_seconds': self.render_seconds / self.rendered if self.rendered else 0.0,
+            }
+
+    def shutdown(self, wait=True, cancel_pending=True):
+        """关闭进程池；cancel_pending 为 False 时排队中的任务生成完成后再关闭（进程平滑退出时使用）"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            self._warm_futures = ()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=cancel_pending)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+多名受害人的事故（如客车、施工事故）
+同一事故的受害人共用事故发生日期（因而共用一套赔偿标准）和赔偿义务人：
+赔偿标准每起事故只选取一次，各受害人按单个案件的规则计算，再汇总各项目合计和赔偿总额。
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from compensation_engine import ITEMS_ORDER, CaseInput, CalculationResult, calculate_compensation
+from standards import REGISTRY, StandardSet
+
+# 赔偿义务人以字符串给出时的分隔符
+_DEFENDANT_SEPARATORS = re.compile(r'[、,，;；\n]')
+
+
+def _defendant_list(value):
+    """赔偿义务人：列表或以顿号、逗号、分号分隔的字符串"""
+    if isinstance(value, str):
+        value = _DEFENDANT_SEPARATORS.split(value)
+    return [str(name).strip() for name in value or [] if str(name).strip()]
+
+
+@dataclass
+class IncidentInput:
+    """一起事故的计算输入
+
+    victims 中各受害人的事故发生日期统一使用事故的 accident_date。
+    """
+    incident_name: str = "未填写"
+    accident_date: str = ""
+    defendants: List[str] = field(default_factory=list)
+    victims: List[CaseInput] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        """从请求数据构建：incident_name、accident_date、defendants，victims 为各受害人的 /api/calculate 请求数据"""
+        victims = data.get('victims')
+        if not isinstance(victims, list) or not victims:
+            raise ValueError('事故中至少需要一名受害人（victims）')
+        if not all(isinstance(victim, dict) for victim in victims):
+            raise ValueError('受害人数据必须为JSON对象')
+        accident_date = (data.get('accident_date') or '').strip()
+        return cls(
+            incident_name=(data.get('incident_name') or '').strip() or "未填写",
+            accident_date=accident_date,
+            defendants=_defendant_list(data.get('defendants')),
+            victims=[CaseInput.from_dict({**victim, 'accident_date': accident_date}) for victim in victims],
+        )
+
+    @classmethod
+    def from_saved(cls, data):
+        """从 dataclasses.asdict 的结果还原（多进程部署时由共享计算结果目录读出）"""
+        return cls(**{**data, 'victims': [CaseInput(**victim) for victim in data['victims']]})
+
+
+@dataclass
+class IncidentResult:
+    """一起事故的计算结果
+
+    totals 为各项目在全部受害人中的合计（按 ITEMS_ORDER，含"总计"）。
+    """
+    incident: IncidentInput
+    victims: List[CalculationResult]
+    totals: dict
+    standard_set: Optional[StandardSet] = field(default=None, repr=False)
+
+    def to_dict(self):
+        """转换为 /api/calculate_incident 的响应格式"""
+        victims = []
+        for result in self.victims:
+            data = result.to_dict()
+            del data['success']
+            victims.append(data)
+        return {
+            'success': True,
+            'incident_name': self.incident.incident_name,
+            'accident_date': self.incident.accident_date,
+            'defendants': self.incident.defendants,
+            'victim_count': len(self.victims),
+            'totals': self.totals,
+            'victims': victims,
+        }
+
+
+def aggregate_totals(results):
+    """汇总各受害人的各项目金额及总计"""
+    totals = {item: 0.0 for item in ITEMS_ORDER}
+    for result in results:
+        for item in ITEMS_ORDER:
+            totals[item] += result.results.get(item, 0)
+    totals['总计'] = sum(result.results.get('总计', 0) for result in results)
+    return totals
+
+
+def _calculate_victims(cases, with_details, accident_date):
+    """计算一组受害人（可在工作进程中执行）：赔偿标准只选取一次"""
+    standard_set = REGISTRY.for_date(accident_date)
+    return [calculate_compensation(case, with_details, standard_set) for case in cases]
+
+
+def calculate_incident(incident, with_details=True, executor=None, chunk_size=32):
+    """计算一起事故全部受害人的赔偿并汇总
+
+    参数：
+    - incident: IncidentInput
+    - with_details: 是否生成计算详情
+    - executor: 可选的 concurrent.futures 执行器，受害人按 chunk_size 分组并行计算；
+      单个受害人的计算很快，受害人较少时在当前进程中依次计算更快
+
+    返回：IncidentResult
+    """
+    cases = incident.victims
+    if executor is None:
+        results = _calculate_victims(cases, with_details, incident.accident_date)
+    else:
+        chunks = [cases[start:start + chunk_size] for start in range(0, len(cases), chunk_size)]
+        futures = [executor.submit(_calculate_victims, chunk, with_details, incident.accident_date)
+                   for chunk in chunks]
+        results = [result for future in futures for result in future.result()]
+    return IncidentResult(incident, results, aggregate_totals(results), REGISTRY.for_date(incident.accident_date))
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+运行指标（Prometheus 文本格式，/metrics）
+进程内的计数器（Counter）、当前值（Gauge）和直方图（Histogram），记录时只做一次加锁的加法，可以一直开启。
+
+多进程部署（serve.py）时各工作进程定期把指标快照写入共享目录（METRICS_DIR），/metrics 汇总全部工作进程的快照：
+计数器和直方图相加（已退出的工作进程的快照由主进程并入 retired.json，计数不会因工作进程重启而减少），
+当前值只汇总仍在运行的工作进程。导出工作进程池中的计算和报告生成不计入。
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+
+# 直方图的分桶上限
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ITEM_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005)
+BYTES_BUCKETS = tuple(1024 * 4 ** power for power in range(8))  # 1KB .. 16MB
+
+# 共享目录中已退出的工作进程合并后的快照
+RETIRED_SNAPSHOT = 'retired.json'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """指标基类：samples 为 标签值元组 -> 数值（直方图为 [各分桶计数..., 总和, 次数]）"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: list(value) if isinstance(value, list) else value
+                    for labels, value in self._samples.items()}
+
+
+class Counter(Metric):
+    """只增不减的计数"""
+
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._samples[labels] = self._samples.get(labels, 0) + amount
+
+    def set_total(self, value, *labels):
+        """设置累计值（由其他已有的累计统计同步，如响应压缩统计）"""
+        with self._lock:
+            self._samples[labels] = value
+
+
+class Gauge(Metric):
+    """可增可减的当前值（如进行中的请求数）"""
+
+    type = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._samples[labels] = self._samples.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._samples[labels] = value
+
+
+class Histogram(Metric):
+    """直方图：各分桶计数、观测值总和及次数"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._samples.get(labels)
+            if sample is None:
+                sample = self._samples[labels] = [0] * (len(self.buckets) + 3)
+            sample[index] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    def observe_many(self, observations):
+        """记录多个观测值：observations 为 (标签值, 观测值) 序列，只有一个标签的指标标签值可直接给出字符串"""
+        buckets = self.buckets
+        with self._lock:
+            samples = self._samples
+            for labels, value in observations:
+                if not isinstance(labels, tuple):
+                    labels = (labels,)
+                sample = samples.get(labels)
+                if sample is None:
+                    sample = samples[labels] = [0] * (len(buckets) + 3)
+                sample[bisect.bisect_left(buckets, value)] += 1
+                sample[-2] += value
+                sample[-1] += 1
+
+    def time(self, *labels):
+        """上下文管理器：记录 with 语句块的耗时（秒）"""
+        return _Timer(self, labels)
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class MetricsRegistry:
+    """指标登记表；collectors 为生成快照前调用的函数（把其他模块的统计同步到指标中）"""
+
+    def __init__(self):
+        self._metrics = {}
+        self.collectors = []
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f'指标已存在：{metric.name}')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        """全部指标的快照：指标名 -> {标签值元组: 数值}"""
+        for collect in self.collectors:
+            collect()
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self, snapshot=None):
+        """Prometheus 文本格式"""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for labels, value in sorted(snapshot.get(name, {}).items()):
+                if metric.type != 'histogram':
+                    lines.append(f'{name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), value):
+                    cumulative += count
+                    bucket = _format_labels(metric.labelnames, labels, f'le="{_format_value(bound)}"')
+                    lines.append(f'{name}_bucket{bucket} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(metric.labelnames, labels)} {_format_value(value[-2])}')
+                lines.append(f'{name}_count{_format_labels(metric.labelnames, labels)} {value[-1]}')
+        return '\n'.join(lines) + '\n'
+
+    # 多进程部署时的快照文件
+
+    def merge(self, snapshots, gauges=True):
+        """汇总多个快照（计数器、直方图相加；gauges 为 False 时不含当前值）"""
+        merged = {}
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None or (metric.type == 'gauge' and not gauges):
+                    continue
+                target = merged.setdefault(name, {})
+                for labels, value in samples.items():
+                    if isinstance(value, list):
+                        previous = target.get(labels)
+                        target[labels] = value if previous is None else [a + b for a, b in zip(previous, value)]
+                    else:
+                        target[labels] = target.get(labels, 0) + value
+        return merged
+
+    def write_snapshot(self, path, snapshot=None):
+        """把快照写入文件（先写临时文件再改名）"""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        data = {name: [[list(labels), value] for labels, value in samples.items()]
+                for name, samples in snapshot.items()}
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as stream:
+            json.dump(data, stream, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+def read_snapshot(path):
+    """读取快照文件，文件不存在或不完整时返回 None"""
+    try:
+        with open(path, encoding='utf-8') as stream:
+            data = json.load(stream)
+    except (OSError, ValueError):
+        return None
+    return {name: {tuple(labels): value for labels, value in samples} for name, samples in data.items()}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedMetrics:
+    """
+    多进程部署时的指标汇总：本进程的快照定期写入 directory/<pid>.json，
+    collect() 汇总本进程的当前指标、其他工作进程的快照和已退出工作进程的合并快照
+    """
+
+    def __init__(self, registry, directory, interval=5.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def ensure_started(self):
+        """启动定期写入快照的后台线程（fork 之后在工作进程中调用）"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        """写入本进程的快照"""
+        self.registry.write_snapshot(self._path(os.getpid()))
+
+    def collect(self):
+        """汇总后的快照（供 registry.render 使用）"""
+        own = os.getpid()
+        live, retired = [self.registry.snapshot()], []
+        for entry in os.scandir(self.directory):
+            if entry.name == RETIRED_SNAPSHOT:
+                retired.append(read_snapshot(entry.path))
+                continue
+            stem, extension = os.path.splitext(entry.name)
+            if extension != '.json' or not stem.isdigit() or int(stem) == own:
+                continue
+            (live if _pid_alive(int(stem)) else retired).append(read_snapshot(entry.path))
+        return self.registry.merge([snapshot for snapshot in live if snapshot]
+                                   + [self.registry.merge([snapshot for snapshot in retired if snapshot],
+                                                          gauges=False)])
+
+    def retire(self, pid):
+        """工作进程退出后（由主进程调用）：把它的快照并入 retired.json（不含当前值）"""
+        path = self._path(pid)
+        snapshot = read_snapshot(path)
+        if snapshot is None:
+            return
+        retired_path = os.path.join(self.directory, RETIRED_SNAPSHOT)
+        previous = read_snapshot(retired_path) or {}
+        self.registry.write_snapshot(retired_path, self.registry.merge([previous, snapshot], gauges=False))
+        os.remove(path)
+
+
+# 本进程的指标登记表及各模块使用的指标
+METRICS = MetricsRegistry()
+
+REQUESTS = METRICS.counter('http_requests_total', '处理的请求数', ('route', 'method', 'status'))
+REQUEST_SECONDS = METRICS.histogram('http_request_duration_seconds', '请求处理耗时（秒，流式响应不含传输时间）',
+                                    ('route',))
+REQUESTS_IN_FLIGHT = METRICS.gauge('http_requests_in_flight', '正在处理的请求数', ('route',))
+RESPONSE_BYTES = METRICS.histogram('http_response_bytes', '响应字节数（压缩后，流式响应不计）', ('route',),
+                                   buckets=BYTES_BUCKETS)
+ERRORS = METRICS.counter('http_request_errors_total', '请求处理中的异常数（按异常类型）', ('route', 'exception'))
+ITEM_SECONDS = METRICS.histogram('compensation_item_seconds', '各赔偿项目计算函数的耗时（秒）', ('item',),
+                                 buckets=ITEM_BUCKETS)
+REPORT_SECONDS = METRICS.histogram('report_render_seconds',
+                                   'Word报告生成耗时（秒）：docx 方式分 build（生成文档）和 save（保存），ooxml 方式为 write',
+                                   ('kind', 'backend', 'phase'))
+REPORT_BYTES = METRICS.histogram('report_output_bytes', '生成的Word报告字节数', ('kind', 'backend'),
+                                 buckets=BYTES_BUCKETS)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+批量导出Word报告（zip压缩包）
+各案件的报告在导出工作进程中并行生成，主进程按完成顺序逐份压缩写入zip并立即产出，
+客户端在后续报告生成期间即可开始接收；同时生成的报告数不超过 window，内存占用不随报告数增长
+（zip的中央目录每份报告只保留一条记录）。无法导出的条目列在压缩包末尾的“导出失败.txt”中。
+"""
+
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from compensation_engine import calculate_compensation, standard_set_for
+from export_jobs import ExportJobQueue, render_report
+from result_cache import export_cache_key
+from word_report import report_template_version
+
+FAILURES_NAME = '导出失败.txt'
+_INVALID_NAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+class _ChunkSink:
+    """只能顺序写入的文件对象：暂存 zipfile 写出的内容，由生成器逐段取出"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """取出暂存的内容"""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def case_report(case):
+    """计算案件并生成报告内容，返回 (报告内容, 计算依据所列的赔偿标准)"""
+    result = calculate_compensation(case)
+    report = {
+        'results': result.results,
+        'details': result.details,
+        'victim_name': result.victim_name,
+        'victim_age': result.victim_age,
+        'accident_date': case.accident_date or datetime.now().strftime('%Y-%m-%d'),
+    }
+    return report, standard_set_for(case)
+
+
+def archive_entry_name(index, victim_name):
+    """压缩包中报告的文件名：序号（从1开始，与提交顺序一致）加受害人姓名"""
+    name = _INVALID_NAME_CHARS.sub('_', str(victim_name)) if victim_name != '未填写' else '赔偿'
+    return f"{index + 1:03d}_{name}计算结果.docx"
+
+
+def _entry_info(name, compression):
+    info = zipfile.ZipInfo(name, time.localtime()[:6])
+    info.compress_type = compression
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def iter_report_archive(items, queue=None, max_workers=2, window=None, backend='docx', cache=None,
+                        compression=zipfile.ZIP_DEFLATED):
+    """
+    逐段产出批量导出的zip压缩包
+
+    参数：
+    - items: 可迭代对象，按提交顺序逐个产出 (报告内容, 赔偿标准, 错误信息)；报告内容格式同 export_jobs，
+      错误信息不为 None 时该条目不生成报告，只记入“导出失败.txt”；按需读取，不会一次取出全部条目
+    - queue: 提供工作进程池的 ExportJobQueue；缺省时临时启动 max_workers 个工作进程，导出结束后关闭
+    - window: 同时生成的报告数上限，缺省为工作进程数的2倍
+    - backend: 报告生成方式（见 report_writer.REPORT_BACKENDS）
+    - cache: 导出文件缓存（ResultCache），与单份导出使用相同的缓存键
+    - compression: zip条目的压缩方式
+
+    产出：zip文件内容（bytes），每写入一份报告产出一段
+    """
+    own_queue = queue is None
+    if own_queue:
+        queue = ExportJobQueue(max_workers, nice=0)
+    window = window or queue.max_workers * 2
+    sink = _ChunkSink()
+    failures = []
+    pending = {}
+    entries = enumerate(items)
+    exhausted = False
+
+    def submit(report, standard_set):
+        executor = queue.get_executor()
+        try:
+            return executor.submit(render_report, report, standard_set.effective_from, backend)
+        except BrokenProcessPool:
+            # 工作进程异常退出后进程池不可用，重建后重新提交
+            queue.reset_executor(executor)
+            return queue.get_executor().submit(render_report, report, standard_set.effective_from, backend)
+
+    try:
+        with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+            while True:
+                # 补充提交，直到达到同时生成的上限
+                while not exhausted and len(pending) < window:
+                    try:
+                        index, (report, standard_set, error) = next(entries)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if error is not None:
+                        failures.append((index, error))
+                        continue
+                    key = export_cache_key(report['results'], report['details'], report['victim_name'],
+                                           report['victim_age'], report['accident_date'],
+                                           report_template_version(standard_set), backend)
+                    content = cache.get(key) if cache is not None else None
+                    if content is not None:
+                        archive.writestr(_entry_info(archive_entry_name(index, report['victim_name']),
+                                                     compression), content)
+                        yield sink.drain()
+                        continue
+                    pending[submit(report, standard_set)] = (index, report['victim_name'], key)
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda future: pending[future][0]):
+                    index, victim_name, key = pending.pop(future)
+                    try:
+                        content = future.result()[0]
+                    except Exception as e:
+                        failures.append((index, str(e) or e.__class__.__name__))
+                        continue
+                    if cache is not None:
+                        cache.put(key, content)
+                    archive.writestr(_entry_info(archive_entry_name(index, victim_name), compression), content)
+                    yield sink.drain()
+
+            if failures:
+                failures.sort()
+                lines = ''.join(f"{index + 1:03d}\t{error}\n" for index, error in failures)
+                archive.writestr(_entry_info(FAILURES_NAME, compression), lines.encode('utf-8'))
+        # 关闭时写出中央目录
+        yield sink.drain()
+    finally:
+        # 客户端中途断开时不再生成剩余的报告
+        for future in pending:
+            future.cancel()
+        if own_queue:
+            queue.shutdown(wait=False)
+
+
+def write_report_archive(output, items, **kwargs):
+    """
+    批量导出报告，写入 output（文件名或二进制文件对象）
+
+    参数同 iter_report_archive；返回写入的字节数
+    """
+    if isinstance(output, str):
+        with open(output, 'wb') as stream:
+            return write_report_archive(stream, items, **kwargs)
+    size = 0
+    for chunk in iter_report_archive(items, **kwargs):
+        output.write(chunk)
+        size += len(chunk)
+    return size
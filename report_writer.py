@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+赔偿计算结果Word报告的写出
+支持两种方式（backend）：
+- docx：通过 python-docx 生成文档对象再保存（word_report.build_report），作为对照实现
+- ooxml：不生成文档对象，把预先序列化的XML片段逐段写入 zipfile 中的 word/document.xml
+
+两种方式生成的文件逐字节一致，同样的内容每次生成的文件也相同（文档属性和zip条目使用固定时间）。
+ooxml 方式的片段取自报告骨架：document.xml 按受害人内容的插入位置分为前后两段，受害人内容各原型序列化后在需要填入文字的位置切开；
+其余部件（样式、页脚等）直接使用骨架保存后的内容。
+"""
+
+import copy
+import io
+import re
+import threading
+import zipfile
+from xml.sax.saxutils import escape
+
+from lxml import etree
+from docx.oxml.ns import qn
+from docx.opc.oxml import serialize_part_xml
+
+from compensation_engine import ITEMS_ORDER
+from standards import REGISTRY
+from metrics import REPORT_SECONDS
+from word_report import (
+    build_report, build_incident_report, get_report_skeleton, clone_document, detail_lines,
+    prepare_report_skeletons, save_document, zip_entry, incident_info, incident_summary_rows,
+    incident_item_rows, victim_details, victim_heading_text,
+)
+
+REPORT_BACKENDS = ('docx', 'ooxml')
+DOCUMENT_PART = 'word/document.xml'
+
+# 片段中待填入内容的位置
+_SLOT = 'slot'
+_SLOT_MARK = f'<!--{_SLOT}-->'
+_VICTIM = 'victim-sections'
+_VICTIM_MARK = f'<!--{_VICTIM}-->'
+_ROOT_NAMESPACES = re.compile(r'\s+xmlns:\w+="[^"]*"')
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+class OoxmlTemplate:
+    """
+    某套赔偿标准的报告模板（ooxml 方式）
+
+    属性：
+    - parts: [(部件名, 内容)]，按 python-docx 保存时的顺序，word/document.xml 的内容为 None
+    - document_head / document_tail: word/document.xml 在受害人内容之前、之后的部分（UTF-8）
+    - fragments: 受害人内容各部分的XML片段，为按填入位置切开的字符串元组
+    """
+
+    __slots__ = ('parts', 'document_head', 'document_tail', 'fragments')
+
+    def __init__(self, parts, document_head, document_tail, fragments):
+        self.parts = parts
+        self.document_head = document_head
+        self.document_tail = document_tail
+        self.fragments = fragments
+
+
+def _last_texts(table):
+    """表格各行最后一个 w:t（基本信息的值、赔偿总额的金额）"""
+    return [list(tr.iter(qn('w:t')))[-1] for tr in table.iterchildren(qn('w:tr'))]
+
+
+def _all_texts(element):
+    return list(element.iter(qn('w:t')))
+
+
+def _compile_fragment(prototype, slot_texts=None, append_slot_to=None):
+    """
+    序列化原型并在填入位置切开
+
+    参数：
+    - slot_texts: 返回原型中需要填入文字的 w:t 元素的函数
+    - append_slot_to: 返回一个元素的函数，在该元素末尾追加填入位置（如明细表的行、计算方式的续行）
+    """
+    element = copy.deepcopy(prototype)
+    if slot_texts is not None:
+        for t in slot_texts(element):
+            t.getparent().replace(t, etree.Comment(_SLOT))
+    if append_slot_to is not None:
+        append_slot_to(element).append(etree.Comment(_SLOT))
+    xml = etree.tostring(element, encoding='unicode')
+    # 命名空间已在 w:document 上声明，片段根元素上不再重复
+    root_end = xml.index('>')
+    xml = _ROOT_NAMESPACES.sub('', xml[:root_end]) + xml[root_end:]
+    return tuple(xml.split(_SLOT_MARK))
+
+
+def _compile_fragments(prototypes):
+    """由报告骨架中的原型生成XML片段"""
+    fragments = {
+        name: _compile_fragment(prototypes[name])[0]
+        for name in ('blank', 'basic_heading', 'detail_heading', 'total_heading', 'formula_label')
+    }
+    fragments['basic_table'] = _compile_fragment(prototypes['basic_table'], _last_texts)
+    fragments['detail_table'] = _compile_fragment(prototypes['detail_table'], append_slot_to=lambda tbl: tbl)
+    fragments['detail_row'] = _compile_fragment(prototypes['detail_row'], _all_texts,
+                                                append_slot_to=lambda tr: tr[-1])
+    fragments['formula_line'] = _compile_fragment(prototypes['formula_line'], _all_texts)
+    fragments['total_table'] = _compile_fragment(prototypes['total_table'], lambda tbl: _last_texts(tbl)[-1:])
+
+    # 事故合并报告
+    for name in ('incident_heading', 'summary_heading', 'victims_heading'):
+        fragments[name] = _compile_fragment(prototypes[name])[0]
+    fragments['victim_heading'] = _compile_fragment(prototypes['victim_heading'], _all_texts)
+    fragments['incident_table'] = _compile_fragment(prototypes['incident_table'], _last_texts)
+    for table, row in (('summary_table', 'summary_row'), ('item_totals_table', 'item_total_row')):
+        fragments[table] = _compile_fragment(prototypes[table], append_slot_to=lambda tbl: tbl)
+        fragments[row] = _compile_fragment(prototypes[row], _all_texts)
+    return fragments
+
+
+def build_ooxml_template(standard_set):
+    """生成报告模板：保存一份不含受害人内容的报告，取出各部件和 document.xml 的前后两段"""
+    skeleton = get_report_skeleton(standard_set)
+    doc = clone_document(skeleton.document)
+    doc.element.body[skeleton.insert_index].addprevious(etree.Comment(_VICTIM))
+
+    buffer = io.BytesIO()
+    save_document(doc, buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        parts = [(name, None if name == DOCUMENT_PART else archive.read(name)) for name in archive.namelist()]
+    document_xml = serialize_part_xml(doc.element)
+    head, tail = document_xml.split(_VICTIM_MARK.encode('utf-8'))
+    return OoxmlTemplate(parts, head, tail, _compile_fragments(skeleton.prototypes))
+
+
+def get_ooxml_template(standard_set):
+    """取得（必要时生成）某套赔偿标准的报告模板"""
+    template = _templates.get(standard_set)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(standard_set)
+            if template is None:
+                template = _templates[standard_set] = build_ooxml_template(standard_set)
+    return template
+
+
+def prepare_report_templates():
+    """预先生成全部赔偿标准的报告骨架和模板（启动时调用）"""
+    prepare_report_skeletons()
+    for standard_set in REGISTRY:
+        get_ooxml_template(standard_set)
+
+
+def _text_xml(text):
+    """w:t 元素（与 word_report 中设置 w:t 文字的结果相同）"""
+    if _INVALID_XML_CHARS.search(text):
+        raise ValueError('All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters')
+    escaped = escape(text).replace('\r', '&#13;')
+    if len(text.strip()) < len(text):
+        return f'<w:t xml:space="preserve">{escaped}</w:t>'
+    return f'<w:t>{escaped}</w:t>'
+
+
+def _run_xml(text):
+    """w:r 元素（与 python-docx 的 add_run(text) 相同：制表符、换行分别转换为 w:tab、w:br）"""
+    content = []
+    for chunk in re.split(r'([\t\r\n])', text):
+        if chunk == '\t':
+            content.append('<w:tab/>')
+        elif chunk in ('\r', '\n'):
+            content.append('<w:br/>')
+        elif chunk:
+            content.append(_text_xml(chunk))
+    return f"<w:r>{''.join(content)}</w:r>" if content else '<w:r/>'
+
+
+def _fill(fragment, *values):
+    """在片段的各填入位置依次填入内容"""
+    pieces = [fragment[0]]
+    for value, piece in zip(values, fragment[1:]):
+        pieces.append(value)
+        pieces.append(piece)
+    return ''.join(pieces)
+
+
+def iter_victim_xml(fragments, results, details, victim_name, victim_age, accident_date, headings=True):
+    """逐段产出受害人的基本信息、赔偿明细及计算公式、赔偿总额的XML；headings 同 word_report._insert_victim"""
+    # 基本信息
+    if headings:
+        yield fragments['basic_heading']
+    basic_info = (victim_name, f"{victim_age}岁", accident_date)
+    yield _fill(fragments['basic_table'], *(_text_xml(str(value)) for value in basic_info))
+    yield fragments['blank']
+
+    # 赔偿明细
+    if headings:
+        yield fragments['detail_heading']
+    valid_items = [item for item in ITEMS_ORDER if item in results and results[item] > 0]
+
+    if valid_items:
+        table_start, table_end = fragments['detail_table']
+        yield table_start
+        for idx, item in enumerate(valid_items):
+            lines = detail_lines(item, results, details)
+            more_lines = ''.join(_fill(fragments['formula_line'], _text_xml(line)) for line in lines[1:])
+            yield _fill(fragments['detail_row'], _text_xml(str(idx + 1)), _text_xml(item),
+                        _text_xml(f"{results[item]:,.2f}"), _text_xml(lines[0]), more_lines)
+        yield table_end
+        yield fragments['blank']
+
+    # 总计
+    if headings:
+        yield fragments['total_heading']
+    yield _fill(fragments['total_table'], _text_xml(f"{results.get('总计', 0):,.2f}"))
+
+    if '总计' in details:
+        yield fragments['blank']
+        yield fragments['formula_label']
+        yield f"<w:p>{_run_xml(details['总计'])}</w:p>"
+
+
+def iter_incident_xml(fragments, incident_result, standard_set):
+    """
+    逐段产出事故合并报告的XML：事故概况、赔偿汇总，然后每名受害人一段
+    （仅金额模式的受害人在这里生成计算详情，产出后即释放）
+    """
+    # 事故概况
+    yield fragments['incident_heading']
+    yield _fill(fragments['incident_table'], *(_text_xml(value) for value in incident_info(incident_result)))
+    yield fragments['blank']
+
+    # 赔偿汇总
+    yield fragments['summary_heading']
+    table_start, table_end = fragments['summary_table']
+    yield table_start
+    for values in incident_summary_rows(incident_result):
+        yield _fill(fragments['summary_row'], *(_text_xml(value) for value in values))
+    yield table_end
+    yield fragments['blank']
+    item_rows = incident_item_rows(incident_result)
+    if item_rows:
+        table_start, table_end = fragments['item_totals_table']
+        yield table_start
+        for values in item_rows:
+            yield _fill(fragments['item_total_row'], *(_text_xml(value) for value in values))
+        yield table_end
+        yield fragments['blank']
+    yield _fill(fragments['total_table'], _text_xml(f"{incident_result.totals.get('总计', 0):,.2f}"))
+    yield fragments['blank']
+
+    # 各受害人赔偿明细
+    yield fragments['victims_heading']
+    accident_date = incident_result.incident.accident_date
+    for index, result in enumerate(incident_result.victims):
+        yield _fill(fragments['victim_heading'], _text_xml(victim_heading_text(index, result.victim_name)))
+        yield ''.join(iter_victim_xml(fragments, result.results, victim_details(result, standard_set),
+                                      result.victim_name, result.victim_age, accident_date, headings=False))
+        yield fragments['blank']
+
+
+def _write_ooxml(output, template, body_xml):
+    """以 ooxml 方式写出报告：body_xml 逐段产出受害人内容（或事故合并报告内容）的XML，逐段压缩写入"""
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in template.parts:
+            if data is not None:
+                archive.writestr(zip_entry(name), data)
+                continue
+            with archive.open(zip_entry(name), 'w') as stream:
+                stream.write(template.document_head)
+                for xml in body_xml:
+                    stream.write(xml.encode('utf-8'))
+                stream.write(template.document_tail)
+
+
+def write_report_ooxml(output, results, details, victim_name, victim_age, accident_date, standard_set):
+    """以 ooxml 方式写出报告"""
+    template = get_ooxml_template(standard_set)
+    _write_ooxml(output, template, iter_victim_xml(template.fragments, results, details,
+                                                   victim_name, victim_age, accident_date))
+
+
+def write_incident_report_ooxml(output, incident_result, standard_set):
+    """
+    以 ooxml 方式写出事故合并报告：不生成文档对象，每名受害人的XML写入zip后即释放，
+    内存占用基本不随受害人数增长
+    """
+    template = get_ooxml_template(standard_set)
+    _write_ooxml(output, template, iter_incident_xml(template.fragments, incident_result, standard_set))
+
+
+def write_report(output, results, details, victim_name, victim_age, accident_date,
+                 standard_set=None, backend='docx'):
+    """
+    生成赔偿计算结果报告并写入 output（文件名或二进制文件对象）
+
+    参数与 word_report.build_report 相同；backend 为 'docx'（python-docx）或 'ooxml'（流式写出）
+    """
+    if backend not in REPORT_BACKENDS:
+        raise ValueError(f"不支持的报告生成方式：{backend}（可选：{'、'.join(REPORT_BACKENDS)}）")
+    standard_set = standard_set or REGISTRY.for_date(accident_date)
+    if backend == 'ooxml':
+        with REPORT_SECONDS.time('single', backend, 'write'):
+            write_report_ooxml(output, results, details, victim_name, victim_age, accident_date, standard_set)
+    else:
+        with REPORT_SECONDS.time('single', backend, 'build'):
+            document = build_report(results, details, victim_name, victim_age, accident_date, standard_set)
+        with REPORT_SECONDS.time('single', backend, 'save'):
+            save_document(document, output)
+
+
+def write_incident_report(output, incident_result, standard_set=None, backend='docx'):
+    """
+    生成事故合并报告并写入 output（文件名或二进制文件对象）
+
+    参数与 word_report.build_incident_report 相同；backend 为 'docx'（整份文档在内存中生成后保存）
+    或 'ooxml'（逐名受害人流式写出，受害人很多时内存占用远小于 docx 方式）
+    """
+    if backend not in REPORT_BACKENDS:
+        raise ValueError(f"不支持的报告生成方式：{backend}（可选：{'、'.join(REPORT_BACKENDS)}）")
+    standard_set = standard_set or incident_result.standard_set or REGISTRY.for_date(
+        incident_result.incident.accident_date)
+    if backend == 'ooxml':
+        with REPORT_SECONDS.time('incident', backend, 'write'):
+            write_incident_report_ooxml(output, incident_result, standard_set)
+    else:
+        with REPORT_SECONDS.time('incident', backend, 'build'):
+            document = build_incident_report(incident_result, standard_set)
+        with REPORT_SECONDS.time('incident', backend, 'save'):
+            save_document(document, output)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+计算结果缓存
+按规范化后的计算输入和赔偿标准版本做内容寻址，容量有上限（LRU淘汰），条目有过期时间（TTL）。
+同样的结构也用于缓存导出的Word文件（按字节数限制容量）。
+多进程部署（serve.py）时，需要在各工作进程间共用的条目另写入共享目录（SharedStore）。
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+
+
+def case_cache_key(case, standards_version, with_details=True):
+    """计算输入的缓存键：规范化后的字段（按字段名排序）+ 标准版本 + 是否生成详情 的SHA-256"""
+    canonical = json.dumps(asdict(case), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    digest = hashlib.sha256()
+    digest.update(standards_version.encode('utf-8'))
+    digest.update(b'\0details\0' if with_details else b'\0totals\0')
+    digest.update(canonical.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def export_cache_key(results, details, victim_name, victim_age, accident_date, template_version, backend='docx'):
+    """导出文件的缓存键：报告内容（按键排序的JSON）+ 报告模板版本 + 生成方式 的SHA-256，同时用作ETag"""
+    canonical = json.dumps([results, details, victim_name, victim_age, accident_date],
+                           sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    digest = hashlib.sha256()
+    digest.update(template_version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(backend.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(canonical.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """线程安全的LRU + TTL缓存
+
+    参数：
+    - maxsize: 最多缓存的条目数，超出时淘汰最久未使用的条目
+    - ttl: 条目有效期（秒），None 表示不过期
+    - max_bytes: 缓存值（bytes）的总字节数上限，超出时淘汰最久未使用的条目；None 表示不限制
+
+    get/put 传入 version（如标准版本号）时，版本变化会清空全部条目；不传则不做版本检查。
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600, clock=time.monotonic, max_bytes=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        """标准版本变化时清空全部条目（旧版本的条目不会再命中）"""
+        if version is not None and version != self.version:
+            self._entries.clear()
+            self.bytes = 0
+            self.version = version
+
+    def get(self, key, version=None):
+        """查找缓存，未命中或已过期返回 None"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires, size = entry
+                if expires is None or expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.bytes -= size
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value, version=None):
+        """写入缓存"""
+        if self.maxsize <= 0:
+            return
+        size = len(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._check_version(version)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._entries[key] = (value, expires, size)
+            self.bytes += size
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                self.bytes -= self._entries.popitem(last=False)[1][2]
+                self.evictions += 1
+
+    def get_or_compute(self, key, version, compute):
+        """命中时返回缓存值，否则调用 compute() 计算并写入缓存
+
+        返回：(值, 是否命中)
+        """
+        value = self.get(key, version)
+        if value is not None:
+            return value, True
+        value = compute()
+        self.put(key, value, version)
+        return value, False
+
+    def clear(self):
+        """清空缓存（计数器保留）"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'standards_version': self.version,
+            }
+
+
+class SharedStore:
+    """多个进程共用的存储：共享目录中每个条目一个JSON文件，条目有过期时间（TTL），条目数有上限
+
+    参数：
+    - directory: 共享目录
+    - maxsize: 最多保存的条目数，超出时删除最早写入的条目（每隔 sweep_interval 秒清理一次）
+    - ttl: 条目有效期（秒）
+
+    键只能由字母、数字、"-"、"_" 组成（如 secrets.token_urlsafe 生成的编号），值须可转换为JSON。
+    """
+
+    KEY_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+    def __init__(self, directory, maxsize=4096, ttl=3600, sweep_interval=60):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._swept_at = time.time()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def put(self, key, value):
+        """写入条目（先写临时文件再改名，读取方不会读到写了一半的文件）"""
+        if not self.KEY_PATTERN.fullmatch(key):
+            raise ValueError(f'无效的键：{key}')
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as stream:
+            json.dump(value, stream, ensure_ascii=False)
+        os.replace(temp_path, path)
+        if time.time() - self._swept_at > self.sweep_interval:
+            self.sweep()
+
+    def get(self, key):
+        """读取条目，不存在或已过期返回 None"""
+        if not isinstance(key, str) or not self.KEY_PATTERN.fullmatch(key):
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as stream:
+                return json.load(stream)
+        except (OSError, ValueError):
+            return None
+
+    def sweep(self):
+        """删除过期的条目，条目数超过上限时删除最早写入的条目"""
+        with self._lock:
+            self._swept_at = time.time()
+            try:
+                entries = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(self.directory)
+                           if entry.name.endswith('.json')]
+            except OSError:
+                return
+            entries.sort()
+            deadline = time.time() - self.ttl
+            excess = len(entries) - self.maxsize
+            for index, (mtime, path) in enumerate(entries):
+                if mtime >= deadline and index >= excess:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
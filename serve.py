@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+生产环境多进程服务（预先加载应用的 pre-fork 模式）
+主进程绑定端口并导入应用（赔偿标准、Word报告骨架和模板在导入时生成），gc.freeze() 后 fork 出多个工作进程。
+这些预先生成的对象不再被垃圾回收扫描，工作进程按写时复制共用其内存页。工作进程共用监听套接字，各自用固定大小的线程池处理请求。
+
+工作进程处理 max_requests 个请求（另加随机抖动，避免同时重启）后停止接受新连接，
+处理完进行中的请求和异步导出任务后退出，主进程随即启动新的工作进程。
+
+信号：TERM/INT 平滑停止全部工作进程后退出；HUP 逐个平滑重启工作进程。
+
+运行：python serve.py [--workers N] [--threads N] [--max-requests N] [--host HOST] [--port PORT]
+参数缺省值取自环境变量 SERVE_WORKERS、SERVE_THREADS、SERVE_MAX_REQUESTS、SERVE_MAX_REQUESTS_JITTER、
+SERVE_HOST、SERVE_PORT、SERVE_ACCESS_LOG、SERVE_EXPORT_PROCESSES。须通过环境变量 SECRET_KEY 设置密钥，否则拒绝启动。
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+# 工作进程启动后很快退出时，延迟再启动，避免反复 fork
+MIN_WORKER_LIFETIME = 1.0
+
+
+class RequestHandler(WSGIRequestHandler):
+    """每个连接处理一个请求（HTTP/1.0），平滑退出时不会被空闲的长连接拖住"""
+
+    protocol_version = 'HTTP/1.0'
+
+
+class PreforkWSGIServer(BaseWSGIServer):
+    """
+    工作进程中的WSGI服务器：使用主进程创建的监听套接字，请求交给固定大小的线程池处理；
+    线程全忙时不再接受新连接，由其他工作进程接受
+
+    监听套接字为非阻塞：新连接到来时各工作进程都会被唤醒，没有抢到连接的进程不会阻塞在 accept 中
+    （阻塞时收到 TERM 也无法退出，直到下一个连接到来）。
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, fd):
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+        self.socket.setblocking(False)
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix='request')
+        self._slots = threading.BoundedSemaphore(threads)
+
+    def get_request(self):
+        request, client_address = super().get_request()
+        request.setblocking(True)
+        return request, client_address
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def wait_requests(self):
+        """等待进行中的请求处理完"""
+        self._pool.shutdown(wait=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='广西人身损害赔偿计算器（多进程服务）')
+    parser.add_argument('--host', default=os.environ.get('SERVE_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('SERVE_PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVE_WORKERS', os.cpu_count() or 1)),
+                        help='工作进程数（缺省为CPU核数）')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('SERVE_THREADS', 4)),
+                        help='每个工作进程的线程数')
+    parser.add_argument('--max-requests', type=int, default=int(os.environ.get('SERVE_MAX_REQUESTS', 10000)),
+                        help='工作进程处理多少个请求后重启（0 表示不重启）')
+    parser.add_argument('--max-requests-jitter', type=int,
+                        default=int(os.environ.get('SERVE_MAX_REQUESTS_JITTER', 1000)),
+                        help='max_requests 的随机增量上限')
+    parser.add_argument('--export-processes', type=int,
+                        default=int(os.environ.get('SERVE_EXPORT_PROCESSES', os.cpu_count() or 1)),
+                        help='全部工作进程的导出进程总数（缺省为CPU核数，未设置 EXPORT_WORKERS 时使用）')
+    parser.add_argument('--access-log', action='store_true',
+                        default=os.environ.get('SERVE_ACCESS_LOG', '').lower() in ('1', 'true', 'yes'),
+                        help='输出每个请求的访问日志')
+    return parser.parse_args(argv)
+
+
+def run_worker(listener, wsgi_app, module, args):
+    """工作进程：处理请求直到收到 TERM 或达到 max_requests，然后平滑退出"""
+    # INT、HUP 由主进程处理（终端的信号会发给整个进程组）
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    host, port = listener.getsockname()[:2]
+    server = PreforkWSGIServer(host, port, wsgi_app, args.threads, listener.fileno())
+    stopping = threading.Event()
+
+    def stop(*_):
+        if not stopping.is_set():
+            stopping.set()
+            # shutdown 会等待 serve_forever 退出，不能在服务线程（信号处理）中直接调用
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    # 启动导出工作进程池（进程池不能在 fork 之前启动），初始化完成后 /readyz 报告就绪
+    module.export_queue.warm()
+    # 定期写入运行指标快照，/metrics 汇总各工作进程的指标
+    module.shared_metrics.ensure_started()
+    if args.max_requests > 0:
+        limit = args.max_requests + random.randint(0, max(args.max_requests_jitter, 0))
+        handled = 0
+        lock = threading.Lock()
+
+        def app(environ, start_response):
+            nonlocal handled
+            with lock:
+                handled += 1
+                if handled == limit:
+                    stop()
+            return wsgi_app(environ, start_response)
+        server.app = app
+
+    server.serve_forever()
+    server.wait_requests()
+    # 已提交的异步导出任务生成完成并写入共享任务目录后再退出
+    module.export_queue.shutdown(wait=True, cancel_pending=False)
+    module.shared_metrics.flush()
+    logging.shutdown()
+    os._exit(0)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.environ.get('SECRET_KEY'):
+        sys.exit('请通过环境变量 SECRET_KEY 设置密钥（如 python -c "import secrets; print(secrets.token_hex(32))" 生成）')
+    if not args.access_log:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    listener = socket.create_server((args.host, args.port), backlog=1024)
+    # 各工作进程的计算输入和异步导出任务写入共享目录，任一进程都能按编号取得（见 app.load_calculation、export_jobs）；
+    # 运行指标快照也写入共享目录，由 /metrics 汇总（见 metrics）
+    temp_dirs = []
+    for name, prefix in (('CALCULATION_DIR', 'calculations-'), ('EXPORT_JOB_DIR', 'export-jobs-'),
+                         ('METRICS_DIR', 'metrics-')):
+        if not os.environ.get(name):
+            temp_dirs.append(tempfile.mkdtemp(prefix=prefix))
+            os.environ[name] = temp_dirs[-1]
+
+    # 每个工作进程各有一个导出进程池（EXPORT_WORKERS 个进程），未设置时按导出进程总数平均分配，每个至少 1 个
+    if not os.environ.get('EXPORT_WORKERS'):
+        os.environ['EXPORT_WORKERS'] = str(max(1, args.export_processes // max(args.workers, 1)))
+
+    # 预先加载应用，冻结现有对象后再 fork
+    import app as module
+    gc.collect()
+    gc.freeze()
+
+    workers = {}
+    stopping = False
+    reloading = []
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(listener, module.app, module, args)
+            finally:
+                os._exit(1)
+        workers[pid] = time.time()
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reload(*_):
+        # 逐个重启：每个旧工作进程退出后启动新的工作进程（见主循环）
+        reloading.extend(workers)
+        if reloading:
+            os.kill(reloading.pop(), signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, reload)
+
+    print(f" * 多进程服务：http://{args.host}:{args.port}，工作进程 {args.workers} 个，"
+          f"每个 {args.threads} 线程、{module.app.config['EXPORT_WORKERS']} 个导出进程，"
+          f"处理约 {args.max_requests} 个请求后重启", flush=True)
+    for _ in range(args.workers):
+        spawn()
+
+    try:
+        while workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = workers.pop(pid, None)
+            if started is None:
+                continue
+            # 已退出的工作进程的指标并入合并快照（须在启动新的工作进程之前，避免进程号重用）
+            module.shared_metrics.retire(pid)
+            if stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0:
+                print(f" * 工作进程 {pid} 异常退出（{code}），重新启动", file=sys.stderr, flush=True)
+            if time.time() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            spawn()
+            while reloading:
+                old = reloading.pop()
+                if old in workers:
+                    os.kill(old, signal.SIGTERM)
+                    break
+    finally:
+        listener.close()
+        for path in temp_dirs:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+广西人身损害赔偿标准登记表
+按生效日期登记各年度的赔偿标准，根据事故发生日期二分查找适用的标准；
+每套标准的派生数值（行业日均工资、按扶养人数分摊的年生活费等）在登记时一次算好。
+"""
+
+import bisect
+import hashlib
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+
+# 可识别的事故日期格式
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y年%m月%d日')
+
+# 预先计算分摊年生活费的扶养人数上限，超过时按需计算
+MAX_PRECOMPUTED_SUPPORT_COUNT = 10
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    """解析日期字符串为 'YYYY-MM-DD'，无法识别时返回 None"""
+    value = (value or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def calculate_compensation_years(age):
+    """
+    计算赔偿年限
+    根据年龄计算：60周岁以下按20年；60周岁以上每增加一岁减少一年；75周岁以上按5年
+    """
+    if age < 60:
+        return 20
+    elif age >= 75:
+        return 5
+    else:
+        return 20 - (age - 60)
+
+
+class StandardSet:
+    """一套赔偿标准及其派生数值
+
+    参数：
+    - version: 版本名称，如 "2025"
+    - effective_from: 生效日期（'YYYY-MM-DD'），事故发生在该日期及之后适用本标准
+    - standards: 赔偿标准（可支配收入、消费支出、住院伙食补助等）
+    - industry_salaries: 各行业平均工资（元/年）
+    - documents: 标准依据的文件名称
+    - basis_note: 导出报告中的计算依据说明
+    """
+
+    def __init__(self, version, effective_from, standards, industry_salaries, documents=(), basis_note=""):
+        self.version = version
+        self.effective_from = parse_date(effective_from)
+        if self.effective_from is None:
+            raise ValueError(f"赔偿标准 {version} 的生效日期格式错误：{effective_from}")
+        self.standards = dict(standards)
+        self.industry_salaries = dict(industry_salaries)
+        self.documents = tuple(documents)
+        self.basis_note = basis_note
+
+        # 派生数值
+        self.default_industry_salary = self.industry_salaries['其他行业']
+        self.daily_industry_salaries = {name: salary / 365 for name, salary in self.industry_salaries.items()}
+        self.default_meal_subsidy = float(self.standards['daily_meal_subsidy'])
+        consumption = self.standards['consumption']
+        self.consumption_shares = [None] + [consumption / count
+                                            for count in range(1, MAX_PRECOMPUTED_SUPPORT_COUNT + 1)]
+        # 可支配收入 × 赔偿年限，按年龄（0-75岁）建表
+        disposable_income = self.standards['disposable_income']
+        self.income_by_age = [disposable_income * calculate_compensation_years(age) for age in range(76)]
+        self.digest = hashlib.sha256(json.dumps(
+            [self.version, self.effective_from, self.standards, self.industry_salaries,
+             self.documents, self.basis_note],
+            sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def industry_salary(self, industry):
+        """行业平均工资（元/年），未知行业按其他行业计算"""
+        return self.industry_salaries.get(industry, self.default_industry_salary)
+
+    def daily_industry_salary(self, industry):
+        """行业日均工资 = 年工资 ÷ 365"""
+        daily_salary = self.daily_industry_salaries.get(industry)
+        if daily_salary is None:
+            daily_salary = self.daily_industry_salaries['其他行业']
+        return daily_salary
+
+    def consumption_share(self, support_count):
+        """按扶养人数分摊的年生活费 = 人均消费支出 ÷ 扶养人数"""
+        if 0 < support_count <= MAX_PRECOMPUTED_SUPPORT_COUNT:
+            return self.consumption_shares[support_count]
+        return self.standards['consumption'] / support_count
+
+    def income_for_age(self, age):
+        """可支配收入 × 赔偿年限"""
+        return self.income_by_age[min(max(age, 0), 75)]
+
+    @classmethod
+    def from_dict(cls, data):
+        """从JSON数据构建（字段与构造参数相同）"""
+        return cls(data['version'], data['effective_from'], data['standards'], data['industry_salaries'],
+                   data.get('documents', ()), data.get('basis_note', ""))
+
+    def __repr__(self):
+        return f"StandardSet({self.version!r}, effective_from={self.effective_from!r})"
+
+
+class StandardsRegistry:
+    """按生效日期排序的赔偿标准登记表"""
+
+    def __init__(self, standard_sets=()):
+        self._dates = []
+        self._sets = []
+        self.version = None
+        for standard_set in standard_sets:
+            self.register(standard_set)
+
+    def register(self, standard_set):
+        """登记一套标准；同一生效日期的标准会被替换"""
+        index = bisect.bisect_left(self._dates, standard_set.effective_from)
+        if index < len(self._dates) and self._dates[index] == standard_set.effective_from:
+            self._sets[index] = standard_set
+        else:
+            self._dates.insert(index, standard_set.effective_from)
+            self._sets.insert(index, standard_set)
+        self.for_date.cache_clear()
+        digest = hashlib.sha256()
+        for item in self._sets:
+            digest.update(item.digest.encode('ascii'))
+        self.version = digest.hexdigest()[:16]
+
+    def load_directory(self, path):
+        """登记目录中的全部标准文件（*.json，每个文件一套标准）"""
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.json'):
+                with open(os.path.join(path, name), encoding='utf-8') as f:
+                    self.register(StandardSet.from_dict(json.load(f)))
+
+    @property
+    def latest(self):
+        """最新的一套标准"""
+        return self._sets[-1]
+
+    def __iter__(self):
+        return iter(self._sets)
+
+    def __len__(self):
+        return len(self._sets)
+
+    @lru_cache(maxsize=4096)
+    def for_date(self, accident_date):
+        """
+        按事故发生日期查找适用的标准（二分查找）
+
+        日期为空或无法识别时使用最新标准；早于最早生效日期时使用最早的标准。
+        """
+        date = parse_date(accident_date)
+        if date is None:
+            return self.latest
+        index = bisect.bisect_right(self._dates, date) - 1
+        return self._sets[max(index, 0)]
+
+
+# 2025年广西赔偿标准（根据桂高法会〔2025〕13号文件）
+# 注意：2025年标准统一使用城镇居民人均可支配收入，不再区分城镇和农村
+STANDARDS_2025 = StandardSet(
+    version="2025",
+    effective_from="2025-01-01",
+    standards={
+        'disposable_income': 43044,  # 广西上一年度城镇居民人均可支配收入（元/年）
+        'consumption': 26084,  # 广西上一年度城镇居民人均消费支出（元/年）
+        'daily_meal_subsidy': 100,  # 住院伙食补助费（元/天）
+        'daily_nursing_fee': 157.9,  # 护理费标准（元/天，护工标准）
+        'funeral_expense': 49434,  # 丧葬费（元）
+        'traffic_fee_city': 30,  # 市内交通费标准（元/天）
+        'daily_accommodation_fee': 330,  # 住宿费标准（元/天）
+    },
+    # 各行业平均工资（元/年）- 根据广西上一年度统计数据
+    # 数据来源：桂公通〔2025〕60号文件
+    industry_salaries={
+        '农、林、牧、渔业': 88472,
+        '采矿业': 84319,
+        '制造业': 81668,
+        '电力、热力、燃气及水生产和供应业': 146394,
+        '建筑业': 81819,
+        '批发和零售业': 91322,
+        '交通运输、仓储和邮政业': 116278,
+        '住宿和餐饮业': 49065,
+        '信息传输、软件和信息技术服务业': 140726,
+        '金融业': 166109,
+        '房地产业': 78846,
+        '租赁和商务服务业': 74050,
+        '科学研究和技术服务业': 113638,
+        '水利、环境和公共设施管理业': 64797,
+        '居民服务、修理和其他服务业': 56848,
+        '教育': 96386,
+        '卫生和社会工作': 120902,
+        '文化、体育和娱乐业': 93209,
+        '公共管理、社会保障和社会组织': 93976,
+        '其他行业': 60000,
+    },
+    documents=(
+        '《广西壮族自治区道路交通事故损害赔偿项目及计算标准》（桂高法会〔2025〕13号）',
+        '《广西壮族自治区公安厅关于道路交通事故处理有关问题的通知》（桂公通〔2025〕60号）',
+    ),
+    basis_note='注：2025年标准统一使用广西上一年度城镇居民人均可支配收入和城镇居民人均消费支出标准进行计算。',
+)
+
+
+def load_default_registry():
+    """内置标准，以及环境变量 STANDARDS_DIR 指定目录中的其他年度标准"""
+    registry = StandardsRegistry([STANDARDS_2025])
+    standards_dir = os.environ.get('STANDARDS_DIR')
+    if standards_dir:
+        registry.load_directory(standards_dir)
+    return registry
+
+
+REGISTRY = load_default_registry()
@@ -0,0 +1,174 @@
+let calculationData = null;
+
+function toggleWorkIncomeFields() {
+    const incomeType = document.getElementById('work_income_type').value;
+    const monthlyGroup = document.getElementById('monthly_income_group');
+    const avgDailyGroup = document.getElementById('avg_daily_income_group');
+    const industryGroup = document.getElementById('industry_type_group');
+    
+    if (incomeType === '固定收入') {
+        monthlyGroup.classList.remove('hidden');
+        avgDailyGroup.classList.add('hidden');
+        industryGroup.classList.add('hidden');
+    } else if (incomeType === '无固定收入（能证明最近三年平均）') {
+        monthlyGroup.classList.add('hidden');
+        avgDailyGroup.classList.remove('hidden');
+        industryGroup.classList.add('hidden');
+    } else {
+        monthlyGroup.classList.add('hidden');
+        avgDailyGroup.classList.add('hidden');
+        industryGroup.classList.remove('hidden');
+    }
+}
+
+function toggleNursingFields() {
+    const nursingType = document.getElementById('nursing_type').value;
+    const nursingIncomeGroup = document.getElementById('nursing_income_group');
+    
+    if (nursingType === '有收入') {
+        nursingIncomeGroup.classList.remove('hidden');
+    } else {
+        nursingIncomeGroup.classList.add('hidden');
+    }
+}
+
+function toggleDeathFields() {
+    const isDeath = document.getElementById('is_death').checked;
+    const disabilitySection = document.getElementById('disability_section');
+    
+    if (isDeath) {
+        disabilitySection.classList.add('hidden');
+    } else {
+        disabilitySection.classList.remove('hidden');
+    }
+}
+
+function showMessage(text, type) {
+    const messageDiv = document.getElementById('message');
+    messageDiv.className = type;
+    messageDiv.textContent = text;
+    messageDiv.classList.remove('hidden');
+    
+    setTimeout(() => {
+        messageDiv.classList.add('hidden');
+    }, 5000);
+}
+
+function calculate() {
+    const form = document.getElementById('compensationForm');
+    const formData = new FormData(form);
+    const data = {};
+    
+    for (let [key, value] of formData.entries()) {
+        if (key === 'is_death') {
+            data[key] = document.getElementById('is_death').checked;
+        } else {
+            data[key] = value;
+        }
+    }
+    
+    fetch('/api/calculate', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            calculationData = result;
+            displayResults(result);
+            showMessage('计算完成！', 'success');
+        } else {
+            showMessage('计算失败：' + result.error, 'error');
+        }
+    })
+    .catch(error => {
+        showMessage('计算失败：' + error.message, 'error');
+    });
+}
+
+function displayResults(result) {
+    const resultSection = document.getElementById('result_section');
+    const resultContent = document.getElementById('result_content');
+    
+    let output = '='.repeat(50) + '\n';
+    output += '广西人身损害赔偿计算结果\n';
+    output += '='.repeat(50) + '\n\n';
+    output += `受害人姓名：${result.victim_name}\n`;
+    output += `受害人年龄：${result.victim_age}岁\n`;
+    output += `计算日期：${new Date().toLocaleString('zh-CN')}\n`;
+    output += '\n' + '-'.repeat(50) + '\n';
+    output += '各项赔偿明细：\n';
+    output += '-'.repeat(50) + '\n\n';
+    
+    const itemsOrder = ['医疗费', '后续治疗费', '误工费', '护理费', '交通费', '住宿费', '住院伙食补助费', 
+                      '营养费', '残疾赔偿金', '残疾辅助器具费', '被扶养人生活费', 
+                      '死亡赔偿金', '丧葬费', '精神损害抚慰金'];
+    
+    for (let item of itemsOrder) {
+        if (result.results[item] && result.results[item] > 0) {
+            output += `${item.padEnd(20)}：${result.results[item].toLocaleString('zh-CN', {minimumFractionDigits: 2, maximumFractionDigits: 2}).padStart(15)} 元\n`;
+        }
+    }
+    
+    output += '\n' + '-'.repeat(50) + '\n';
+    output += `${'总计'.padEnd(20)}：${result.results['总计'].toLocaleString('zh-CN', {minimumFractionDigits: 2, maximumFractionDigits: 2}).padStart(15)} 元\n`;
+    output += '='.repeat(50) + '\n';
+    
+    resultContent.textContent = output;
+    resultSection.classList.remove('hidden');
+}
+
+function exportWord() {
+    if (!calculationData) {
+        showMessage('请先进行计算！', 'error');
+        return;
+    }
+    
+    // 按计算编号导出，金额和计算详情取自服务器保存的计算结果
+    const form = document.getElementById('compensationForm');
+    const formData = new FormData(form);
+    const accidentDate = formData.get('accident_date') || new Date().toISOString().split('T')[0];
+    
+    fetch(`/api/export_word/${encodeURIComponent(calculationData.calculation_id)}?accident_date=${encodeURIComponent(accidentDate)}`)
+    .then(response => {
+        if (response.ok) {
+            return response.blob();
+        }
+        return response.json().then(err => Promise.reject(err));
+    })
+    .then(blob => {
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `${calculationData.victim_name !== '未填写' ? calculationData.victim_name : '赔偿'}计算结果.docx`;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        document.body.removeChild(a);
+        showMessage('Word文档导出成功！', 'success');
+    })
+    .catch(error => {
+        showMessage('导出失败：' + (error.error || error.message), 'error');
+    });
+}
+
+function clearForm() {
+    if (confirm('确定要清空所有数据吗？')) {
+        document.getElementById('compensationForm').reset();
+        document.getElementById('result_section').classList.add('hidden');
+        calculationData = null;
+        document.getElementById('accident_date').value = new Date().toISOString().split('T')[0];
+        document.getElementById('meal_subsidy').value = '100';
+        document.getElementById('nursing_count').value = '1';
+        toggleWorkIncomeFields();
+        toggleNursingFields();
+        toggleDeathFields();
+    }
+}
+
+// 初始化
+const today = new Date().toISOString().split('T')[0];
+document.getElementById('accident_date').value = today;
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+页面静态文件（CSS、JS）
+启动时读入内存，文件名中加入内容摘要（如 index.3f2a9c1b7d.css）：内容变化后地址随之变化，
+浏览器可以长期缓存（Cache-Control: immutable），不需要再向服务器确认。
+"""
+
+import hashlib
+import mimetypes
+import os
+
+# 文件名中内容摘要的长度（十六进制字符数）
+DIGEST_LENGTH = 10
+# 含内容摘要的静态文件的缓存时间（一年）
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class StaticAsset:
+    """内存中的静态文件；encoded 为预先压缩的内容（压缩方式 -> 内容，见 compression.precompress_assets）"""
+
+    __slots__ = ('name', 'content', 'mimetype', 'etag', 'encoded')
+
+    def __init__(self, name, content, mimetype, etag):
+        self.name = name
+        self.content = content
+        self.mimetype = mimetype
+        self.etag = etag
+        self.encoded = {}
+
+
+def fingerprinted_name(name, digest):
+    """在扩展名前加入内容摘要：index.css -> index.<摘要>.css"""
+    stem, extension = os.path.splitext(name)
+    return f'{stem}.{digest[:DIGEST_LENGTH]}{extension}'
+
+
+class StaticAssets:
+    """
+    静态文件目录（不含子目录）
+
+    url(name) 返回含内容摘要的地址，get(fingerprinted) 按含摘要的文件名取出文件。
+    """
+
+    def __init__(self, directory, url_prefix='/static/'):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self._names = {}
+        self._assets = {}
+        if directory and os.path.isdir(directory):
+            for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+                if entry.is_file() and not entry.name.startswith('.'):
+                    with open(entry.path, 'rb') as stream:
+                        self.add(entry.name, stream.read())
+
+    def add(self, name, content):
+        """加入文件 name（内容 content），返回 StaticAsset"""
+        digest = hashlib.sha256(content).hexdigest()
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        fingerprinted = fingerprinted_name(name, digest)
+        self._names[name] = fingerprinted
+        self._assets[fingerprinted] = StaticAsset(fingerprinted, content, mimetype, digest)
+        return self._assets[fingerprinted]
+
+    def url(self, name):
+        """文件 name 的地址（含内容摘要）"""
+        return self.url_prefix + self._names[name]
+
+    def get(self, fingerprinted):
+        """按含内容摘要的文件名取出文件，不存在返回 None"""
+        return self._assets.get(fingerprinted)
+
+    def __iter__(self):
+        return iter(self._assets.values())
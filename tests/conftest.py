@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""测试共用设置：模块位于仓库根目录"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""批量请求体的逐条解析（app.iter_batch_payloads）"""
+
+import io
+import json
+
+import pytest
+
+from app import iter_batch_payloads
+from cases import random_payloads
+
+CHUNK_SIZES = (1, 3, 7, 64, 64 * 1024)
+
+
+def parse(body, chunk_size=64 * 1024, max_item_size=1024 * 1024):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return list(iter_batch_payloads(io.BytesIO(body), chunk_size, max_item_size))
+
+
+def summary(items):
+    """(序号, 案件数据或 None, 是否出错)"""
+    return [(index, payload, error is not None) for index, payload, error in items]
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_valid_bodies(chunk_size):
+    payloads = random_payloads(20, seed=4)
+    array = json.dumps(payloads, ensure_ascii=False)
+    ndjson = '\n'.join(json.dumps(payload, ensure_ascii=False) for payload in payloads)
+    for body in (array, ndjson, ' \n' + array + '\n'):
+        assert parse(body, chunk_size) == [(index, payload, None) for index, payload in enumerate(payloads)]
+    assert parse('[]', chunk_size) == []
+    assert parse(' [ ] ', chunk_size) == []
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_unbalanced_element_resyncs(chunk_size):
+    body = '[{"ok": 1}, {"a": [1,2,}, {"ok": 2}, {"b": {"c": [}}, {"ok": 3}]'
+    assert summary(parse(body, chunk_size)) == [
+        (0, {'ok': 1}, False), (1, None, True), (2, {'ok': 2}, False), (3, None, True), (4, {'ok': 3}, False),
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_malformed_element_with_strings_resyncs(chunk_size):
+    body = r'[{"a": "x,]\\\"]", "b": [1, {"c": "]"}] oops, "d": 2}, {"ok": 1}]'
+    assert summary(parse(body, chunk_size)) == [(0, None, True), (1, {'ok': 1}, False)]
+
+
+def test_resync_scan_is_bounded():
+    # 格式错误且缺少右括号，无法定位下一个案件：最多扫描 max_item_size 个字符后停止，不读入其余请求体
+    tail = json.dumps(random_payloads(2000, seed=1))[1:]
+    stream = io.BytesIO(('[{"a": [1, 2 x, ' + tail).encode('utf-8'))
+    items = list(iter_batch_payloads(stream, 4096, 10000))
+    assert summary(items) == [(0, None, True), (1, None, True)]
+    assert '找不到下一个案件' in items[1][2]
+    assert stream.tell() < 10000 + 3 * 4096 < len(stream.getvalue())
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_separators(chunk_size):
+    # 缺少逗号
+    assert summary(parse('[1, 2 3]', chunk_size)) == [(0, 1, False), (1, 2, False), (2, None, True)]
+    assert summary(parse('[{"a": 1} {"b": 2}, {"c": 3}]', chunk_size)) == [
+        (0, {'a': 1}, False), (1, None, True), (2, {'c': 3}, False),
+    ]
+    # 连续的逗号、开头和末尾多余的逗号
+    assert summary(parse('[1,, 2]', chunk_size)) == [(0, 1, False), (1, None, True), (2, 2, False)]
+    assert summary(parse('[, 1]', chunk_size)) == [(0, None, True), (1, 1, False)]
+    assert summary(parse('[1, 2,]', chunk_size)) == [(0, 1, False), (1, 2, False), (2, None, True)]
+
+
+@pytest.mark.parametrize('chunk_size', (7, 4096))
+def test_every_element_size_is_capped(chunk_size):
+    big = {'victim_name': 'x' * 500}
+    body = json.dumps([{'ok': 1}, big, {'ok': 2}])
+    items = parse(body, chunk_size, max_item_size=200)
+    assert summary(items) == [(0, {'ok': 1}, False), (1, None, True), (2, {'ok': 2}, False)]
+    assert '超过 200 个字符' in items[1][2]
+    # 未读完就超过上限的案件同样跳过，后面的案件照常处理
+    huge = '[{"a": "' + 'x' * 300000 + '"}, {"ok": 1}]'
+    assert summary(parse(huge, chunk_size, max_item_size=1000)) == [(0, None, True), (1, {'ok': 1}, False)]
+    # NDJSON
+    ndjson = '\n'.join(json.dumps(item) for item in ({'ok': 1}, big, {'ok': 2}))
+    assert summary(parse(ndjson, chunk_size, max_item_size=200)) == [
+        (0, {'ok': 1}, False), (1, None, True), (2, {'ok': 2}, False),
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 64))
+def test_utf8_bom(chunk_size):
+    bom = '﻿'.encode('utf-8')
+    assert parse(bom + '[{"a": "案件"}]'.encode('utf-8'), chunk_size) == [(0, {'a': '案件'}, None)]
+    assert parse(bom + b'{"a": 1}\n{"b": 2}\n', chunk_size) == [(0, {'a': 1}, None), (1, {'b': 2}, None)]
+
+
+def test_truncated_array():
+    assert summary(parse('[{"ok": 1}, {"a": tr')) == [(0, {'ok': 1}, False), (1, None, True)]
+    assert summary(parse('[{"ok": 1}')) == [(0, {'ok': 1}, False), (1, None, True)]
+
+
+def test_malformed_element_does_not_buffer_rest():
+    tail = json.dumps(random_payloads(2000, seed=2))[1:]
+    stream = io.BytesIO(('[{"a": 1 x}, ' + tail).encode('utf-8'))
+    items = iter_batch_payloads(stream, 4096, 1024 * 1024)
+    index, payload, error = next(items)
+    assert (index, payload) == (0, None) and error
+    assert stream.tell() <= 4096
+    assert sum(1 for _ in items) == 2000
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""整数分计算引擎（cents_engine）与计算引擎（compensation_engine）的一致性
+
+cents_engine 的各项目计算规则与 compensation_engine 分别实现，修改赔偿标准或计算公式时两处须同时修改；
+这里按随机案件对比两者的结果，只改了一处时测试失败。
+"""
+
+import pytest
+
+from cases import random_payloads
+from cents_engine import CENTS_CALCULATORS, calculate_compensation_cents, to_cents
+from compensation_engine import ITEMS_ORDER, CaseInput, calculate_compensation
+
+
+def test_same_items():
+    assert set(CENTS_CALCULATORS) == set(ITEMS_ORDER)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_engine(seed):
+    # 输入金额为两位小数时，各项目相差不超过1分（计算引擎的误工费不舍入到分），总计相差不超过2分
+    for number, payload in enumerate(random_payloads(500, seed=seed)):
+        if number % 2:
+            payload['meal_subsidy'] = None  # 住院伙食补助费按赔偿标准
+        case = CaseInput.from_dict(payload)
+        expected = calculate_compensation(case, with_details=False).results
+        cents = calculate_compensation_cents(case)
+        for item in ITEMS_ORDER:
+            assert abs(cents[item] - round(expected[item] * 100)) <= 1, (item, payload)
+        assert cents['总计'] == sum(cents[item] for item in ITEMS_ORDER)
+        assert abs(cents['总计'] - round(expected['总计'] * 100)) <= 2, payload
+
+
+def test_to_cents_rounds_half_up_on_decimal_value():
+    assert [to_cents(value) for value in (1.005, 2.675, 0.125, 1234.565, 12, 0.1)] == [101, 268, 13, 123457, 1200, 10]
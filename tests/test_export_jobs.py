@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""异步导出任务队列（export_jobs.ExportJobQueue）"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import export_jobs
+from export_jobs import CANCELLED, ExportJobQueue, QueueFullError
+
+
+class BlockingExecutor(ThreadPoolExecutor):
+    """以线程代替工作进程，报告生成等到 release 后才结束"""
+
+    def __init__(self, max_workers=1, **kwargs):
+        super().__init__(max_workers)
+        self.release = threading.Event()
+
+    def submit(self, fn, *args, **kwargs):
+        if fn is export_jobs.render_report:
+            return super().submit(self._render)
+        return super().submit(fn, *args, **kwargs)
+
+    def _render(self):
+        self.release.wait(10)
+        return b'docx', time.time(), 0.0
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    executors = []
+
+    def new_executor(max_workers=2, nice=10):
+        executors.append(BlockingExecutor(max_workers))
+        return executors[-1]
+
+    monkeypatch.setattr(export_jobs, 'new_executor', new_executor)
+    queue = ExportJobQueue(max_workers=1, max_pending=2, nice=0)
+    queue.get_executor()
+    yield queue
+    executors[0].release.set()
+    queue.shutdown()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def submit(queue):
+    return queue.submit({}, '2025-01-01', 'docx', 'report.docx')
+
+
+def test_cancelled_running_job_keeps_its_slot(queue):
+    running = submit(queue)
+    wait_until(lambda: running.future is not None and running.future.running())
+    queued = submit(queue)
+    # 排队中的任务取消后立即释放名额
+    assert queue.cancel(queued.job_id).status == CANCELLED
+    wait_until(lambda: queue.pending_count() == 1)
+    # 运行中的任务取消后，生成结束前仍占用名额
+    assert queue.cancel(running.job_id).status == CANCELLED
+    assert queue.pending_count() == 1
+    assert queue.stats()['cancelling'] == 1
+    submit(queue)
+    with pytest.raises(QueueFullError):
+        submit(queue)
+    assert queue.pending_count() == 2
+
+    queue._executor.release.set()
+    wait_until(lambda: queue.pending_count() == 0)
+    assert queue.get(running.job_id).status == CANCELLED
+    assert queue.get(running.job_id).content is None
+    assert queue.stats()['cancelling'] == 0
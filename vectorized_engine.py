@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+广西人身损害赔偿向量化计算引擎
+按列（NumPy数组）批量计算大量假设案件的各项赔偿金额，用于赔偿准备金等组合测算。
+计算规则与 compensation_engine.calculate_compensation 完全一致，只返回金额，不生成计算详情。
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("向量化计算引擎需要安装numpy：pip install numpy")
+
+from compensation_engine import (
+    CaseInput, calculate_compensation_years, lookup_disability_coefficient,
+    calculate_dependent_living_expense,
+)
+from standards import REGISTRY
+
+# 误工费收入类型编码（与表单选项顺序一致）
+INCOME_TYPES = ["固定收入", "无固定收入（能证明最近三年平均）", "无固定收入（不能证明，参照行业平均）"]
+INCOME_FIXED, INCOME_AVERAGE, INCOME_INDUSTRY = 0, 1, 2
+
+# 输入列及其缺省值（None 表示取所用赔偿标准的数值）；除此之外还可以传入 disability_level / dependent_info 字符串列
+NUMERIC_COLUMNS = {
+    'victim_age': 0,
+    'medical_expense': 0.0,
+    'follow_up_treatment_fee': 0.0,
+    'hospital_days': 0,
+    'meal_subsidy': None,
+    'nutrition_fee': 0.0,
+    'traffic_fee': 0.0,
+    'accommodation_days': 0,
+    'monthly_income': 0.0,
+    'avg_daily_income': 0.0,
+    'work_loss_days': 0,
+    'nursing_income': 0.0,
+    'nursing_days': 0,
+    'nursing_count': 1,
+    'disability_appliance_fee': 0.0,
+    'mental_damage': 0.0,
+}
+
+# 赔偿年限只在0-75岁之间变化，预先按年龄建表
+_COMPENSATION_YEARS_TABLE = np.array([calculate_compensation_years(age) for age in range(76)])
+
+
+def _unique_map(values, func, dtype=float):
+    """对取值重复度高的列按唯一值计算一次，再映射回原数组"""
+    uniques, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    mapped = np.array([func(value) for value in uniques], dtype=dtype)
+    return mapped[inverse.reshape(-1)]
+
+
+def _income_type_codes(values):
+    """收入类型列：支持整数编码或表单中的中文选项"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values
+    return np.where(values == INCOME_TYPES[INCOME_FIXED], INCOME_FIXED,
+                    np.where(values == INCOME_TYPES[INCOME_AVERAGE], INCOME_AVERAGE, INCOME_INDUSTRY))
+
+
+def compensation_years(victim_age):
+    """按年龄计算赔偿年限（向量化）"""
+    return _COMPENSATION_YEARS_TABLE[np.clip(victim_age, 0, 75)]
+
+
+def calculate_portfolio(columns, standard_set=None):
+    """
+    按列计算一批案件的各项赔偿（同一批案件使用同一套赔偿标准）
+
+    参数：
+    - columns: 列名到数组（或标量，自动广播）的映射。数值列见 NUMERIC_COLUMNS，另外支持：
+      * work_income_type: 收入类型（中文选项或 INCOME_* 编码），默认固定收入
+      * industry_type: 行业名称，默认其他行业
+      * nursing_type: 护理人员类型，"有收入" 或 "无收入或雇佣护工"（默认）
+      * disability_level: 伤残等级字符串；或直接给出 disability_coefficient
+        （可选 has_disability 指明是否计算残疾赔偿金，默认系数小于1时计算）
+      * dependent_info: 被扶养人信息字符串
+      * is_death: 是否死亡
+    - standard_set: 适用的赔偿标准（standards.StandardSet），缺省时使用最新标准；
+      可用 standards.REGISTRY.for_date(事故日期) 选取
+
+    返回：项目名称到金额数组的字典（含"总计"），项目顺序与单案件计算一致
+    """
+    standard_set = standard_set or REGISTRY.latest
+    standards = standard_set.standards
+    size = max((np.size(value) for value in columns.values()), default=0)
+
+    def column(name, default):
+        value = columns.get(name, default)
+        return np.broadcast_to(np.asarray(value), (size,))
+
+    defaults = dict(NUMERIC_COLUMNS, meal_subsidy=standard_set.default_meal_subsidy)
+    data = {name: column(name, default) for name, default in defaults.items()}
+    victim_age = data['victim_age'].astype(np.int64)
+    is_death = column('is_death', False).astype(bool)
+    zero = np.zeros(size)
+
+    results = {}
+    results['医疗费'] = data['medical_expense'].astype(float)
+    results['后续治疗费'] = data['follow_up_treatment_fee'].astype(float)
+    results['住院伙食补助费'] = data['hospital_days'] * data['meal_subsidy'].astype(float)
+    results['营养费'] = data['nutrition_fee'].astype(float)
+    results['交通费'] = data['traffic_fee'].astype(float)
+    results['住宿费'] = data['accommodation_days'] * standards['daily_accommodation_fee']
+
+    # 误工费
+    work_loss_days = data['work_loss_days']
+    income_type = _income_type_codes(column('work_income_type', INCOME_TYPES[INCOME_FIXED]))
+    monthly_income = data['monthly_income'].astype(float)
+    avg_daily_income = data['avg_daily_income'].astype(float)
+    industry_salary = _unique_map(column('industry_type', '其他行业'), standard_set.industry_salary)
+    fixed_fee = np.where(monthly_income > 0, monthly_income / 30 * work_loss_days, zero)
+    average_fee = np.where(avg_daily_income > 0, avg_daily_income * work_loss_days, zero)
+    industry_fee = industry_salary / 365 * work_loss_days
+    work_loss_fee = np.select([income_type == INCOME_FIXED, income_type == INCOME_AVERAGE],
+                              [fixed_fee, average_fee], industry_fee)
+    results['误工费'] = np.where(work_loss_days > 0, work_loss_fee, zero)
+
+    # 护理费
+    nursing_days = data['nursing_days']
+    nursing_count = data['nursing_count']
+    nursing_income = data['nursing_income'].astype(float)
+    has_income = column('nursing_type', '无收入或雇佣护工') == "有收入"
+    income_fee = np.where(nursing_income > 0, nursing_income * nursing_days * nursing_count, zero)
+    worker_fee = standards['daily_nursing_fee'] * nursing_days * nursing_count
+    results['护理费'] = np.where(nursing_days > 0, np.where(has_income, income_fee, worker_fee), zero)
+
+    # 残疾赔偿金
+    years = compensation_years(victim_age)
+    if 'disability_level' in columns:
+        levels = column('disability_level', "无")
+        disability_coefficient = _unique_map(levels, lambda s: lookup_disability_coefficient(s).coefficient)
+        has_disability = _unique_map(levels, lambda s: bool(s.strip()) and s.strip() != "无", dtype=bool)
+    else:
+        disability_coefficient = column('disability_coefficient', 1.0).astype(float)
+        has_disability = column('has_disability', False).astype(bool) | (disability_coefficient < 1.0)
+    disability_compensation = standards['disposable_income'] * years * disability_coefficient
+    results['残疾赔偿金'] = np.where(has_disability, disability_compensation, zero)
+
+    results['残疾辅助器具费'] = data['disability_appliance_fee'].astype(float)
+
+    # 被扶养人生活费：未乘系数的小计只取决于被扶养人信息，按唯一值计算一次
+    if 'dependent_info' in columns:
+        subtotal = _unique_map(
+            column('dependent_info', ""),
+            lambda s: calculate_dependent_living_expense(CaseInput(dependent_info=s), 0,
+                                                         with_details=False, standard_set=standard_set)[0])
+        dependent_coefficient = np.where(is_death, 1.0, disability_coefficient)
+        results['被扶养人生活费'] = subtotal * dependent_coefficient
+    else:
+        results['被扶养人生活费'] = zero
+
+    # 死亡赔偿金、丧葬费
+    results['死亡赔偿金'] = np.where(is_death, standards['disposable_income'] * years, 0)
+    results['丧葬费'] = np.where(is_death, standards['funeral_expense'], 0)
+
+    results['精神损害抚慰金'] = data['mental_damage'].astype(float)
+
+    # 按与单案件计算相同的顺序累加，保证浮点结果完全一致
+    total = np.zeros(size)
+    for amount in results.values():
+        total = total + amount
+    results['总计'] = total
+    return results
+
+
+def build_grid(axes):
+    """
+    生成多个维度的笛卡尔积组合，作为 calculate_portfolio 的输入列
+
+    参数：
+    - axes: 列名到取值列表的映射，如 {'victim_age': range(18, 80), 'disability_level': ['5级', '8级']}
+    """
+    names = list(axes)
+    grids = np.meshgrid(*[np.asarray(list(axes[name])) for name in names], indexing='ij')
+    return {name: grid.reshape(-1) for name, grid in zip(names, grids)}
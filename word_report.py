@@ -0,0 +1,702 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+赔偿计算结果Word报告
+Web应用与图形界面共用的报告排版。文档骨架（样式、页边距、页脚页码、标题、计算依据和备注）
+每套赔偿标准只生成一次，每次导出时克隆骨架，只插入受害人相关的基本信息、明细和总额表格。
+
+受害人内容的标题、表格和明细行也在生成骨架时预先排好版（表格级单元格边距、命名字符样式），
+导出时复制这些XML原型并填入文字，不再逐个单元格、逐个文字块设置格式。
+
+文档属性中的时间和zip条目的时间都是固定值，用 save_document 保存时，同样的内容每次生成的文件逐字节相同。
+"""
+
+import copy
+import threading
+import zipfile
+from datetime import datetime
+
+from docx import Document
+from docx.package import Package
+from docx.parts.document import DocumentPart
+from docx.shared import Pt, Inches
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+from docx.text.paragraph import Paragraph
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+
+from compensation_engine import ITEMS_ORDER, calculate_compensation
+from standards import REGISTRY
+
+_skeletons = {}
+_skeletons_lock = threading.Lock()
+
+# 报告版式版本：修改排版时递增（导出缓存随之失效）
+REPORT_LAYOUT_VERSION = 1
+# 文档属性（创建、修改时间）和zip条目使用的固定时间
+REPORT_TIMESTAMP = datetime(2025, 1, 1)
+
+# 明细表使用的字符样式：(样式名, 字体, 字号, 加粗)
+DETAIL_HEADER_STYLE = ('Detail Header', '黑体', 11, True)
+DETAIL_TEXT_STYLE = ('Detail Text', '宋体', 10, False)
+DETAIL_FORMULA_STYLE = ('Detail Formula', '宋体', 9.5, False)
+
+# 明细表各列宽度（英寸）及单元格边距（上下, 左右，单位为twip）
+DETAIL_COLUMN_WIDTHS = (0.4, 1.0, 1.0, 5.1)
+DETAIL_CELL_MARGINS = ('50', '80')
+DETAIL_FORMULA_CELL_MARGINS = ('60', '120')
+
+
+class ReportSkeleton:
+    """
+    报告骨架
+
+    属性：
+    - document: 含标题、计算依据和备注的文档
+    - insert_index: 受害人内容在正文中的插入位置
+    - prototypes: 受害人内容各部分的XML原型，导出时复制使用
+    """
+
+    __slots__ = ('document', 'insert_index', 'prototypes')
+
+    def __init__(self, document, insert_index, prototypes):
+        self.document = document
+        self.insert_index = insert_index
+        self.prototypes = prototypes
+
+
+def _add_character_style(doc, spec):
+    """添加字符样式"""
+    name, font_name, size, bold = spec
+    style = doc.styles.add_style(name, WD_STYLE_TYPE.CHARACTER)
+    style.font.name = font_name
+    style.font.size = Pt(size)
+    if bold:
+        style.font.bold = True
+    style.font._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+    return style
+
+
+def _margins_element(tag, top_bottom, left_right):
+    """生成单元格边距元素（w:tblCellMar 或 w:tcMar）"""
+    margins = OxmlElement(tag)
+    for margin_name, margin_value in [('top', top_bottom), ('left', left_right),
+                                      ('bottom', top_bottom), ('right', left_right)]:
+        margin = OxmlElement(f'w:{margin_name}')
+        margin.set(qn('w:w'), margin_value)
+        margin.set(qn('w:type'), 'dxa')
+        margins.append(margin)
+    return margins
+
+
+def _styled_paragraph(cell, text, style, alignment):
+    """单元格中只含一个带字符样式文字块的段落"""
+    para = cell.paragraphs[0]
+    para.clear()
+    para.add_run(text, style=style)
+    if alignment is not None:
+        para.alignment = alignment
+    return para
+
+
+def _detach(element):
+    element.getparent().remove(element)
+    return element
+
+
+def _build_victim_prototypes(doc):
+    """
+    生成受害人内容的XML原型：各级标题、空段落、基本信息表、明细表（仅表头）、明细行、
+    计算方式的续行段落、赔偿总额表和总计公式段落。原型先按正常方式写入正文，再从正文中取出。
+    """
+    header_style = _add_character_style(doc, DETAIL_HEADER_STYLE)
+    text_style = _add_character_style(doc, DETAIL_TEXT_STYLE)
+    formula_style = _add_character_style(doc, DETAIL_FORMULA_STYLE)
+
+    prototypes = {
+        'blank': doc.add_paragraph()._p,
+        'basic_heading': doc.add_heading('一、基本信息', level=1)._p,
+        'detail_heading': doc.add_heading('二、赔偿明细及计算公式', level=1)._p,
+        'total_heading': doc.add_heading('三、赔偿总额', level=1)._p,
+    }
+
+    # 基本信息（值单元格的文字导出时填入）
+    basic_table = doc.add_table(rows=3, cols=2)
+    basic_table.style = 'Light Grid Accent 1'
+    basic_table.columns[0].width = Inches(2.0)
+    basic_table.columns[1].width = Inches(4.5)
+    for row, label in zip(basic_table.rows, ('受害人姓名', '受害人年龄', '事故发生日期')):
+        label_cell, value_cell = row.cells
+        label_cell.text = label
+        label_para = label_cell.paragraphs[0]
+        label_para.runs[0].bold = True
+        label_para.runs[0].font.name = '宋体'
+        label_para.runs[0].font.size = Pt(12)
+        label_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+        label_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+        value_cell.text = '-'
+        value_para = value_cell.paragraphs[0]
+        value_para.runs[0].font.name = '宋体'
+        value_para.runs[0].font.size = Pt(12)
+        value_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+    prototypes['basic_table'] = basic_table._tbl
+
+    # 赔偿明细：单元格边距设在表格级，只有"计算方式"列单独设置；第二行作为明细行原型
+    detail_table = doc.add_table(rows=2, cols=4)
+    detail_table.style = 'Light Grid Accent 1'
+    detail_table.autofit = True
+    tblPr = detail_table._tbl.tblPr
+    tblCellMar = _margins_element('w:tblCellMar', *DETAIL_CELL_MARGINS)
+    tblLook = tblPr.find(qn('w:tblLook'))
+    if tblLook is not None:
+        tblLook.addprevious(tblCellMar)
+    else:
+        tblPr.append(tblCellMar)
+    for column, width in zip(detail_table.columns, DETAIL_COLUMN_WIDTHS):
+        column.width = Inches(width)
+
+    header_row, item_row = detail_table.rows
+    for cell, header_text in zip(header_row.cells, ('序号', '项目', '金额', '计算方式')):
+        _styled_paragraph(cell, header_text, header_style, WD_ALIGN_PARAGRAPH.CENTER)
+        shading_elm = OxmlElement('w:shd')
+        shading_elm.set(qn('w:fill'), 'E7E6E6')
+        shading_elm.set(qn('w:val'), 'clear')
+        cell._element.get_or_add_tcPr().append(shading_elm)
+
+    item_cells = item_row.cells
+    _styled_paragraph(item_cells[0], '-', text_style, WD_ALIGN_PARAGRAPH.CENTER)
+    _styled_paragraph(item_cells[1], '-', text_style, WD_ALIGN_PARAGRAPH.LEFT)
+    _styled_paragraph(item_cells[2], '-', text_style, WD_ALIGN_PARAGRAPH.RIGHT)
+    formula_para = _styled_paragraph(item_cells[3], '-', formula_style, None)
+    prototypes['formula_line'] = copy.deepcopy(formula_para._p)
+
+    for row in (header_row, item_row):
+        row.cells[3]._element.get_or_add_tcPr().append(
+            _margins_element('w:tcMar', *DETAIL_FORMULA_CELL_MARGINS))
+    trHeight = OxmlElement('w:trHeight')
+    trHeight.set(qn('w:val'), '300')
+    trHeight.set(qn('w:hRule'), 'atLeast')
+    item_row._tr.get_or_add_trPr().append(trHeight)
+
+    prototypes['detail_row'] = _detach(item_row._tr)
+    prototypes['detail_table'] = detail_table._tbl
+
+    # 赔偿总额（金额导出时填入）
+    total_table = doc.add_table(rows=2, cols=2)
+    total_table.style = 'Light Grid Accent 1'
+    total_table.columns[0].width = Inches(2.0)
+    total_table.columns[1].width = Inches(5.0)
+
+    total_table.rows[0].cells[0].text = '项目'
+    total_table.rows[0].cells[1].text = '金额（元）'
+    for cell in total_table.rows[0].cells:
+        for paragraph in cell.paragraphs:
+            for run in paragraph.runs:
+                run.bold = True
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    total_table.rows[1].cells[0].text = '赔偿总额'
+    total_table.rows[1].cells[0].paragraphs[0].runs[0].bold = True
+    total_table.rows[1].cells[1].text = '-'
+    total_table.rows[1].cells[1].paragraphs[0].runs[0].bold = True
+    total_table.rows[1].cells[1].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    prototypes['total_table'] = total_table._tbl
+
+    p = doc.add_paragraph()
+    p.add_run('计算公式：').bold = True
+    prototypes['formula_label'] = p._p
+
+    for element in prototypes.values():
+        if element.getparent() is not None:
+            _detach(element)
+    return prototypes, (header_style, text_style)
+
+
+def _add_list_table(doc, headers, widths, alignments, header_style, text_style):
+    """
+    带表头的列表表格（格式同赔偿明细表），返回 (表格, 数据行原型)；
+    数据行原型各单元格的文字导出时填入
+    """
+    table = doc.add_table(rows=2, cols=len(headers))
+    table.style = 'Light Grid Accent 1'
+    table.autofit = True
+    tblPr = table._tbl.tblPr
+    tblCellMar = _margins_element('w:tblCellMar', *DETAIL_CELL_MARGINS)
+    tblLook = tblPr.find(qn('w:tblLook'))
+    if tblLook is not None:
+        tblLook.addprevious(tblCellMar)
+    else:
+        tblPr.append(tblCellMar)
+    for column, width in zip(table.columns, widths):
+        column.width = Inches(width)
+
+    header_row, item_row = table.rows
+    for cell, header_text in zip(header_row.cells, headers):
+        _styled_paragraph(cell, header_text, header_style, WD_ALIGN_PARAGRAPH.CENTER)
+        shading_elm = OxmlElement('w:shd')
+        shading_elm.set(qn('w:fill'), 'E7E6E6')
+        shading_elm.set(qn('w:val'), 'clear')
+        cell._element.get_or_add_tcPr().append(shading_elm)
+    for cell, alignment in zip(item_row.cells, alignments):
+        _styled_paragraph(cell, '-', text_style, alignment)
+    return table._tbl, _detach(item_row._tr)
+
+
+def _build_incident_prototypes(doc, header_style, text_style):
+    """
+    生成事故合并报告（多名受害人）的XML原型：事故概况、赔偿汇总、各受害人明细的标题，
+    事故概况表、受害人汇总表、项目合计表及其数据行。各受害人的内容使用受害人原型（不含一至三级标题）。
+    """
+    prototypes = {
+        'incident_heading': doc.add_heading('一、事故概况', level=1)._p,
+        'summary_heading': doc.add_heading('二、赔偿汇总', level=1)._p,
+        'victims_heading': doc.add_heading('三、各受害人赔偿明细', level=1)._p,
+        'victim_heading': doc.add_heading('-', level=2)._p,
+    }
+
+    incident_table = doc.add_table(rows=4, cols=2)
+    incident_table.style = 'Light Grid Accent 1'
+    incident_table.columns[0].width = Inches(2.0)
+    incident_table.columns[1].width = Inches(4.5)
+    for row, label in zip(incident_table.rows, ('事故名称', '事故发生日期', '赔偿义务人', '受害人数')):
+        label_cell, value_cell = row.cells
+        label_cell.text = label
+        label_para = label_cell.paragraphs[0]
+        label_para.runs[0].bold = True
+        label_para.runs[0].font.name = '宋体'
+        label_para.runs[0].font.size = Pt(12)
+        label_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+        label_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+        value_cell.text = '-'
+        value_para = value_cell.paragraphs[0]
+        value_para.runs[0].font.name = '宋体'
+        value_para.runs[0].font.size = Pt(12)
+        value_para.runs[0]._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+    prototypes['incident_table'] = incident_table._tbl
+
+    center, left, right = WD_ALIGN_PARAGRAPH.CENTER, WD_ALIGN_PARAGRAPH.LEFT, WD_ALIGN_PARAGRAPH.RIGHT
+    prototypes['summary_table'], prototypes['summary_row'] = _add_list_table(
+        doc, ('序号', '受害人', '年龄', '赔偿总额（元）'), (0.6, 2.0, 1.0, 2.9),
+        (center, left, center, right), header_style, text_style)
+    prototypes['item_totals_table'], prototypes['item_total_row'] = _add_list_table(
+        doc, ('项目', '合计金额（元）'), (3.0, 3.5), (left, right), header_style, text_style)
+
+    for element in prototypes.values():
+        if element.getparent() is not None:
+            _detach(element)
+    return prototypes
+
+
+def build_report_skeleton(standard_set):
+    """
+    生成报告骨架：设置样式、页边距和页脚，写入标题以及"四、计算依据""五、备注"，
+    并生成受害人内容的XML原型
+
+    返回：ReportSkeleton
+    """
+    doc = Document()
+    doc.core_properties.created = REPORT_TIMESTAMP
+    doc.core_properties.modified = REPORT_TIMESTAMP
+
+    # 设置文档样式
+    style = doc.styles['Normal']
+    font = style.font
+    font.name = '宋体'
+    font.size = Pt(12)
+    font._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+
+    # 设置页面边距
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1.25)
+        section.right_margin = Inches(1.25)
+
+    # 设置标题样式
+    heading1 = doc.styles['Heading 1']
+    heading1_font = heading1.font
+    heading1_font.name = '黑体'
+    heading1_font.size = Pt(16)
+    heading1_font.bold = True
+    heading1_font._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
+
+    heading2 = doc.styles['Heading 2']
+    heading2_font = heading2.font
+    heading2_font.name = '黑体'
+    heading2_font.size = Pt(14)
+    heading2_font.bold = True
+    heading2_font._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
+
+    # 添加页脚（页码）
+    section = doc.sections[0]
+    footer = section.footer
+    footer_para = footer.paragraphs[0]
+    footer_para.clear()
+    footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    p = footer_para._element
+    p_r = OxmlElement('w:pPr')
+    p.append(p_r)
+
+    r = OxmlElement('w:r')
+    p.append(r)
+
+    t = OxmlElement('w:t')
+    t.text = '第 '
+    r.append(t)
+
+    fldChar1 = OxmlElement('w:fldChar')
+    fldChar1.set(qn('w:fldCharType'), 'begin')
+    r.append(fldChar1)
+
+    instrText = OxmlElement('w:instrText')
+    instrText.set(qn('xml:space'), 'preserve')
+    instrText.text = 'PAGE'
+    r.append(instrText)
+
+    fldChar2 = OxmlElement('w:fldChar')
+    fldChar2.set(qn('w:fldCharType'), 'end')
+    r.append(fldChar2)
+
+    r2 = OxmlElement('w:r')
+    p.append(r2)
+    t2 = OxmlElement('w:t')
+    t2.text = ' 页'
+    r2.append(t2)
+
+    for r_elem in p.findall(qn('w:r')):
+        rPr = OxmlElement('w:rPr')
+        r_elem.insert(0, rPr)
+        font = OxmlElement('w:rFonts')
+        font.set(qn('w:ascii'), '宋体')
+        font.set(qn('w:eastAsia'), '宋体')
+        font.set(qn('w:hAnsi'), '宋体')
+        rPr.append(font)
+        sz = OxmlElement('w:sz')
+        sz.set(qn('w:val'), '20')
+        rPr.append(sz)
+
+    # 标题
+    title = doc.add_heading('广西人身损害赔偿计算结果', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title_run = title.runs[0]
+    title_run.font.name = '黑体'
+    title_run.font.size = Pt(18)
+    title_run.font.bold = True
+    title_run._element.rPr.rFonts.set(qn('w:eastAsia'), '黑体')
+
+    doc.add_paragraph()
+    prototypes, table_styles = _build_victim_prototypes(doc)
+    prototypes.update(_build_incident_prototypes(doc, *table_styles))
+    insert_index = len(doc.element.body) - 1
+
+    # 计算依据
+    doc.add_heading('四、计算依据', level=1)
+    doc.add_paragraph('本计算依据以下法律法规及标准文件：')
+    for document in standard_set.documents:
+        doc.add_paragraph(document, style='List Number')
+    doc.add_paragraph()
+    doc.add_paragraph(standard_set.basis_note)
+
+    # 备注
+    doc.add_heading('五、备注', level=1)
+    doc.add_paragraph('1. 本计算结果仅供参考，实际赔偿金额以法院判决为准。')
+    doc.add_paragraph('2. 各项费用需提供相应的票据和证明材料。')
+    doc.add_paragraph('3. 误工费、护理费的计算方式已根据收入类型进行区分。')
+    doc.add_paragraph('4. 被扶养人生活费的计算已考虑年赔偿总额限制。')
+    doc.add_paragraph('5. 如对计算结果有疑问，请咨询广西瀛桂律师事务所唐学智律师，联系电话18078374299。')
+
+    return ReportSkeleton(doc, insert_index, prototypes)
+
+
+def get_report_skeleton(standard_set):
+    """取得（必要时生成）某套赔偿标准的报告骨架"""
+    skeleton = _skeletons.get(standard_set)
+    if skeleton is None:
+        with _skeletons_lock:
+            skeleton = _skeletons.get(standard_set)
+            if skeleton is None:
+                skeleton = _skeletons[standard_set] = build_report_skeleton(standard_set)
+    return skeleton
+
+
+def prepare_report_skeletons():
+    """预先生成全部赔偿标准的报告骨架（启动时调用）"""
+    for standard_set in REGISTRY:
+        get_report_skeleton(standard_set)
+
+
+def report_template_version(standard_set):
+    """报告模板版本：版式版本 + 赔偿标准（含计算依据所列文件）的摘要"""
+    return f"{REPORT_LAYOUT_VERSION}:{standard_set.digest}"
+
+
+def clone_document(skeleton):
+    """
+    克隆文档：只复制正文（word/document.xml），样式、编号、页脚等其余部件与骨架共用
+
+    克隆出的文档只能修改正文，不能修改样式或页脚。
+    """
+    source = skeleton.part
+    package = Package()
+    part = DocumentPart(source.partname, source.content_type, copy.deepcopy(source.element), package)
+    for rId, rel in source.rels.items():
+        target = rel.target_ref if rel.is_external else rel.target_part
+        part.rels.add_relationship(rel.reltype, target, rId, rel.is_external)
+    for rId, rel in source.package.rels.items():
+        if rel.is_external:
+            target = rel.target_ref
+        else:
+            target = part if rel.target_part is source else rel.target_part
+        package.rels.add_relationship(rel.reltype, target, rId, rel.is_external)
+    return part.document
+
+
+def new_report_document(standard_set):
+    """
+    克隆报告骨架
+
+    返回：(Document, ReportSkeleton)；再调用 add_victim_sections 写入受害人内容
+    """
+    skeleton = get_report_skeleton(standard_set)
+    return clone_document(skeleton.document), skeleton
+
+
+def zip_entry(name):
+    """报告中的zip条目：固定时间、压缩方式与 python-docx 相同"""
+    info = zipfile.ZipInfo(name, date_time=REPORT_TIMESTAMP.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    return info
+
+
+def save_document(doc, output):
+    """
+    保存文档（与 Document.save 相同的部件和顺序，zip条目使用固定时间）
+
+    参数：
+    - output: 文件名或二进制文件对象
+    """
+    package = doc.part.package
+    parts = list(package.parts)
+    for part in parts:
+        part.before_marshal()
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(zip_entry(CONTENT_TYPES_URI.membername), _ContentTypesItem.from_parts(parts).blob)
+        archive.writestr(zip_entry(PACKAGE_URI.rels_uri.membername), package.rels.xml)
+        for part in parts:
+            archive.writestr(zip_entry(part.partname.membername), part.blob)
+            if len(part.rels):
+                archive.writestr(zip_entry(part.partname.rels_uri.membername), part.rels.xml)
+
+
+def _set_text(t, text):
+    """设置 w:t 的文字（首尾有空白时保留空白）"""
+    t.text = text
+    if len(text.strip()) < len(text):
+        t.set(qn('xml:space'), 'preserve')
+
+
+def detail_lines(item, results, details):
+    """明细表"计算方式"列的各行文字"""
+    if item not in details:
+        return [f"{item} = {results[item]:,.2f} 元"]
+    detail = details[item]
+    if '\n' in detail:
+        return [line.strip() for line in detail.split('\n')]
+    formula_text = detail.replace('；', '\n').replace(';', '\n')
+    if '\n' in formula_text:
+        return [line.strip() for line in formula_text.split('\n')]
+    return [formula_text]
+
+
+def _inserter(doc, skeleton):
+    """返回插入函数：复制骨架中的原型，插入到受害人内容的插入位置（按调用顺序排列）"""
+    prototypes = skeleton.prototypes
+    anchor = doc.element.body[skeleton.insert_index]
+
+    def insert(name):
+        element = copy.deepcopy(prototypes[name])
+        anchor.addprevious(element)
+        return element
+    return insert
+
+
+def _fill_row(tr, values):
+    """填入数据行各单元格的文字"""
+    for t, value in zip(tr.iter(qn('w:t')), values):
+        _set_text(t, value)
+    return tr
+
+
+def _insert_victim(doc, skeleton, insert, results, details, victim_name, victim_age, accident_date,
+                   headings=True):
+    """写入受害人内容；headings 为 False 时不写"一、基本信息"等标题（事故合并报告中使用）"""
+    prototypes = skeleton.prototypes
+    text_tag = qn('w:t')
+
+    # 基本信息
+    if headings:
+        insert('basic_heading')
+    basic_table = insert('basic_table')
+    basic_info = (victim_name, f"{victim_age}岁", accident_date)
+    for tr, value in zip(basic_table.iterchildren(qn('w:tr')), basic_info):
+        _set_text(list(tr.iter(text_tag))[-1], str(value))
+    insert('blank')
+
+    # 赔偿明细
+    if headings:
+        insert('detail_heading')
+    valid_items = [item for item in ITEMS_ORDER if item in results and results[item] > 0]
+
+    if valid_items:
+        detail_table = insert('detail_table')
+        row_prototype = prototypes['detail_row']
+        line_prototype = prototypes['formula_line']
+        for idx, item in enumerate(valid_items):
+            tr = copy.deepcopy(row_prototype)
+            number_t, item_t, amount_t, formula_t = tr.iter(text_tag)
+            _set_text(number_t, str(idx + 1))
+            _set_text(item_t, item)
+            _set_text(amount_t, f"{results[item]:,.2f}")
+
+            lines = detail_lines(item, results, details)
+            _set_text(formula_t, lines[0])
+            formula_cell = tr[-1]
+            for line in lines[1:]:
+                para = copy.deepcopy(line_prototype)
+                _set_text(next(para.iter(text_tag)), line)
+                formula_cell.append(para)
+            detail_table.append(tr)
+
+        insert('blank')
+
+    # 总计
+    if headings:
+        insert('total_heading')
+    total_table = insert('total_table')
+    _set_text(list(total_table.iter(text_tag))[-1], f"{results.get('总计', 0):,.2f}")
+
+    if '总计' in details:
+        insert('blank')
+        insert('formula_label')
+        Paragraph(insert('blank'), doc._body).add_run(details['总计'])
+
+
+def add_victim_sections(doc, skeleton, results, details, victim_name, victim_age, accident_date):
+    """写入受害人的基本信息、赔偿明细及计算公式、赔偿总额（复制骨架中的原型并填入文字）"""
+    _insert_victim(doc, skeleton, _inserter(doc, skeleton), results, details, victim_name, victim_age,
+                   accident_date)
+
+
+def incident_summary_rows(incident_result):
+    """逐行产出受害人汇总表：(序号, 受害人, 年龄, 赔偿总额)"""
+    for index, result in enumerate(incident_result.victims):
+        yield str(index + 1), str(result.victim_name), f"{result.victim_age}岁", f"{result.results.get('总计', 0):,.2f}"
+
+
+def incident_item_rows(incident_result):
+    """项目合计表各行：(项目, 合计金额)，只列合计大于0的项目"""
+    totals = incident_result.totals
+    return [(item, f"{totals[item]:,.2f}") for item in ITEMS_ORDER if totals.get(item, 0) > 0]
+
+
+def incident_info(incident_result):
+    """事故概况表的值：事故名称、事故发生日期、赔偿义务人、受害人数"""
+    incident = incident_result.incident
+    return (incident.incident_name, incident.accident_date or '未填写',
+            '、'.join(incident.defendants) or '未填写', f"{len(incident_result.victims)}人")
+
+
+def victim_details(result, standard_set):
+    """受害人的计算详情：仅金额模式的计算结果临时生成（不保存到计算结果中，写出后即可释放）"""
+    if result.details is not None:
+        return result.details
+    return calculate_compensation(result.case, True, standard_set).details
+
+
+def victim_heading_text(index, victim_name):
+    """事故合并报告中各受害人的标题"""
+    return f"（{index + 1}）{victim_name}"
+
+
+def add_incident_sections(doc, skeleton, incident_result):
+    """写入事故概况、赔偿汇总（各受害人及各项目合计）和各受害人的赔偿明细"""
+    prototypes = skeleton.prototypes
+    insert = _inserter(doc, skeleton)
+    text_tag = qn('w:t')
+
+    # 事故概况
+    insert('incident_heading')
+    incident_table = insert('incident_table')
+    for tr, value in zip(incident_table.iterchildren(qn('w:tr')), incident_info(incident_result)):
+        _set_text(list(tr.iter(text_tag))[-1], value)
+    insert('blank')
+
+    # 赔偿汇总
+    insert('summary_heading')
+    summary_table = insert('summary_table')
+    for values in incident_summary_rows(incident_result):
+        summary_table.append(_fill_row(copy.deepcopy(prototypes['summary_row']), values))
+    insert('blank')
+    item_rows = incident_item_rows(incident_result)
+    if item_rows:
+        item_table = insert('item_totals_table')
+        for values in item_rows:
+            item_table.append(_fill_row(copy.deepcopy(prototypes['item_total_row']), values))
+        insert('blank')
+    total_table = insert('total_table')
+    _set_text(list(total_table.iter(text_tag))[-1], f"{incident_result.totals.get('总计', 0):,.2f}")
+    insert('blank')
+
+    # 各受害人赔偿明细
+    insert('victims_heading')
+    accident_date = incident_result.incident.accident_date
+    standard_set = incident_result.standard_set or REGISTRY.for_date(accident_date)
+    for index, result in enumerate(incident_result.victims):
+        heading = insert('victim_heading')
+        _set_text(next(heading.iter(text_tag)), victim_heading_text(index, result.victim_name))
+        _insert_victim(doc, skeleton, insert, result.results, victim_details(result, standard_set),
+                       result.victim_name, result.victim_age, accident_date, headings=False)
+        insert('blank')
+
+
+def build_report(results, details, victim_name, victim_age, accident_date, standard_set=None):
+    """
+    生成赔偿计算结果报告
+
+    参数：
+    - results / details: 各项金额及计算详情（与 /api/calculate 的返回值相同）
+    - victim_name / victim_age / accident_date: 受害人基本信息
+    - standard_set: 计算依据所列的赔偿标准，缺省时按事故发生日期选取
+
+    返回：docx.Document
+    """
+    standard_set = standard_set or REGISTRY.for_date(accident_date)
+    doc, skeleton = new_report_document(standard_set)
+    add_victim_sections(doc, skeleton, results, details, victim_name, victim_age, accident_date)
+    return doc
+
+
+def build_incident_report(incident_result, standard_set=None):
+    """
+    生成事故合并报告：一份文档中包含事故概况、赔偿汇总和各受害人的赔偿明细，
+    全部受害人共用一份报告骨架（样式和版式只生成一次）
+
+    参数：
+    - incident_result: incident.IncidentResult（仅金额模式的结果在写入各受害人时生成计算详情）
+    - standard_set: 计算依据所列的赔偿标准，缺省时使用事故的赔偿标准
+
+    返回：docx.Document
+    """
+    standard_set = standard_set or incident_result.standard_set or REGISTRY.for_date(
+        incident_result.incident.accident_date)
+    doc, skeleton = new_report_document(standard_set)
+    add_incident_sections(doc, skeleton, incident_result)
+    return doc